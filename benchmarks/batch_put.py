@@ -0,0 +1,133 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmark for ``Batch.put`` throughput and memory use.
+
+Mutations are sent to an in-memory table, so only the client side
+cost of accumulating mutations is measured. The pending mutations held
+by a :class:`Batch` are compared with building a low-level
+``DirectRow`` per row key as mutations arrive. Run with::
+
+    $ python benchmarks/batch_put.py --rows 20000 --columns 50
+"""
+
+
+from __future__ import print_function
+
+import argparse
+import time
+import tracemalloc
+
+from google.cloud.bigtable.row import DirectRow
+
+from google.cloud.happybase import batch as batch_mod
+from google.cloud.happybase.batch import Batch
+
+
+class _FakeLowLevelTable(object):
+    """In-memory stand-in for a low-level table which drops all mutations."""
+
+    def row(self, row_key):
+        return DirectRow(row_key)
+
+    def mutate_rows(self, rows):
+        return []
+
+
+class _FakeTable(object):
+    def __init__(self):
+        self._low_level_table = _FakeLowLevelTable()
+
+
+def _make_data(num_columns):
+    return {
+        b"cf1:column-%04d" % (index,): b"value-%04d" % (index,)
+        for index in range(num_columns)
+    }
+
+
+def fill_batch(num_rows, data, cached=True):
+    """Put ``data`` into ``num_rows`` rows of a batch which is not sent."""
+    batch = Batch(_FakeTable())
+    for index in range(num_rows):
+        if not cached:
+            batch_mod._COLUMN_CACHE.clear()
+        batch.put(b"row-%08d" % (index,), data)
+    return batch
+
+
+def fill_direct_rows(num_rows, data):
+    """Put ``data`` into ``num_rows`` eagerly built low-level rows."""
+    rows = {}
+    column_pairs = batch_mod._get_column_pairs(data, require_qualifier=True)
+    for index in range(num_rows):
+        row = rows[index] = DirectRow(b"row-%08d" % (index,))
+        for (column_family_id, column_qualifier), value in zip(
+            column_pairs, data.values()
+        ):
+            row.set_cell(column_family_id, column_qualifier, value)
+    return rows
+
+
+def _timed(func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, time.time() - start
+
+
+def _held_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    result = func(*args, **kwargs)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held
+
+
+def _report(label, num_cells, put_elapsed, send_elapsed, held):
+    print(
+        "%-12s put %8.3fs %10.0f cells/s  send %8.3fs  held %8.1f MiB"
+        % (label, put_elapsed, num_cells / put_elapsed, send_elapsed, held / 2.0 ** 20)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=50)
+    parser.add_argument(
+        "--uncached",
+        action="store_true",
+        help="Parse every column name again on each put.",
+    )
+    args = parser.parse_args()
+
+    data = _make_data(args.columns)
+    num_cells = args.rows * args.columns
+    cached = not args.uncached
+
+    rows, put_elapsed = _timed(fill_direct_rows, args.rows, data)
+    _, send_elapsed = _timed(_FakeLowLevelTable().mutate_rows, list(rows.values()))
+    del rows
+    held = _held_memory(fill_direct_rows, args.rows, data)
+    _report("DirectRow", num_cells, put_elapsed, send_elapsed, held)
+
+    batch, put_elapsed = _timed(fill_batch, args.rows, data, cached=cached)
+    _, send_elapsed = _timed(batch.send)
+    held = _held_memory(fill_batch, args.rows, data, cached=cached)
+    _report("Batch", num_cells, put_elapsed, send_elapsed, held)
+
+
+if __name__ == "__main__":
+    main()
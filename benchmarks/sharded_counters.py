@@ -0,0 +1,155 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark for contention on a single counter versus a sharded counter.
+
+Counters are incremented in an in-memory table which serializes the
+ReadModifyWrite requests to each row and holds the row for a fixed
+latency, like the row lock taken by Cloud Bigtable. Several threads
+increment the same counter, once with ``Table.counter_inc`` and once
+with ``Table.sharded_counter_inc``. Run with::
+
+    $ python benchmarks/sharded_counters.py --threads 32 --shards 16
+"""
+
+
+from __future__ import print_function
+
+import argparse
+import collections
+import struct
+import threading
+import time
+
+from google.cloud.happybase.table import Table
+
+
+_PACK_I64 = struct.Struct(">q").pack
+
+
+class _FakeCell(object):
+    def __init__(self, value):
+        self.value = value
+
+
+class _FakeRowData(object):
+    def __init__(self, row_key, cells):
+        self.row_key = row_key
+        self._cells = cells
+
+
+class _FakeAppendRow(object):
+    def __init__(self, table, row_key):
+        self._table = table
+        self._row_key = row_key
+        self._increments = []
+
+    def increment_cell_value(self, column_family_id, column, int_value):
+        self._increments.append((column_family_id, column, int_value))
+
+    def commit(self):
+        with self._table.row_locks[self._row_key]:
+            time.sleep(self._table.latency)
+            values = self._table.values[self._row_key]
+            modified_cells = {}
+            for column_family_id, column, int_value in self._increments:
+                values[column_family_id, column] += int_value
+                cell = (_PACK_I64(values[column_family_id, column]), None)
+                modified_cells.setdefault(column_family_id, {})[column] = [cell]
+            return modified_cells
+
+
+class _FakeLowLevelTable(object):
+    """In-memory table holding each row for ``latency`` when it is modified."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.row_locks = collections.defaultdict(threading.Lock)
+        self.values = collections.defaultdict(lambda: collections.defaultdict(int))
+
+    def row(self, row_key, append=False):
+        return _FakeAppendRow(self, row_key)
+
+    def read_rows(self, row_set=None, filter_=None):
+        for row_key in row_set.row_keys:
+            cells = {}
+            for (column_family_id, column), value in self.values[row_key].items():
+                column_cells = cells.setdefault(column_family_id, {})
+                column_cells[column] = [_FakeCell(_PACK_I64(value))]
+            yield _FakeRowData(row_key, cells)
+
+
+def _make_table(latency):
+    table = Table("benchmark", None)
+    table._low_level_table = _FakeLowLevelTable(latency)
+    return table
+
+
+def _run_threads(num_threads, num_increments, increment):
+    def worker():
+        for _ in range(num_increments):
+            increment()
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start
+
+
+def _report(label, total, elapsed, value):
+    print(
+        "%-16s %8.3fs %10.0f increments/s  value %d"
+        % (label, elapsed, total / elapsed, value)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--increments", type=int, default=50)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.002,
+        help="Time (in seconds) a row is held by each increment.",
+    )
+    args = parser.parse_args()
+
+    total = args.threads * args.increments
+    row = b"requests"
+    column = b"cf1:count"
+
+    table = _make_table(args.latency)
+    elapsed = _run_threads(
+        args.threads, args.increments, lambda: table.counter_inc(row, column)
+    )
+    value = table.counters_get([row], [column])[row][column]
+    _report("counter_inc", total, elapsed, value)
+
+    table = _make_table(args.latency)
+    elapsed = _run_threads(
+        args.threads,
+        args.increments,
+        lambda: table.sharded_counter_inc(row, column, shards=args.shards),
+    )
+    value = table.sharded_counter_get(row, column, shards=args.shards)
+    _report("sharded (%d)" % (args.shards,), total, elapsed, value)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latency benchmark for small ``Table.put`` and ``Table.delete`` calls.
+
+Requests go to an in-memory backend which accepts every mutation, so
+only the client side cost of each call is measured. The single-row
+``MutateRow`` path used by :class:`Table` is compared with sending the
+same row through a transactional :class:`Batch`, which uses the bulk
+``MutateRows`` path. Run with::
+
+    $ python benchmarks/table_put_latency.py --calls 20000 --columns 4
+"""
+
+
+from __future__ import print_function
+
+import argparse
+import time
+
+from google.cloud.bigtable.row import DirectRow
+from google.rpc import code_pb2
+from google.rpc import status_pb2
+
+from google.cloud.happybase.table import Table
+
+
+class _FakeTableImpl(object):
+    def mutate_row(self, row_key, mutations):
+        pass
+
+
+class _FakeLowLevelTable(object):
+    """In-memory stand-in for a low-level table which drops all mutations."""
+
+    def __init__(self):
+        self._table_impl = _FakeTableImpl()
+
+    def row(self, row_key):
+        return DirectRow(row_key, table=self)
+
+    def mutate_rows(self, rows):
+        statuses = []
+        for row in rows:
+            row._get_mutations()
+            statuses.append(status_pb2.Status(code=code_pb2.OK))
+        return statuses
+
+
+def _make_table():
+    table = Table("benchmark", None)
+    table._low_level_table = _FakeLowLevelTable()
+    return table
+
+
+def put_direct(table, num_calls, data):
+    for index in range(num_calls):
+        table.put(b"row-%08d" % (index,), data)
+
+
+def put_batch(table, num_calls, data):
+    for index in range(num_calls):
+        with table.batch(transaction=True) as batch:
+            batch.put(b"row-%08d" % (index,), data)
+
+
+def delete_direct(table, num_calls, columns):
+    for index in range(num_calls):
+        table.delete(b"row-%08d" % (index,), columns=columns)
+
+
+def delete_batch(table, num_calls, columns):
+    for index in range(num_calls):
+        with table.batch() as batch:
+            batch.delete(b"row-%08d" % (index,), columns=columns)
+
+
+def _report(label, num_calls, func, *args):
+    table = _make_table()
+    start = time.time()
+    func(table, num_calls, *args)
+    elapsed = time.time() - start
+    print("%-14s %8.3fs %8.1f us/call" % (label, elapsed, 1e6 * elapsed / num_calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--columns", type=int, default=4)
+    args = parser.parse_args()
+
+    data = {
+        b"cf1:column-%04d" % (index,): b"value-%04d" % (index,)
+        for index in range(args.columns)
+    }
+    columns = list(data)
+
+    _report("put batch", args.calls, put_batch, data)
+    _report("put direct", args.calls, put_direct, data)
+    _report("delete batch", args.calls, delete_batch, columns)
+    _report("delete direct", args.calls, delete_direct, columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,10 @@ import nox
 
 BLACK_VERSION = "black==19.10b0"
 
-@nox.session(python="3.6")
+@nox.session(python="3.7")
 def cover(session):
     session.install("pytest", "mock", "coverage", "pytest-cov")
-    session.install(".")
+    session.install(".[aio]")
     session.run(
         "py.test",
         "--quiet",
@@ -83,7 +83,11 @@ def blacken(session):
 @nox.session(python=["3.6", "3.7", "3.8", "3.9"])
 def unit(session):
     session.install("pytest", "mock")
-    session.install(".")
+    if session.python == "3.6":
+        # The asyncio data client needs Python 3.7, its tests are skipped.
+        session.install(".")
+    else:
+        session.install(".[aio]")
     session.run("py.test", "--quiet", "unit_tests")
 
 
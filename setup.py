@@ -52,7 +52,12 @@ SETUP_BASE = {
 }
 
 
-REQUIREMENTS = ["google-cloud-bigtable >= 0.31.0"]
+REQUIREMENTS = [
+    "google-api-core >= 1.26.0",
+    "google-cloud-bigtable >= 1.5.0",
+    'futures >= 3.2.0; python_version < "3.2"',
+]
+EXTRAS = {"aio": ["google-cloud-bigtable >= 2.23.0"]}
 
 SETUP_BASE.pop("url")
 
@@ -66,6 +71,7 @@ setup(
     packages=find_packages("src"),
     package_dir={"": "src"},
     install_requires=REQUIREMENTS,
+    extras_require=EXTRAS,
     python_requires=">=2.7,!=3.0.*,!=3.1.*,!=3.2.*,!=3.3.*",
     **SETUP_BASE
 )
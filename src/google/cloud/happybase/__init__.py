@@ -157,8 +157,14 @@ from google.cloud.happybase.batch import Batch
 from google.cloud.happybase.connection import Connection
 from google.cloud.happybase.connection import DEFAULT_HOST
 from google.cloud.happybase.connection import DEFAULT_PORT
+from google.cloud.happybase.counters import CounterBuffer
+from google.cloud.happybase.counters import SequenceAllocator
+from google.cloud.happybase.flow_control import FlowControlLimitExceeded
+from google.cloud.happybase.flow_control import FlowController
 from google.cloud.happybase.pool import ConnectionPool
+from google.cloud.happybase.pool import MetricsSink
 from google.cloud.happybase.pool import NoConnectionsAvailable
+from google.cloud.happybase.pool import PoolOverloaded
 from google.cloud.happybase.table import Table
 
 
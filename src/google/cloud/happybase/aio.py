@@ -0,0 +1,859 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Google Cloud Bigtable HappyBase asyncio module.
+
+Provides :class:`AsyncConnection`, :class:`AsyncTable` and
+:class:`AsyncBatch`, which mirror the data methods of
+:class:`Connection <google.cloud.happybase.connection.Connection>`,
+:class:`Table <google.cloud.happybase.table.Table>` and
+:class:`Batch <google.cloud.happybase.batch.Batch>` as coroutines. They
+send requests with the asyncio Bigtable data client, so they don't block
+the event loop and don't need a thread per request.
+
+.. note::
+
+    This module requires Python 3.7 and ``google-cloud-bigtable`` 2.23.0
+    or later, which provides the ``google.cloud.bigtable.data`` client
+    (installed with the ``aio`` extra: ``google-cloud-happybase[aio]``).
+    It is not imported by :mod:`google.cloud.happybase`. Table
+    administration (``tables()``, ``create_table()``, ...) is only
+    available on
+    :class:`Connection <google.cloud.happybase.connection.Connection>`.
+"""
+
+
+import warnings
+
+from google.cloud.bigtable.data import BigtableDataClientAsync
+from google.cloud.bigtable.data import DeleteAllFromFamily
+from google.cloud.bigtable.data import DeleteAllFromRow
+from google.cloud.bigtable.data import DeleteRangeFromColumn
+from google.cloud.bigtable.data import MutationsExceptionGroup
+from google.cloud.bigtable.data import ReadRowsQuery
+from google.cloud.bigtable.data import RowMutationEntry
+from google.cloud.bigtable.data import RowRange
+from google.cloud.bigtable.data import SetCell
+from google.cloud.bigtable.data.read_modify_write_rules import IncrementRule
+
+from google.cloud.happybase.batch import _DELETE_CELL
+from google.cloud.happybase.batch import _DELETE_FAMILY
+from google.cloud.happybase.batch import _MAX_REQUEST_BYTES
+from google.cloud.happybase.batch import _MAX_REQUEST_MUTATIONS
+from google.cloud.happybase.batch import _SET_CELL
+from google.cloud.happybase.batch import _WAL_SENTINEL
+from google.cloud.happybase.batch import _WAL_WARNING
+from google.cloud.happybase.batch import _convert_timestamp
+from google.cloud.happybase.batch import _delete_mutations
+from google.cloud.happybase.batch import _mutation_size
+from google.cloud.happybase.batch import _parse_column
+from google.cloud.happybase.batch import _put_mutations
+from google.cloud.happybase.batch import _split_requests
+from google.cloud.happybase.connection import _get_instance
+from google.cloud.happybase.table import _UNPACK_I64
+from google.cloud.happybase.table import _columns_filter_helper
+from google.cloud.happybase.table import _filter_chain_helper
+from google.cloud.happybase.table import _scan_filter_helper
+
+
+# Timestamp asking the server to assign the time of a "put", as done by
+# the low-level rows used by Table.
+_SERVER_SIDE_TIMESTAMP = -1
+
+
+class AsyncConnection(object):
+    """Asyncio connection to Cloud Bigtable backend.
+
+    Can be used as an asynchronous context manager, which closes the
+    connection on exit::
+
+        async with AsyncConnection(instance=instance) as connection:
+            table = connection.table("table-name")
+            row = await table.row(b"row-key")
+
+    :type table_prefix: str
+    :param table_prefix: (Optional) Prefix used to construct table names.
+
+    :type table_prefix_separator: str
+    :param table_prefix_separator: (Optional) Separator used with
+                                   ``table_prefix``. Defaults to ``_``.
+
+    :type instance: :class:`~google.cloud.bigtable.instance.Instance`
+    :param instance: (Optional) A Cloud Bigtable instance. Its project and
+                     credentials are used for the data client. If not passed
+                     in, the instance is found as for
+                     :class:`Connection \
+                         <google.cloud.happybase.connection.Connection>`.
+
+    :type client: :class:`~google.cloud.bigtable.data.BigtableDataClientAsync`
+    :param client: (Optional) The data client sending requests, e.g. to share
+                   it between several connections. It is not closed with the
+                   connection. If not passed in, the connection creates and
+                   owns a client.
+
+    :type app_profile_id: str
+    :param app_profile_id: (Optional) The app profile used for requests.
+    """
+
+    def __init__(
+        self,
+        table_prefix=None,
+        table_prefix_separator="_",
+        instance=None,
+        client=None,
+        app_profile_id=None,
+    ):
+        if table_prefix is not None and not isinstance(table_prefix, str):
+            raise TypeError(
+                "table_prefix must be a string",
+                "received",
+                table_prefix,
+                type(table_prefix),
+            )
+        if not isinstance(table_prefix_separator, str):
+            raise TypeError(
+                "table_prefix_separator must be a string",
+                "received",
+                table_prefix_separator,
+                type(table_prefix_separator),
+            )
+
+        self.table_prefix = table_prefix
+        self.table_prefix_separator = table_prefix_separator
+
+        if instance is None:
+            instance = _get_instance()
+        self._instance = instance
+        self._owns_client = client is None
+        if client is None:
+            client = BigtableDataClientAsync(
+                project=instance._client.project,
+                credentials=instance._client._credentials,
+            )
+        self._client = client
+        self._app_profile_id = app_profile_id
+        # Dictionary of table names to the tables created by this connection.
+        self._tables = {}
+
+    def _table_name(self, name):
+        """Construct a table name by optionally adding a table name prefix.
+
+        :type name: str
+        :param name: The name to have a prefix added to it.
+
+        :rtype: str
+        :returns: The prefixed name, if the current connection has a table
+                  prefix set.
+        """
+        if self.table_prefix is None:
+            return name
+
+        return self.table_prefix + self.table_prefix_separator + name
+
+    def table(self, name, use_prefix=True):
+        """Table factory.
+
+        The table is cached, so calling this again with the same name
+        returns the same table instance.
+
+        :type name: str
+        :param name: The name of the table to be created.
+
+        :type use_prefix: bool
+        :param use_prefix: Whether to use the table prefix (if any).
+
+        :rtype: :class:`AsyncTable`
+        :returns: Table instance owned by this connection.
+        """
+        if use_prefix:
+            name = self._table_name(name)
+
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = AsyncTable(name, self)
+        return table
+
+    async def close(self):
+        """Close the tables of this connection and the client it owns."""
+        tables = list(self._tables.values())
+        self._tables.clear()
+        for table in tables:
+            await table._data_table.close()
+        if self._owns_client:
+            await self._client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class AsyncTable(object):
+    """Asyncio representation of a Cloud Bigtable table.
+
+    The methods behave like the methods of the same name of
+    :class:`Table <google.cloud.happybase.table.Table>`, but are
+    coroutines.
+
+    :type name: str
+    :param name: The name of the table.
+
+    :type connection: :class:`AsyncConnection`
+    :param connection: The connection which has access to the table.
+    """
+
+    def __init__(self, name, connection):
+        self.name = name
+        self.connection = connection
+        self._data_table = connection._client.get_table(
+            connection._instance.instance_id,
+            name,
+            app_profile_id=connection._app_profile_id,
+        )
+
+    def __repr__(self):
+        return "<aio.AsyncTable name=%r>" % (self.name,)
+
+    async def row(self, row, columns=None, timestamp=None, include_timestamp=False):
+        """Retrieve a single row of data.
+
+        See :meth:`Table.row() <google.cloud.happybase.table.Table.row>`.
+
+        :type row: str
+        :param row: Row key for the row we are reading from.
+
+        :type columns: list
+        :param columns: (Optional) Iterable containing column names (as
+                        strings). Each column name can be either
+
+                          * an entire column family: ``fam`` or ``fam:``
+                          * a single column: ``fam:col``
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch). If specified, only cells returned before the
+                          the timestamp will be returned.
+
+        :type include_timestamp: bool
+        :param include_timestamp: Flag to indicate if cell timestamps should be
+                                  included with the output.
+
+        :rtype: dict
+        :returns: Dictionary containing all the latest column values in
+                  the row.
+        """
+        filters = []
+        if columns is not None:
+            filters.append(_columns_filter_helper(columns))
+        # versions == 1 since we only want the latest.
+        filter_ = _filter_chain_helper(versions=1, timestamp=timestamp, filters=filters)
+
+        row_data = await self._data_table.read_row(row, row_filter=filter_)
+        if row_data is None:
+            return {}
+
+        return _row_to_dict(row_data, include_timestamp=include_timestamp)
+
+    async def rows(self, rows, columns=None, timestamp=None, include_timestamp=False):
+        """Retrieve multiple rows of data.
+
+        See :meth:`Table.rows() <google.cloud.happybase.table.Table.rows>`.
+
+        :type rows: list
+        :param rows: Iterable of the row keys for the rows we are reading from.
+
+        :type columns: list
+        :param columns: (Optional) Iterable containing column names (as
+                        strings). Each column name can be either
+
+                          * an entire column family: ``fam`` or ``fam:``
+                          * a single column: ``fam:col``
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch). If specified, only cells returned before (or
+                          at) the timestamp will be returned.
+
+        :type include_timestamp: bool
+        :param include_timestamp: Flag to indicate if cell timestamps should be
+                                  included with the output.
+
+        :rtype: list
+        :returns: A list of pairs, where the first is the row key and the
+                  second is a dictionary with the filtered values returned.
+        """
+        rows = list(rows)
+        if not rows:
+            # Avoid round-trip if the result is empty anyway
+            return []
+
+        filters = []
+        if columns is not None:
+            filters.append(_columns_filter_helper(columns))
+        # versions == 1 since we only want the latest.
+        filter_ = _filter_chain_helper(versions=1, timestamp=timestamp, filters=filters)
+
+        query = ReadRowsQuery(row_keys=rows, row_filter=filter_)
+        rows_data = await self._data_table.read_rows(query)
+        return [
+            (row_data.row_key, _row_to_dict(row_data, include_timestamp))
+            for row_data in rows_data
+        ]
+
+    async def scan(
+        self,
+        row_start=None,
+        row_stop=None,
+        row_prefix=None,
+        columns=None,
+        timestamp=None,
+        include_timestamp=False,
+        limit=None,
+        **kwargs
+    ):
+        """Create a scanner for data in this table.
+
+        This method returns an asynchronous generator that can be used for
+        looping over the matching rows with ``async for``. The rows are
+        streamed, so they are yielded as they are received. See
+        :meth:`Table.scan() <google.cloud.happybase.table.Table.scan>` for
+        the arguments.
+
+        :type row_start: str
+        :param row_start: (Optional) Row key where the scanner should start
+                          (includes ``row_start``).
+
+        :type row_stop: str
+        :param row_stop: (Optional) Row key where the scanner should stop
+                         (excludes ``row_stop``).
+
+        :type row_prefix: str
+        :param row_prefix: (Optional) Prefix to match row keys.
+
+        :type columns: list
+        :param columns: (Optional) Iterable containing column names (as
+                        strings). Each column name can be either
+
+                          * an entire column family: ``fam`` or ``fam:``
+                          * a single column: ``fam:col``
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch). If specified, only cells returned before (or
+                          at) the timestamp will be returned.
+
+        :type include_timestamp: bool
+        :param include_timestamp: Flag to indicate if cell timestamps should be
+                                  included with the output.
+
+        :type limit: int
+        :param limit: (Optional) Maximum number of rows to return.
+
+        :type kwargs: dict
+        :param kwargs: Remaining keyword arguments. Provided for HappyBase
+                       compatibility.
+
+        :rtype: tuple
+        :returns: (Rather, yields) pairs of row key and the dictionary of
+                  values encountered in that row.
+        :raises: If ``limit`` is set but non-positive, or if ``row_prefix`` is
+                 used with row start/stop,
+                 :class:`TypeError <exceptions.TypeError>` if a string
+                 ``filter`` is used.
+        """
+        row_start, row_stop, filter_chain = _scan_filter_helper(
+            row_start, row_stop, row_prefix, columns, timestamp, limit, kwargs
+        )
+
+        query = ReadRowsQuery(
+            row_ranges=RowRange(start_key=row_start, end_key=row_stop),
+            limit=limit,
+            row_filter=filter_chain,
+        )
+        rows_stream = await self._data_table.read_rows_stream(query)
+        async for row_data in rows_stream:
+            yield (row_data.row_key, _row_to_dict(row_data, include_timestamp))
+
+    async def put(self, row, data, timestamp=None, wal=_WAL_SENTINEL):
+        """Insert data into a row in this table.
+
+        See :meth:`Table.put() <google.cloud.happybase.table.Table.put>`.
+
+        :type row: str
+        :param row: The row key where the mutation will be "put".
+
+        :type data: dict
+        :param data: Dictionary containing the data to be inserted. The keys
+                     are columns names (of the form ``fam:col``) and the values
+                     are strings (bytes) to be stored in those columns.
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch) that the mutation will be applied at.
+
+        :type wal: object
+        :param wal: Unused parameter (Boolean for using the HBase Write Ahead
+                    Log). Provided for compatibility with HappyBase, but
+                    irrelevant for Cloud Bigtable since it does not have a
+                    Write Ahead Log.
+        """
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        await self._mutate_row(row, _put_mutations(data), timestamp)
+
+    async def delete(self, row, columns=None, timestamp=None, wal=_WAL_SENTINEL):
+        """Delete data from a row in this table.
+
+        See :meth:`Table.delete() <google.cloud.happybase.table.Table.delete>`.
+
+        :type row: str
+        :param row: The row key where the delete will occur.
+
+        :type columns: list
+        :param columns: (Optional) Iterable containing column names (as
+                        strings). Each column name can be either
+
+                          * an entire column family: ``fam`` or ``fam:``
+                          * a single column: ``fam:col``
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch) that the mutation will be applied at.
+
+        :type wal: object
+        :param wal: Unused parameter (Boolean for using the HBase Write Ahead
+                    Log). Provided for compatibility with HappyBase, but
+                    irrelevant for Cloud Bigtable since it does not have a
+                    Write Ahead Log.
+        """
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        _, delete_range = _convert_timestamp(timestamp)
+        await self._mutate_row(row, _delete_mutations(columns, delete_range), timestamp)
+
+    async def _mutate_row(self, row, mutations, timestamp):
+        """Send mutations for a single row without going through a batch.
+
+        Mutations which don't fit in a single request are sent by an
+        :class:`AsyncBatch`, which splits them.
+
+        :type row: str
+        :param row: The row key the mutations apply to.
+
+        :type mutations: list
+        :param mutations: List of tuples describing the mutations (as
+                          created by a batch).
+
+        :type timestamp: int
+        :param timestamp: Timestamp (in milliseconds since the epoch) that
+                          the mutations will be applied at (or :data:`None`).
+
+        :raises: :class:`~google.api_core.exceptions.GoogleAPICallError` if
+                 the mutations could not be applied.
+        """
+        if not mutations:
+            return
+
+        if len(mutations) > _MAX_REQUEST_MUTATIONS:
+            batch = self.batch(timestamp=timestamp, transaction=True)
+            batch._add_mutations(row, mutations)
+            for _, error in await batch.send():
+                raise error
+            return
+
+        await self._data_table.mutate_row(row, _to_data_mutations(mutations, timestamp))
+
+    def batch(
+        self, timestamp=None, batch_size=None, transaction=False, wal=_WAL_SENTINEL
+    ):
+        """Create a new batch operation for this table.
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch) that all mutations will be applied at.
+
+        :type batch_size: int
+        :param batch_size: (Optional) The maximum number of mutations to allow
+                           to accumulate before committing them.
+
+        :type transaction: bool
+        :param transaction: Flag indicating if the mutations should be sent
+                            transactionally or not. If ``transaction=True`` and
+                            an error occurs while an :class:`AsyncBatch` is
+                            active, then none of the accumulated mutations will
+                            be committed. If ``batch_size`` is set, the
+                            mutation can't be transactional.
+
+        :type wal: object
+        :param wal: Unused parameter (to be passed to the created batch).
+                    Provided for compatibility with HappyBase, but irrelevant
+                    for Cloud Bigtable since it does not have a Write Ahead
+                    Log.
+
+        :rtype: :class:`AsyncBatch`
+        :returns: A batch bound to this table.
+        """
+        return AsyncBatch(
+            self,
+            timestamp=timestamp,
+            batch_size=batch_size,
+            transaction=transaction,
+            wal=wal,
+        )
+
+    async def counter_inc(self, row, column, value=1):
+        """Atomically increment a counter column.
+
+        If the counter column does not exist, it is automatically initialized
+        to ``0`` before being incremented.
+
+        :type row: str
+        :param row: Row key for the row we are incrementing a counter in.
+
+        :type column: str
+        :param column: Column we are incrementing a value in; of the
+                       form ``fam:col``.
+
+        :type value: int
+        :param value: Amount to increment the counter by. (If negative,
+                      this is equivalent to decrement.)
+
+        :rtype: int
+        :returns: Counter value after incrementing.
+        :raises: :class:`ValueError <exceptions.ValueError>` if the column
+                 does not have a qualifier or if the server does not return
+                 exactly one modified cell.
+        """
+        column_family_id, column_qualifier = _parse_column(column)
+        if column_qualifier is None:
+            raise ValueError("Counter column must include a qualifier", column)
+
+        row_data = await self._data_table.read_modify_write_row(
+            row, IncrementRule(column_family_id, column_qualifier, value)
+        )
+        cells = row_data.get_cells(column_family_id, column_qualifier)
+        # Make sure there is exactly one cell in the column.
+        if len(cells) != 1:
+            raise ValueError("Expected server to return one modified cell.")
+        (int_value,) = _UNPACK_I64(cells[0].value)
+        return int_value
+
+    async def counter_dec(self, row, column, value=1):
+        """Atomically decrement a counter column.
+
+        If the counter column does not exist, it is automatically initialized
+        to ``0`` before being decremented.
+
+        :type row: str
+        :param row: Row key for the row we are decrementing a counter in.
+
+        :type column: str
+        :param column: Column we are decrementing a value in; of the
+                       form ``fam:col``.
+
+        :type value: int
+        :param value: Amount to decrement the counter by. (If negative,
+                      this is equivalent to increment.)
+
+        :rtype: int
+        :returns: Counter value after decrementing.
+        """
+        return await self.counter_inc(row, column, -value)
+
+
+class AsyncBatch(object):
+    """Asyncio batch class for accumulating mutations.
+
+    Behaves like :class:`Batch <google.cloud.happybase.batch.Batch>`, except
+    that :meth:`put`, :meth:`delete` and :meth:`send` are coroutines and
+    that it is used as an asynchronous context manager::
+
+        async with table.batch() as batch:
+            await batch.put(b"row-key", {b"cf:col": b"value"})
+
+    :type table: :class:`AsyncTable`
+    :param table: The table where mutations will be applied.
+
+    :type timestamp: int
+    :param timestamp: (Optional) Timestamp (in milliseconds since the epoch)
+                      that all mutations will be applied at.
+
+    :type batch_size: int
+    :param batch_size: (Optional) The maximum number of mutations to allow
+                       to accumulate before committing them.
+
+    :type transaction: bool
+    :param transaction: Flag indicating if the mutations should be sent
+                        transactionally or not. If ``transaction=True`` and
+                        an error occurs while an :class:`AsyncBatch` is
+                        active, then none of the accumulated mutations will
+                        be committed. If ``batch_size`` is set, the mutation
+                        can't be transactional.
+
+    :type wal: object
+    :param wal: Unused parameter (Boolean for using the HBase Write Ahead Log).
+                Provided for compatibility with HappyBase, but irrelevant for
+                Cloud Bigtable since it does not have a Write Ahead Log.
+
+    :raises: :class:`TypeError <exceptions.TypeError>` if ``batch_size``
+             is set and ``transaction=True``.
+             :class:`ValueError <exceptions.ValueError>` if ``batch_size``
+             is not positive.
+    """
+
+    def __init__(
+        self,
+        table,
+        timestamp=None,
+        batch_size=None,
+        transaction=False,
+        wal=_WAL_SENTINEL,
+    ):
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        if batch_size is not None:
+            if transaction:
+                raise TypeError(
+                    "When batch_size is set, a Batch cannot be " "transactional"
+                )
+            if batch_size <= 0:
+                raise ValueError("batch_size must be positive")
+
+        self._table = table
+        self._batch_size = batch_size
+        self._timestamp = timestamp
+        _, self._delete_range = _convert_timestamp(timestamp)
+        self._transaction = transaction
+
+        # Pending mutations, as plain tuples per row key.
+        self._row_map = {}
+        self._mutation_count = 0
+        self._mutation_bytes = 0
+
+    async def send(self):
+        """Send / commit the batch of mutations to the server.
+
+        :rtype: list
+        :returns: Pairs of row key and the exception raised for each row
+                  whose mutations could not be applied.
+        """
+        row_mutations = list(self._row_map.items())
+        if (
+            self._mutation_count <= _MAX_REQUEST_MUTATIONS
+            and self._mutation_bytes <= _MAX_REQUEST_BYTES
+        ):
+            requests = [row_mutations] if row_mutations else []
+        else:
+            requests = _split_requests(row_mutations)
+
+        self._row_map = {}
+        self._mutation_count = 0
+        self._mutation_bytes = 0
+
+        failed_rows = []
+        failed_row_keys = set()
+        for request in requests:
+            # Skip the remaining parts of a split row if a part failed.
+            entries = [
+                RowMutationEntry(
+                    row_key, _to_data_mutations(mutations, self._timestamp)
+                )
+                for row_key, mutations in request
+                if row_key not in failed_row_keys
+            ]
+            if not entries:
+                continue
+
+            try:
+                await self._table._data_table.bulk_mutate_rows(entries)
+            except MutationsExceptionGroup as exc_group:
+                for exc in exc_group.exceptions:
+                    row_key = exc.entry.row_key
+                    failed_rows.append((row_key, exc.__cause__))
+                    failed_row_keys.add(row_key)
+
+        return failed_rows
+
+    def _add_mutations(self, row_key, mutations):
+        """Adds mutations to the pending mutations for a row.
+
+        :type row_key: str
+        :param row_key: The row key the mutations apply to.
+
+        :type mutations: list
+        :param mutations: List of tuples describing the mutations, in the
+                          order they were requested.
+        """
+        self._row_map.setdefault(row_key, []).extend(mutations)
+        self._mutation_count += len(mutations)
+        self._mutation_bytes += sum(_mutation_size(mutation) for mutation in mutations)
+
+    async def _try_send(self):
+        """Send / commit the batch if mutations have exceeded batch size."""
+        if self._batch_size and self._mutation_count >= self._batch_size:
+            await self.send()
+
+    async def put(self, row, data, wal=_WAL_SENTINEL):
+        """Insert data into a row in the table owned by this batch.
+
+        :type row: str
+        :param row: The row key where the mutation will be "put".
+
+        :type data: dict
+        :param data: Dictionary containing the data to be inserted. The keys
+                     are columns names (of the form ``b'fam:col'``) and the
+                     values are strings (bytes) to be stored in those columns.
+
+        :type wal: object
+        :param wal: Unused parameter (to over-ride the default on the
+                    instance). Provided for compatibility with HappyBase, but
+                    irrelevant for Cloud Bigtable since it does not have a
+                    Write Ahead Log.
+        """
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        self._add_mutations(row, _put_mutations(data))
+        await self._try_send()
+
+    async def delete(self, row, columns=None, wal=_WAL_SENTINEL):
+        """Delete data from a row in the table owned by this batch.
+
+        :type row: str
+        :param row: The row key where the delete will occur.
+
+        :type columns: list
+        :param columns: (Optional) Iterable containing column names (as
+                        bytes). Each column name can be either
+
+                          * an entire column family: ``fam`` or ``fam:``
+                          * a single column: ``fam:col``
+
+                        If not used, will delete the entire row.
+
+        :type wal: object
+        :param wal: Unused parameter (to over-ride the default on the
+                    instance). Provided for compatibility with HappyBase, but
+                    irrelevant for Cloud Bigtable since it does not have a
+                    Write Ahead Log.
+
+        :raises: If the delete timestamp range is set on the
+                 current batch, but a full row delete is attempted.
+        """
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        self._add_mutations(row, _delete_mutations(columns, self._delete_range))
+        await self._try_send()
+
+    async def __aenter__(self):
+        """Enter context manager, no set-up required."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Exit context manager, sending the pending mutations.
+
+        If the batch is transactional and an exception occurred, the
+        mutations are dropped instead.
+        """
+        if self._transaction and exc_type is not None:
+            return
+
+        await self.send()
+
+
+def _to_data_mutations(mutations, timestamp):
+    """Convert pending mutations to data client mutations.
+
+    :type mutations: list
+    :param mutations: List of tuples describing the mutations (as created by
+                      a batch).
+
+    :type timestamp: int
+    :param timestamp: Timestamp (in milliseconds since the epoch) that the
+                      mutations will be applied at (or :data:`None`).
+
+    :rtype: list
+    :returns: List of :class:`~google.cloud.bigtable.data.mutations.Mutation`.
+    """
+    if timestamp is None:
+        put_micros = _SERVER_SIDE_TIMESTAMP
+        delete_end_micros = None
+    else:
+        put_micros = 1000 * timestamp
+        # Deletes go up to and including the timestamp, see
+        # _convert_timestamp().
+        delete_end_micros = put_micros + 1000
+
+    result = []
+    for mutation in mutations:
+        kind = mutation[0]
+        if kind == _SET_CELL:
+            _, column_family_id, column_qualifier, value = mutation
+            result.append(
+                SetCell(
+                    column_family_id,
+                    column_qualifier,
+                    value,
+                    timestamp_micros=put_micros,
+                )
+            )
+        elif kind == _DELETE_CELL:
+            _, column_family_id, column_qualifier = mutation
+            result.append(
+                DeleteRangeFromColumn(
+                    column_family_id,
+                    column_qualifier,
+                    end_timestamp_micros=delete_end_micros,
+                )
+            )
+        elif kind == _DELETE_FAMILY:
+            result.append(DeleteAllFromFamily(mutation[1]))
+        else:
+            result.append(DeleteAllFromRow())
+    return result
+
+
+def _row_to_dict(row_data, include_timestamp=False):
+    """Convert a data client row to a dictionary.
+
+    Assumes only the latest value in each column is needed, like
+    :func:`_partial_row_to_dict() \
+        <google.cloud.happybase.table._partial_row_to_dict>`.
+
+    :type row_data: :class:`~google.cloud.bigtable.data.Row`
+    :param row_data: Row returned by a read request.
+
+    :type include_timestamp: bool
+    :param include_timestamp: Flag to indicate if cell timestamps should be
+                              included with the output.
+
+    :rtype: dict
+    :returns: The row data converted to a dictionary.
+    """
+    result = {}
+    for cell in row_data.cells:
+        column = cell.family.encode("utf-8") + b":" + cell.qualifier
+        # Cells of a column are returned newest first.
+        if column in result:
+            continue
+        if include_timestamp:
+            result[column] = (cell.value, cell.timestamp_micros // 1000)
+        else:
+            result[column] = cell.value
+    return result
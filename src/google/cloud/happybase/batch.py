@@ -15,13 +15,16 @@
 """Google Cloud Bigtable HappyBase batch module."""
 
 
+import collections
 import datetime
 import warnings
 
 import six
 
 from google.cloud._helpers import _datetime_from_microseconds
+from google.cloud.bigtable.row import MAX_MUTATIONS
 from google.cloud.bigtable.row_filters import TimestampRange
+from google.rpc import code_pb2
 
 
 _WAL_SENTINEL = object()
@@ -30,6 +33,19 @@ _ONE_MILLISECOND = datetime.timedelta(microseconds=1000)
 _WAL_WARNING = (
     "The wal argument (Write-Ahead-Log) is not " "supported by Cloud Bigtable."
 )
+# Kinds of pending mutations held by a batch before being sent.
+_SET_CELL = "set_cell"
+_DELETE_CELL = "delete_cell"
+_DELETE_FAMILY = "delete_family"
+_DELETE_ROW = "delete_row"
+# Limits on the mutations sent in a single request. Cloud Bigtable rejects
+# requests with more than MAX_MUTATIONS mutations, and the byte limit stays
+# well below the maximum request size to leave room for protobuf overhead.
+_MAX_REQUEST_MUTATIONS = MAX_MUTATIONS
+_MAX_REQUEST_BYTES = 128 * 1024 * 1024
+# Parsed column names, shared by batches and the table filter helpers.
+_COLUMN_CACHE = {}
+_COLUMN_CACHE_SIZE = 1024
 
 
 class Batch(object):
@@ -43,6 +59,16 @@ class Batch(object):
        This behavior is in place to match the behavior in the HappyBase
        HBase / Thrift implementation.
 
+    .. note::
+
+       If the pending mutations exceed the number of mutations (or the
+       size) Cloud Bigtable accepts in a single request, they are split
+       across several requests sent one after the other. The mutations of
+       a single row which is too large are split across consecutive
+       requests, so they are still applied in order, but they are no
+       longer applied atomically. If a part of such a row fails, its
+       remaining parts are not sent.
+
     :type table: :class:`Table <google.cloud.happybase.table.Table>`
     :param table: The table where mutations will be applied.
 
@@ -67,6 +93,21 @@ class Batch(object):
                 Provided for compatibility with HappyBase, but irrelevant for
                 Cloud Bigtable since it does not have a Write Ahead Log.
 
+    :type coalesce: bool
+    :param coalesce: (Optional) Flag indicating if mutations should be
+                     coalesced before they are sent. If ``coalesce=True``,
+                     only the last "put" to each cell in a row is kept and
+                     "put"s which are superseded by a later delete of the
+                     same cell, column family or row are dropped.
+
+    :type flow_controller: :class:`.FlowController`
+    :param flow_controller: (Optional) Flow controller used to limit the
+                            mutations held by this and other batches. When
+                            the limits are reached, a non-transactional batch
+                            holding pending mutations sends them before
+                            waiting. A transactional batch only reserves its
+                            mutations when it is sent.
+
     :raises: :class:`TypeError <exceptions.TypeError>` if ``batch_size``
              is set and ``transaction=True``.
              :class:`ValueError <exceptions.ValueError>` if ``batch_size``
@@ -80,6 +121,8 @@ class Batch(object):
         batch_size=None,
         transaction=False,
         wal=_WAL_SENTINEL,
+        coalesce=False,
+        flow_controller=None,
     ):
         if wal is not _WAL_SENTINEL:
             warnings.warn(_WAL_WARNING)
@@ -94,55 +137,209 @@ class Batch(object):
 
         self._table = table
         self._batch_size = batch_size
-        self._timestamp = self._delete_range = None
-
-        # Timestamp is in milliseconds, convert to microseconds.
-        if timestamp is not None:
-            self._timestamp = _datetime_from_microseconds(1000 * timestamp)
-            # For deletes, we get the very next timestamp (assuming timestamp
-            # granularity is milliseconds). This is because HappyBase users
-            # expect HBase deletes to go **up to** and **including** the
-            # timestamp while Cloud Bigtable Time Ranges **exclude** the
-            # final timestamp.
-            next_timestamp = self._timestamp + _ONE_MILLISECOND
-            self._delete_range = TimestampRange(end=next_timestamp)
+        self._timestamp, self._delete_range = _convert_timestamp(timestamp)
 
         self._transaction = transaction
+        self._coalesce = coalesce
+        self._flow_controller = flow_controller
 
-        # Internal state for tracking mutations.
+        # Internal state for tracking mutations. Pending mutations are kept
+        # as plain tuples per row key and are only turned into low-level
+        # rows when the batch is sent.
         self._row_map = {}
         self._mutation_count = 0
+        # Approximate size (in bytes) of the pending mutations. Mutations
+        # dropped by coalescing are still counted.
+        self._mutation_bytes = 0
+        # Mutations reserved with the flow controller, released after send.
+        self._reserved_mutations = 0
+        self._reserved_bytes = 0
+        # Mutations sent, and rows which failed, when the flow controller
+        # forced the batch to be sent early. Both are reported by the next
+        # send.
+        self._sent_mutation_count = 0
+        self._failed_rows = []
 
     def send(self):
-        """Send / commit the batch of mutations to the server."""
-        table = self._table._low_level_table
-        table.mutate_rows(list(self._row_map.values()))
+        """Send / commit the batch of mutations to the server.
+
+        :rtype: list
+        :returns: Pairs of row key and :class:`~google.rpc.status_pb2.Status`
+                  for each row whose mutations could not be applied
+                  (including the rows of earlier sends forced by the flow
+                  controller).
+        """
+        if self._transaction and self._row_map:
+            self._reserve(self._mutation_count, self._mutation_bytes)
+
+        row_mutations = [
+            (row_key, self._pending_mutations(row_key)) for row_key in self._row_map
+        ]
+        if (
+            self._mutation_count <= _MAX_REQUEST_MUTATIONS
+            and self._mutation_bytes <= _MAX_REQUEST_BYTES
+        ):
+            requests = [row_mutations] if row_mutations else []
+        else:
+            requests = _split_requests(row_mutations)
 
         self._row_map.clear()
         self._mutation_count = 0
+        self._mutation_bytes = 0
+        reserved = (self._reserved_mutations, self._reserved_bytes)
+        self._reserved_mutations = self._reserved_bytes = 0
+        failed_rows = self._failed_rows
+        self._failed_rows = []
+        self._sent_mutation_count = 0
+
+        try:
+            return failed_rows + self._send_requests(requests)
+        finally:
+            if self._flow_controller is not None:
+                self._flow_controller.release(*reserved)
+
+    def discard(self):
+        """Drop the pending mutations without sending them.
+
+        Any mutations reserved with the flow controller are released.
+        """
+        self._row_map.clear()
+        self._mutation_count = 0
+        self._mutation_bytes = 0
+        reserved = (self._reserved_mutations, self._reserved_bytes)
+        self._reserved_mutations = self._reserved_bytes = 0
+
+        if self._flow_controller is not None:
+            self._flow_controller.release(*reserved)
+
+    def _send_requests(self, requests):
+        """Send groups of row mutations, one request after the other.
+
+        :type requests: list
+        :param requests: List of requests, each a list of pairs of row key
+                         and pending mutations for that row.
+
+        :rtype: list
+        :returns: Pairs of row key and :class:`~google.rpc.status_pb2.Status`
+                  for each row whose mutations could not be applied.
+        """
+        table = self._table._low_level_table
+        failed_rows = []
+        failed_row_keys = set()
+        for request in requests:
+            # Skip the remaining parts of a split row if a part failed.
+            request = [
+                (row_key, mutations)
+                for row_key, mutations in request
+                if row_key not in failed_row_keys
+            ]
+            if not request:
+                continue
+
+            rows = [
+                self._make_row(row_key, mutations) for row_key, mutations in request
+            ]
+            statuses = table.mutate_rows(rows)
+            for (row_key, _), status in zip(request, statuses):
+                if status.code != code_pb2.OK:
+                    failed_rows.append((row_key, status))
+                    failed_row_keys.add(row_key)
+
+        return failed_rows
+
+    def _pending_mutations(self, row_key):
+        """Get the pending mutations for a row, in the order to apply them.
+
+        :type row_key: str
+        :param row_key: The row key for a row stored in the map.
+
+        :rtype: list
+        :returns: The pending mutations for the row.
+        """
+        mutations = self._row_map[row_key]
+        if self._coalesce:
+            return list(six.itervalues(mutations))
+        return mutations
+
+    def _reserve(self, num_mutations, num_bytes):
+        """Reserve mutations with the flow controller (if there is one).
+
+        :type num_mutations: int
+        :param num_mutations: The number of mutations to reserve.
+
+        :type num_bytes: int
+        :param num_bytes: The size of the mutations to reserve.
+
+        :raises: :class:`.FlowControlLimitExceeded` if the flow controller
+                 can't reserve the mutations.
+        """
+        flow_controller = self._flow_controller
+        if flow_controller is None:
+            return
+
+        if not flow_controller.try_acquire(num_mutations, num_bytes):
+            # Don't wait while holding reserved mutations that are not being
+            # sent, since nothing else would release them.
+            if self._reserved_mutations and not self._transaction:
+                sent_mutation_count = self._sent_mutation_count + self._mutation_count
+                self._failed_rows = self.send()
+                self._sent_mutation_count = sent_mutation_count
+            flow_controller.acquire(num_mutations, num_bytes)
+
+        self._reserved_mutations += num_mutations
+        self._reserved_bytes += num_bytes
 
     def _try_send(self):
         """Send / commit the batch if mutations have exceeded batch size."""
         if self._batch_size and self._mutation_count >= self._batch_size:
             self.send()
 
-    def _get_row(self, row_key):
-        """Gets a row that will hold mutations.
-
-        If the row is not already cached on the current batch, a new row will
-        be created.
+    def _make_row(self, row_key, mutations):
+        """Creates a low-level row holding the pending mutations for a key.
 
         :type row_key: str
         :param row_key: The row key for a row stored in the map.
 
-        :rtype: :class:`~google.cloud.bigtable.row.Row`
-        :returns: The newly created or stored row that will hold mutations.
+        :type mutations: list
+        :param mutations: The pending mutations for the row.
+
+        :rtype: :class:`~google.cloud.bigtable.row.DirectRow`
+        :returns: The newly created row holding the mutations.
         """
-        if row_key not in self._row_map:
-            table = self._table._low_level_table
-            self._row_map[row_key] = table.row(row_key)
+        row_object = self._table._low_level_table.row(row_key)
+        _apply_mutations(row_object, mutations, self._timestamp, self._delete_range)
+        return row_object
 
-        return self._row_map[row_key]
+    def _add_mutations(self, row_key, mutations):
+        """Adds mutations to the pending mutations for a row.
+
+        If the batch coalesces mutations, they are merged with the mutations
+        already pending for the row.
+
+        :type row_key: str
+        :param row_key: The row key the mutations apply to.
+
+        :type mutations: list
+        :param mutations: List of tuples describing the mutations, in the
+                          order they were requested.
+        """
+        if not mutations:
+            return
+
+        num_bytes = sum(_mutation_size(mutation) for mutation in mutations)
+        if not self._transaction:
+            self._reserve(len(mutations), num_bytes)
+
+        self._mutation_bytes += num_bytes
+        if self._coalesce:
+            row_mutations = self._row_map.setdefault(row_key, collections.OrderedDict())
+            num_before = len(row_mutations)
+            for mutation in mutations:
+                _coalesce_mutation(row_mutations, mutation)
+            self._mutation_count += len(row_mutations) - num_before
+        else:
+            self._row_map.setdefault(row_key, []).extend(mutations)
+            self._mutation_count += len(mutations)
 
     def put(self, row, data, wal=_WAL_SENTINEL):
         """Insert data into a row in the table owned by this batch.
@@ -164,59 +361,9 @@ class Batch(object):
         if wal is not _WAL_SENTINEL:
             warnings.warn(_WAL_WARNING)
 
-        row_object = self._get_row(row)
-        # Make sure all the keys are valid before beginning
-        # to add mutations.
-        column_pairs = _get_column_pairs(six.iterkeys(data), require_qualifier=True)
-
-        # use key that was passed. Reconstructing it can cause it to not
-        # be found if there is an encoding difference.
-        for key, column_pair in zip(six.iterkeys(data), column_pairs):
-            column_family_id, column_qualifier = column_pair
-            value = data[key]
-            if not isinstance(value, six.binary_type):
-                raise ValueError("Provided value should be a byte string.")
-            row_object.set_cell(
-                column_family_id, column_qualifier, value, timestamp=self._timestamp
-            )
-
-        self._mutation_count += len(data)
+        self._add_mutations(row, _put_mutations(data))
         self._try_send()
 
-    def _delete_columns(self, columns, row_object):
-        """Adds delete mutations for a list of columns and column families.
-
-        :type columns: list
-        :param columns: Iterable containing column names (as
-                        strings). Each column name can be either
-
-                          * an entire column family: ``fam`` or ``fam:``
-                          * a single column: ``fam:col``
-
-        :type row_object: :class:`~google.cloud.bigtable.row.Row`
-        :param row_object: The row which will hold the delete mutations.
-
-        :raises: :class:`ValueError <exceptions.ValueError>` if the delete
-                 timestamp range is set on the current batch, but a
-                 column family delete is attempted.
-        """
-        column_pairs = _get_column_pairs(columns)
-        for column_family_id, column_qualifier in column_pairs:
-            if column_qualifier is None:
-                if self._delete_range is not None:
-                    raise ValueError(
-                        "The Cloud Bigtable API does not support "
-                        "adding a timestamp to "
-                        '"DeleteFromFamily" '
-                    )
-                row_object.delete_cells(
-                    column_family_id, columns=row_object.ALL_COLUMNS
-                )
-            else:
-                row_object.delete_cell(
-                    column_family_id, column_qualifier, time_range=self._delete_range
-                )
-
     def delete(self, row, columns=None, wal=_WAL_SENTINEL):
         """Delete data from a row in the table owned by this batch.
 
@@ -244,22 +391,7 @@ class Batch(object):
         if wal is not _WAL_SENTINEL:
             warnings.warn(_WAL_WARNING)
 
-        row_object = self._get_row(row)
-
-        if columns is None:
-            # Delete entire row.
-            if self._delete_range is not None:
-                raise ValueError(
-                    "The Cloud Bigtable API does not support "
-                    'adding a timestamp to "DeleteFromRow" '
-                    "mutations"
-                )
-            row_object.delete()
-            self._mutation_count += 1
-        else:
-            self._delete_columns(columns, row_object)
-            self._mutation_count += len(columns)
-
+        self._add_mutations(row, _delete_mutations(columns, self._delete_range))
         self._try_send()
 
     def __enter__(self):
@@ -292,12 +424,311 @@ class Batch(object):
         self.send()
 
 
+def _convert_timestamp(timestamp):
+    """Convert a HappyBase timestamp for use in mutations.
+
+    :type timestamp: int
+    :param timestamp: Timestamp (in milliseconds since the epoch) that
+                      mutations will be applied at (or :data:`None`).
+
+    :rtype: tuple
+    :returns: Pair of the timestamp for "put" mutations (as a
+              :class:`datetime.datetime`) and the time range for delete
+              mutations, both :data:`None` if ``timestamp`` is not set.
+    """
+    if timestamp is None:
+        return None, None
+
+    # Timestamp is in milliseconds, convert to microseconds.
+    put_timestamp = _datetime_from_microseconds(1000 * timestamp)
+    # For deletes, we get the very next timestamp (assuming timestamp
+    # granularity is milliseconds). This is because HappyBase users
+    # expect HBase deletes to go **up to** and **including** the
+    # timestamp while Cloud Bigtable Time Ranges **exclude** the
+    # final timestamp.
+    next_timestamp = put_timestamp + _ONE_MILLISECOND
+    return put_timestamp, TimestampRange(end=next_timestamp)
+
+
+def _put_mutations(data):
+    """Creates "put" mutations for the data to insert in a row.
+
+    :type data: dict
+    :param data: Dictionary containing the data to be inserted. The keys
+                 are columns names (of the form ``b'fam:col'``) and the
+                 values are strings (bytes) to be stored in those columns.
+
+    :rtype: list
+    :returns: List of tuples describing the "put" mutations.
+    :raises: :class:`ValueError <exceptions.ValueError>` if a column is
+             not of the expected format or a value is not bytes.
+    """
+    # Make sure all the keys are valid before beginning
+    # to add mutations.
+    column_pairs = _get_column_pairs(six.iterkeys(data), require_qualifier=True)
+
+    # use key that was passed. Reconstructing it can cause it to not
+    # be found if there is an encoding difference.
+    mutations = []
+    for key, column_pair in zip(six.iterkeys(data), column_pairs):
+        column_family_id, column_qualifier = column_pair
+        value = data[key]
+        if not isinstance(value, six.binary_type):
+            raise ValueError("Provided value should be a byte string.")
+        mutations.append((_SET_CELL, column_family_id, column_qualifier, value))
+    return mutations
+
+
+def _delete_mutations(columns, delete_range):
+    """Creates delete mutations for a row or for columns in a row.
+
+    :type columns: list
+    :param columns: Iterable containing column names (as
+                    strings). Each column name can be either
+
+                      * an entire column family: ``fam`` or ``fam:``
+                      * a single column: ``fam:col``
+
+                    If :data:`None`, the entire row is deleted.
+
+    :type delete_range: :class:`~google.cloud.bigtable.row_filters.TimestampRange`
+    :param delete_range: The time range cells are deleted in (or
+                         :data:`None`).
+
+    :rtype: list
+    :returns: List of tuples describing the delete mutations.
+    :raises: :class:`ValueError <exceptions.ValueError>` if the delete
+             timestamp range is set, but a row or column family delete is
+             attempted.
+    """
+    if columns is None:
+        # Delete entire row.
+        if delete_range is not None:
+            raise ValueError(
+                "The Cloud Bigtable API does not support "
+                'adding a timestamp to "DeleteFromRow" '
+                "mutations"
+            )
+        return [(_DELETE_ROW,)]
+
+    mutations = []
+    for column_family_id, column_qualifier in _get_column_pairs(columns):
+        if column_qualifier is None:
+            if delete_range is not None:
+                raise ValueError(
+                    "The Cloud Bigtable API does not support "
+                    "adding a timestamp to "
+                    '"DeleteFromFamily" '
+                )
+            mutations.append((_DELETE_FAMILY, column_family_id))
+        else:
+            mutations.append((_DELETE_CELL, column_family_id, column_qualifier))
+    return mutations
+
+
+def _apply_mutations(row_object, mutations, timestamp, delete_range, **kwargs):
+    """Adds mutations to a low-level row.
+
+    :type row_object: :class:`~google.cloud.bigtable.row.Row`
+    :param row_object: The row to add the mutations to.
+
+    :type mutations: list
+    :param mutations: List of tuples describing the mutations.
+
+    :type timestamp: :class:`datetime.datetime`
+    :param timestamp: The timestamp for "put" mutations (or :data:`None`).
+
+    :type delete_range: :class:`~google.cloud.bigtable.row_filters.TimestampRange`
+    :param delete_range: The time range for cell deletes (or :data:`None`).
+
+    :type kwargs: dict
+    :param kwargs: Extra keyword arguments passed with every mutation (e.g.
+                   the ``state`` of a
+                   :class:`~google.cloud.bigtable.row.ConditionalRow`).
+    """
+    for mutation in mutations:
+        kind = mutation[0]
+        if kind == _SET_CELL:
+            _, column_family_id, column_qualifier, value = mutation
+            row_object.set_cell(
+                column_family_id, column_qualifier, value, timestamp=timestamp, **kwargs
+            )
+        elif kind == _DELETE_CELL:
+            _, column_family_id, column_qualifier = mutation
+            row_object.delete_cell(
+                column_family_id, column_qualifier, time_range=delete_range, **kwargs
+            )
+        elif kind == _DELETE_FAMILY:
+            row_object.delete_cells(
+                mutation[1], columns=row_object.ALL_COLUMNS, **kwargs
+            )
+        else:
+            row_object.delete(**kwargs)
+
+
+def _mutation_size(mutation):
+    """Approximate the size of a pending mutation.
+
+    :type mutation: tuple
+    :param mutation: The mutation, as stored in a batch.
+
+    :rtype: int
+    :returns: The combined length of the column family, qualifier and value
+              targeted by the mutation.
+    """
+    return sum(len(part) for part in mutation[1:])
+
+
+def _split_row(mutations):
+    """Split the mutations for a row into parts within the request limits.
+
+    :type mutations: list
+    :param mutations: The pending mutations for a row.
+
+    :rtype: list
+    :returns: Pairs of a list of mutations and their (approximate) size in
+              bytes, in the order the mutations should be applied. A single
+              mutation larger than the byte limit is kept on its own.
+    """
+    parts = []
+    part = []
+    part_bytes = 0
+    for mutation in mutations:
+        num_bytes = _mutation_size(mutation)
+        if part and (
+            len(part) >= _MAX_REQUEST_MUTATIONS
+            or part_bytes + num_bytes > _MAX_REQUEST_BYTES
+        ):
+            parts.append((part, part_bytes))
+            part = []
+            part_bytes = 0
+        part.append(mutation)
+        part_bytes += num_bytes
+
+    parts.append((part, part_bytes))
+    return parts
+
+
+def _split_requests(row_mutations):
+    """Group row mutations into requests within the request limits.
+
+    Rows which don't fit in a single request are split and their parts are
+    put in consecutive requests, so that they are applied in order.
+
+    :type row_mutations: list
+    :param row_mutations: Pairs of row key and pending mutations for that
+                          row.
+
+    :rtype: list
+    :returns: List of requests, each a list of pairs of row key and
+              mutations.
+    """
+    requests = []
+    request = []
+    request_mutations = request_bytes = 0
+    for row_key, mutations in row_mutations:
+        for index, (part, part_bytes) in enumerate(_split_row(mutations)):
+            if request and (
+                index > 0
+                or request_mutations + len(part) > _MAX_REQUEST_MUTATIONS
+                or request_bytes + part_bytes > _MAX_REQUEST_BYTES
+            ):
+                requests.append(request)
+                request = []
+                request_mutations = request_bytes = 0
+            request.append((row_key, part))
+            request_mutations += len(part)
+            request_bytes += part_bytes
+
+    if request:
+        requests.append(request)
+    return requests
+
+
+def _coalesce_mutation(row_mutations, mutation):
+    """Merge a single mutation into the pending mutations for a row.
+
+    A later "put" to a cell replaces an earlier one, and a delete drops
+    every pending "put" (and redundant delete) it covers. Mutations are
+    keyed so that the surviving ones keep the order they were added in.
+
+    :type row_mutations: :class:`collections.OrderedDict`
+    :param row_mutations: The pending mutations for a row, keyed by
+                          the kind and target of each mutation.
+
+    :type mutation: tuple
+    :param mutation: The mutation to be merged. The first element is the
+                     kind of mutation and the remaining elements describe
+                     its target (and value for a "put").
+    """
+    kind = mutation[0]
+    if kind == _DELETE_ROW:
+        row_mutations.clear()
+    elif kind == _DELETE_FAMILY:
+        column_family_id = mutation[1]
+        for key in list(row_mutations):
+            if key[0] != _DELETE_ROW and key[1] == column_family_id:
+                del row_mutations[key]
+    elif kind == _DELETE_CELL:
+        row_mutations.pop((_SET_CELL,) + mutation[1:], None)
+
+    key = mutation[:3]
+    row_mutations.pop(key, None)
+    row_mutations[key] = mutation
+
+
+def _parse_column(column):
+    """Parses a column or column family name into a cached pair.
+
+    The parsed pairs are cached, since the same small set of column names
+    is typically used over and over. The cache holds at most
+    ``_COLUMN_CACHE_SIZE`` entries and is emptied when it fills up.
+
+    :type column: bytes
+    :param column: A column name. Can be either
+
+                     * an entire column family: ``fam`` or ``fam:``
+                     * a single column: ``fam:col``
+
+    :rtype: tuple
+    :returns: Pair of the column family (as a string) and the column
+              qualifier (as bytes, or :data:`None` for a column family).
+    :raises: :class:`ValueError <exceptions.ValueError>` if the column
+             is not of the expected format.
+    """
+    result = _COLUMN_CACHE.get(column)
+    if result is not None:
+        return result
+
+    if isinstance(column, six.binary_type):
+        name = column.decode("utf-8")
+    else:
+        name = column
+
+    # Remove trailing colons (i.e. for standalone column family).
+    if name.endswith(u":"):
+        name = name[:-1]
+    num_colons = name.count(u":")
+    if num_colons == 0:
+        result = (name, None)
+    elif num_colons == 1:
+        column_family_id, column_qualifier = name.split(u":")
+        result = (column_family_id, column_qualifier.encode("utf-8"))
+    else:
+        raise ValueError("Column contains the : separator more than once")
+
+    if len(_COLUMN_CACHE) >= _COLUMN_CACHE_SIZE:
+        _COLUMN_CACHE.clear()
+    _COLUMN_CACHE[column] = result
+    return result
+
+
 def _get_column_pairs(columns, require_qualifier=False):
     """Turns a list of column or column families into parsed pairs.
 
     Turns a column family (``fam`` or ``fam:``) into a pair such
-    as ``['fam', None]`` and turns a column (``fam:col``) into
-    ``['fam', 'col']``.
+    as ``('fam', None)`` and turns a column (``fam:col``) into
+    ``('fam', b'col')``.
 
     :type columns: list
     :param columns: Iterable containing column names (as
@@ -322,31 +753,17 @@ def _get_column_pairs(columns, require_qualifier=False):
     """
     column_pairs = []
     for column in columns:
-        encoded = False
-        if isinstance(column, six.binary_type):
-            encoded = True
-            column = column.decode("utf-8")
-
-        # Remove trailing colons (i.e. for standalone column family).
-        if column.endswith(u":"):
-            column = column[:-1]
-        num_colons = column.count(u":")
-        if num_colons == 0:
-            # column is a column family.
+        column_pair = _parse_column(column)
+        if column_pair[1] is None:
             if require_qualifier:
                 raise ValueError("Column does not contain a qualifier", column)
-            else:
-                column_pairs.append([column, None])
-        elif num_colons == 1:
+        elif not isinstance(column, six.binary_type):
             # The SetCell RPC for BigTable allows the family_name to be a
             # string, but qualifiers should be bytes. If we are passed a
             # ``family_name:column_qualifer`` that isn't encoded, raise.
-            if not encoded:
-                raise ValueError(
-                    "Column expected to be ``bytes`` when specifying a single column."
-                )
-            column_pairs.append(column.split(u":"))
-        else:
-            raise ValueError("Column contains the : separator more than once")
+            raise ValueError(
+                "Column expected to be ``bytes`` when specifying a single column."
+            )
+        column_pairs.append(column_pair)
 
     return column_pairs
@@ -16,6 +16,11 @@
 
 
 import datetime
+import json
+import os
+import tempfile
+import threading
+import time
 import warnings
 
 import six
@@ -61,15 +66,43 @@ _COMPACT_TMPL = (
     "and does not expose an API for it."
 )
 
+INSTANCE_ENV_VAR = "GOOGLE_CLOUD_HAPPYBASE_INSTANCE"
+"""Environment variable naming the instance used by default.
+
+Either an instance ID (in the project inferred from the environment) or a
+full name of the form ``projects/{project}/instances/{instance_id}``.
+"""
+
+INSTANCE_CACHE_ENV_VAR = "GOOGLE_CLOUD_HAPPYBASE_INSTANCE_CACHE"
+"""Environment variable with the path of a file caching the default instance."""
+
+INSTANCE_CACHE_TTL_ENV_VAR = "GOOGLE_CLOUD_HAPPYBASE_INSTANCE_CACHE_TTL"
+"""Environment variable with the lifetime (in seconds) of the cached instance."""
+
+_DEFAULT_INSTANCE_CACHE_TTL = 3600.0
+_DEFAULT_METADATA_TTL = 0
+# Tables cached per name, one for each instance the connection used.
+_MAX_CACHED_TABLE_INSTANCES = 16
+# The default instance, once determined by _get_instance().
+_INSTANCE_CACHE = {}
+_INSTANCE_CACHE_LOCK = threading.Lock()
+
 
 def _get_instance():
     """Gets instance for the default project.
 
-    Creates a client with the inferred credentials and project ID from
-    the local environment. Then uses
+    The instance is determined once per process and then cached. If the
+    :data:`INSTANCE_ENV_VAR` environment variable is set, it names the
+    instance. Otherwise, creates a client with the inferred credentials and
+    project ID from the local environment. Then uses
     :meth:`.bigtable.client.Client.list_instances` to
     get the unique instance owned by the project.
 
+    If :data:`INSTANCE_CACHE_ENV_VAR` is set, the instance found by
+    ``list_instances`` is also stored in that file and re-used by other
+    processes for :data:`INSTANCE_CACHE_TTL_ENV_VAR` seconds (one hour by
+    default).
+
     If the request fails for any reason, or if there isn't exactly one instance
     owned by the project, then this function will fail.
 
@@ -77,10 +110,105 @@ def _get_instance():
     :returns: The unique instance owned by the project inferred from
               the environment.
     :raises ValueError: if there is a failed location or any number of
-                        instances other than one.
+                        instances other than one, or if the instance name in
+                        the environment is invalid.
+    """
+    with _INSTANCE_CACHE_LOCK:
+        instance = _INSTANCE_CACHE.get("instance")
+        if instance is None:
+            instance = _INSTANCE_CACHE["instance"] = _find_instance()
+        return instance
+
+
+def _clear_instance_cache():
+    """Forget the instance cached by :func:`_get_instance` in this process."""
+    with _INSTANCE_CACHE_LOCK:
+        _INSTANCE_CACHE.clear()
+
+
+def _reset_instance_cache_after_fork():
+    """Forget the cached instance in the child process after a fork.
+
+    The instance's client holds gRPC channels which can't be used by the
+    child, so the child determines the instance again. The lock is also
+    replaced, since it may have been held by another thread of the parent.
+    """
+    global _INSTANCE_CACHE_LOCK
+    _INSTANCE_CACHE_LOCK = threading.Lock()
+    _INSTANCE_CACHE.clear()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: NO COVER Python >= 3.7
+    os.register_at_fork(after_in_child=_reset_instance_cache_after_fork)
+
+
+def _find_instance():
+    """Determine the default instance without using the process cache.
+
+    :rtype: :class:`~google.cloud.bigtable.instance.Instance`
+    :returns: The instance named in the environment, cached on disk or
+              found by ``list_instances``.
+    :raises ValueError: if the instance can't be determined.
+    """
+    instance_name = os.environ.get(INSTANCE_ENV_VAR)
+    if instance_name:
+        return _instance_from_name(instance_name)
+
+    client_kwargs = {"admin": True}
+    client = Client(**client_kwargs)
+
+    cache_path = os.environ.get(INSTANCE_CACHE_ENV_VAR)
+    if cache_path:
+        ttl = _instance_cache_ttl()
+        instance_id = _read_instance_cache(cache_path, client.project, ttl)
+        if instance_id is not None:
+            return client.instance(instance_id)
+
+    instance = _list_single_instance(client)
+    if cache_path:
+        _write_instance_cache(cache_path, client.project, instance.instance_id)
+    return instance
+
+
+def _instance_from_name(instance_name):
+    """Create an instance from the name set in the environment.
+
+    :type instance_name: str
+    :param instance_name: An instance ID or a full instance name of the form
+                          ``projects/{project}/instances/{instance_id}``.
+
+    :rtype: :class:`~google.cloud.bigtable.instance.Instance`
+    :returns: The named instance.
+    :raises ValueError: if the name has slashes but is not a full instance
+                        name.
     """
     client_kwargs = {"admin": True}
+    if "/" in instance_name:
+        parts = instance_name.split("/")
+        if len(parts) != 4 or parts[0] != "projects" or parts[2] != "instances":
+            raise ValueError(
+                "Instance name must be of the form "
+                "projects/{project}/instances/{instance_id}",
+                instance_name,
+            )
+        client_kwargs["project"] = parts[1]
+        instance_name = parts[3]
+
     client = Client(**client_kwargs)
+    return client.instance(instance_name)
+
+
+def _list_single_instance(client):
+    """Get the unique instance owned by the client's project.
+
+    :type client: :class:`~google.cloud.bigtable.client.Client`
+    :param client: An admin client for the project.
+
+    :rtype: :class:`~google.cloud.bigtable.instance.Instance`
+    :returns: The unique instance owned by the project.
+    :raises ValueError: if there is a failed location or any number of
+                        instances other than one.
+    """
     instances, failed_locations = client.list_instances()
 
     if failed_locations:
@@ -99,6 +227,134 @@ def _get_instance():
     return instances[0]
 
 
+def _instance_cache_ttl():
+    """Get the lifetime of the instance cached on disk.
+
+    :rtype: float
+    :returns: The lifetime (in seconds) set in the environment, or the
+              default lifetime if it is missing or not a number.
+    """
+    try:
+        return float(
+            os.environ.get(INSTANCE_CACHE_TTL_ENV_VAR, _DEFAULT_INSTANCE_CACHE_TTL)
+        )
+    except ValueError:
+        return _DEFAULT_INSTANCE_CACHE_TTL
+
+
+def _read_instance_cache(cache_path, project, ttl):
+    """Read the instance ID cached on disk.
+
+    :type cache_path: str
+    :param cache_path: Path of the cache file.
+
+    :type project: str
+    :param project: The project the instance must belong to.
+
+    :type ttl: float
+    :param ttl: The lifetime (in seconds) of the cached instance.
+
+    :rtype: str
+    :returns: The cached instance ID, or :data:`None` if the file is
+              missing, invalid, expired or for another project.
+    """
+    try:
+        with open(cache_path) as file_obj:
+            cached = json.load(file_obj)
+        if cached["project"] != project:
+            return None
+        if time.time() - cached["timestamp"] > ttl:
+            return None
+        return cached["instance_id"]
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_instance_cache(cache_path, project, instance_id):
+    """Store the instance ID on disk for other processes.
+
+    The file is replaced atomically. Failures are ignored, since the
+    instance can always be determined again.
+
+    :type cache_path: str
+    :param cache_path: Path of the cache file.
+
+    :type project: str
+    :param project: The project the instance belongs to.
+
+    :type instance_id: str
+    :param instance_id: The ID of the instance.
+    """
+    cached = {"project": project, "instance_id": instance_id, "timestamp": time.time()}
+    try:
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(cache_path))
+        )
+    except (IOError, OSError):
+        return
+
+    try:
+        with os.fdopen(file_descriptor, "w") as file_obj:
+            json.dump(cached, file_obj)
+        # os.rename() can't overwrite an existing file on Windows.
+        getattr(os, "replace", os.rename)(temp_path, cache_path)
+    except (IOError, OSError):
+        os.remove(temp_path)
+
+
+class _MetadataCache(object):
+    """Thread-safe cache of metadata which expires after a fixed time.
+
+    :type ttl: float
+    :param ttl: Time (in seconds) values are cached for. If :data:`None`,
+                values are cached until they are invalidated; if ``0``,
+                values are not cached.
+    """
+
+    def __init__(self, ttl):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # Dictionary of keys to pairs of the value and the time it was loaded.
+        self._entries = {}
+
+    def get(self, key, load):
+        """Get a cached value, loading it if it is missing or expired.
+
+        :type key: object
+        :param key: The key of the value.
+
+        :type load: callable
+        :param load: Callable (with no arguments) returning the value.
+
+        :rtype: object
+        :returns: The cached or loaded value.
+        """
+        if self._ttl == 0:
+            return load()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            value, loaded_at = entry
+            if self._ttl is None or time.time() - loaded_at < self._ttl:
+                return value
+
+        value = load()
+        with self._lock:
+            self._entries[key] = (value, time.time())
+        return value
+
+    def invalidate(self, *keys):
+        """Drop cached values.
+
+        :type keys: tuple
+        :param keys: The keys of the values to drop.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
 class Connection(object):
     """Connection to Cloud Bigtable backend.
 
@@ -130,12 +386,33 @@ class Connection(object):
                     Then that client is used to retrieve all the instances
                     owned by the client's project.
 
+    :type flow_controller: :class:`.FlowController`
+    :param flow_controller: (Optional) Flow controller limiting the
+                            outstanding mutations of every batch created from
+                            tables of this connection. The same flow
+                            controller can be shared by several connections.
+
+    :type metadata_ttl: float
+    :param metadata_ttl: (Optional) Time (in seconds) the results of
+                         :meth:`tables` and :meth:`Table.families() \
+                             <google.cloud.happybase.table.Table.families>`
+                         are cached for. Tables created or deleted through
+                         this connection are reflected right away, but
+                         changes made elsewhere may take this long to be
+                         seen. If :data:`None`, results are cached until
+                         invalidated by this connection. Defaults to ``0``,
+                         so results are not cached.
+
     :type kwargs: dict
     :param kwargs: Remaining keyword arguments. Provided for HappyBase
                    compatibility.
+
+    :raises: :class:`ValueError <exceptions.ValueError>` if ``metadata_ttl``
+             is negative.
     """
 
     _instance = None
+    _flow_controller = None
 
     def __init__(
         self,
@@ -143,6 +420,8 @@ class Connection(object):
         table_prefix=None,
         table_prefix_separator="_",
         instance=None,
+        flow_controller=None,
+        metadata_ttl=_DEFAULT_METADATA_TTL,
         **kwargs
     ):
         self._handle_legacy_args(kwargs)
@@ -163,12 +442,23 @@ class Connection(object):
                 type(table_prefix_separator),
             )
 
+        if metadata_ttl is not None and metadata_ttl < 0:
+            raise ValueError("metadata_ttl must not be negative")
+
         self.table_prefix = table_prefix
         self.table_prefix_separator = table_prefix_separator
 
         if instance is None:
             instance = _get_instance()
         self._instance = instance
+        self._flow_controller = flow_controller
+        self._metadata_cache = _MetadataCache(metadata_ttl)
+        self._tables_lock = threading.Lock()
+        # Dictionary of table names to lists of pairs of an instance and the
+        # table created with it, the most recently used last. A connection
+        # from a pool moves between the instances owning the pool's
+        # channels, so a table is kept for each of them.
+        self._tables = {}
 
         if autoconnect:
             self.open()
@@ -235,12 +525,29 @@ class Connection(object):
         :type use_prefix: bool
         :param use_prefix: Whether to use the table prefix (if any).
 
+        The table is cached, so calling this again with the same name
+        (while the connection uses the same instance) returns the same table
+        instance.
+
         :rtype: :class:`Table <google.cloud.happybase.table.Table>`
         :returns: Table instance owned by this connection.
         """
         if use_prefix:
             name = self._table_name(name)
-        return Table(name, self)
+
+        instance = self._instance
+        with self._tables_lock:
+            cached = self._tables.setdefault(name, [])
+            for index, (cached_instance, table) in enumerate(cached):
+                if cached_instance is instance:
+                    cached.append(cached.pop(index))
+                    return table
+
+            table = Table(name, self)
+            cached.append((instance, table))
+            if len(cached) > _MAX_CACHED_TABLE_INSTANCES:
+                del cached[0]
+            return table
 
     def tables(self):
         """Return a list of table names available to this connection.
@@ -255,13 +562,14 @@ class Connection(object):
             If ``table_prefix`` is set on this connection, only returns the
             table names which match that prefix.
 
+        .. note::
+
+            The list is cached for ``metadata_ttl`` seconds (if set).
+
         :rtype: list
         :returns: List of string table names.
         """
-        low_level_table_instances = self._instance.list_tables()
-        table_names = [
-            table_instance.table_id for table_instance in low_level_table_instances
-        ]
+        table_names = list(self._metadata_cache.get("tables", self._list_tables))
 
         # Filter using prefix, and strip prefix from names
         if self.table_prefix is not None:
@@ -273,6 +581,60 @@ class Connection(object):
 
         return table_names
 
+    def _list_tables(self):
+        """List the names of all tables in the instance.
+
+        :rtype: tuple
+        :returns: The names of the tables, including any table prefix.
+        """
+        return tuple(
+            table_instance.table_id for table_instance in self._instance.list_tables()
+        )
+
+    def _table_families(self, name, load):
+        """Get the (cached) column families of a table.
+
+        :type name: str
+        :param name: The name of the table (including any table prefix).
+
+        :type load: callable
+        :param load: Callable (with no arguments) retrieving the column
+                     families.
+
+        :rtype: dict
+        :returns: Mapping from column family name to garbage collection rule
+                  for a column family.
+        """
+        return dict(self._metadata_cache.get(("families", name), load))
+
+    def _invalidate_table(self, name):
+        """Drop the cached metadata of a created or deleted table.
+
+        :type name: str
+        :param name: The name of the table (including any table prefix).
+        """
+        self._metadata_cache.invalidate("tables", ("families", name))
+        with self._tables_lock:
+            self._tables.pop(name, None)
+
+    def warmup(self, tables=None):
+        """Prime the connection's channel before it serves requests.
+
+        The first request sent over a channel pays for the TLS handshake,
+        the channel setup and the routing to the table. This sends a cheap
+        keys-only read (of at most one row) to each table, so that the
+        cost is paid up front rather than by the first requests.
+
+        :type tables: list
+        :param tables: (Optional) Names of the tables to send a read to
+                       (with the table prefix added, as in :meth:`table`).
+                       Defaults to all tables returned by :meth:`tables`.
+        """
+        if tables is None:
+            tables = self.tables()
+        for name in tables:
+            self.table(name)._warmup()
+
     def create_table(self, name, families):
         """Create a table.
 
@@ -339,6 +701,8 @@ class Connection(object):
                 raise AlreadyExists(name)
             else:
                 raise
+        finally:
+            self._invalidate_table(name)
 
     def delete_table(self, name, disable=False):
         """Delete the specified table.
@@ -357,7 +721,10 @@ class Connection(object):
             warnings.warn(_DISABLE_DELETE_MSG)
 
         name = self._table_name(name)
-        _LowLevelTable(name, self._instance).delete()
+        try:
+            _LowLevelTable(name, self._instance).delete()
+        finally:
+            self._invalidate_table(name)
 
     @staticmethod
     def enable_table(name):
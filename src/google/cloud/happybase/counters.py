@@ -0,0 +1,399 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Google Cloud Bigtable HappyBase counters module."""
+
+
+import atexit
+import threading
+import warnings
+import weakref
+
+from concurrent import futures
+import six
+
+from google.cloud.happybase.batch import _parse_column
+
+
+_DEFAULT_MAX_PENDING = 1000
+_DEFAULT_FLUSH_INTERVAL = 1.0
+_DEFAULT_MAX_WORKERS = 4
+_DEFAULT_BLOCK_SIZE = 1000
+# Buffers which have not been closed yet, flushed when the interpreter exits.
+_OPEN_BUFFERS = weakref.WeakSet()
+
+
+class CounterBuffer(object):
+    """Buffer aggregating counter increments before sending them.
+
+    Increments are added up in memory per row and column. The merged
+    increments of each row are sent with a single
+    :meth:`Table.counter_inc_many() \
+        <google.cloud.happybase.table.Table.counter_inc_many>` call, and
+    the rows are sent concurrently.
+
+    Pending increments are flushed once ``max_pending`` counters have
+    pending increments, every ``flush_interval`` seconds, when the buffer
+    is closed (also when used as a context manager) and when the
+    interpreter exits.
+
+    .. note::
+
+        Since increments are delayed, :meth:`counter_inc` does not return
+        the counter value. If a flush fails, the increments for the failed
+        rows are dropped, since they may have been applied already.
+
+    :type table: :class:`Table <google.cloud.happybase.table.Table>`
+    :param table: The table where the counters are incremented.
+
+    :type max_pending: int
+    :param max_pending: (Optional) The maximum number of counters (pairs of
+                        row and column) with pending increments before they
+                        are flushed.
+
+    :type flush_interval: float
+    :param flush_interval: (Optional) Time (in seconds) between flushes of
+                           the pending increments in a background thread. If
+                           :data:`None`, increments are only flushed when
+                           ``max_pending`` is reached or when explicitly
+                           flushed.
+
+    :type max_workers: int
+    :param max_workers: (Optional) The maximum number of rows incremented
+                        concurrently when flushing.
+
+    :raises: :class:`ValueError <exceptions.ValueError>` if ``max_pending``,
+             ``flush_interval`` or ``max_workers`` is not positive.
+    """
+
+    def __init__(
+        self,
+        table,
+        max_pending=_DEFAULT_MAX_PENDING,
+        flush_interval=_DEFAULT_FLUSH_INTERVAL,
+        max_workers=_DEFAULT_MAX_WORKERS,
+    ):
+        if max_pending < 1:
+            raise ValueError("max_pending must be positive")
+        if flush_interval is not None and flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive")
+
+        self._table = table
+        self._max_pending = max_pending
+        self._flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        # Pending increments, as a dictionary of row keys to dictionaries of
+        # (column family, column qualifier) pairs to the amount to increment
+        # by. Using the parsed column means ``b"fam:col"`` and ``"fam:col"``
+        # share the same counter.
+        self._pending = {}
+        self._num_pending = 0
+        self._closed = False
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+
+        self._stopped = threading.Event()
+        self._flush_thread = None
+        if flush_interval is not None:
+            self._flush_thread = threading.Thread(target=self._flush_periodically)
+            self._flush_thread.daemon = True
+            self._flush_thread.start()
+
+        _OPEN_BUFFERS.add(self)
+
+    @property
+    def num_pending(self):
+        """The number of counters with pending increments.
+
+        :rtype: int
+        :returns: The number of pairs of row and column with increments not
+                  yet flushed.
+        """
+        return self._num_pending
+
+    def counter_inc(self, row, column, value=1):
+        """Increment a counter column once the buffer is flushed.
+
+        :type row: str
+        :param row: Row key for the row we are incrementing a counter in.
+
+        :type column: str
+        :param column: Column we are incrementing a value in; of the
+                       form ``fam:col``.
+
+        :type value: int
+        :param value: Amount to increment the counter by. (If negative,
+                      this is equivalent to decrement.)
+
+        :raises: :class:`ValueError <exceptions.ValueError>` if the buffer
+                 is closed or if the column does not have a qualifier.
+        """
+        parsed_column = _parse_column(column)
+        if parsed_column[1] is None:
+            raise ValueError("Counter column must include a qualifier", column)
+
+        with self._lock:
+            if self._closed:
+                raise ValueError("Counter buffer is closed")
+            row_increments = self._pending.setdefault(row, {})
+            if parsed_column not in row_increments:
+                row_increments[parsed_column] = 0
+                self._num_pending += 1
+            row_increments[parsed_column] += value
+            full = self._num_pending >= self._max_pending
+
+        if full:
+            self.flush()
+
+    def counter_dec(self, row, column, value=1):
+        """Decrement a counter column once the buffer is flushed.
+
+        :type row: str
+        :param row: Row key for the row we are decrementing a counter in.
+
+        :type column: str
+        :param column: Column we are decrementing a value in; of the
+                       form ``fam:col``.
+
+        :type value: int
+        :param value: Amount to decrement the counter by. (If negative,
+                      this is equivalent to increment.)
+
+        :raises: :class:`ValueError <exceptions.ValueError>` if the buffer
+                 is closed or if the column does not have a qualifier.
+        """
+        self.counter_inc(row, column, -value)
+
+    def flush(self):
+        """Send the pending increments.
+
+        Counters whose increments add up to ``0`` are not sent.
+
+        :raises: The first error raised while incrementing a row, once all
+                 rows have been sent.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._num_pending = 0
+
+        in_flight = []
+        errors = []
+        for row, row_increments in six.iteritems(pending):
+            data = {}
+            for (column_family_id, column_qualifier), value in six.iteritems(
+                row_increments
+            ):
+                if value != 0:
+                    column = column_family_id.encode("utf-8") + b":" + column_qualifier
+                    data[column] = value
+            if not data:
+                continue
+            try:
+                in_flight.append(
+                    self._executor.submit(self._table.counter_inc_many, row, data)
+                )
+            except RuntimeError:
+                # The executor no longer accepts work once the interpreter
+                # is shutting down (e.g. when flushing at exit), so the row
+                # is sent from this thread instead.
+                try:
+                    self._table.counter_inc_many(row, data)
+                except Exception as exc:
+                    errors.append(exc)
+
+        errors.extend(future.exception() for future in in_flight)
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _flush_periodically(self):
+        """Flush the pending increments until the buffer is closed."""
+        while not self._stopped.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                warnings.warn("Failed to flush counter increments: %r" % (exc,))
+
+    def close(self):
+        """Flush the pending increments and stop flushing in the background.
+
+        Closing a buffer more than once has no effect.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        _OPEN_BUFFERS.discard(self)
+        self._stopped.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join()
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SequenceAllocator(object):
+    """Thread-safe allocator of unique IDs reserved in blocks.
+
+    IDs are taken from a counter column. A block of ``block_size`` IDs is
+    reserved with a single :meth:`Table.counter_inc() \
+        <google.cloud.happybase.table.Table.counter_inc>` call and the IDs in
+    it are then handed out locally. When few IDs are left in the current
+    block, the next block is reserved in a background thread.
+
+    .. note::
+
+        IDs are unique across all allocators using the same counter, but
+        they are only increasing within a single allocator. The IDs left
+        in the reserved blocks when an allocator is discarded are never
+        used.
+
+    :type table: :class:`Table <google.cloud.happybase.table.Table>`
+    :param table: The table holding the counter.
+
+    :type row: str
+    :param row: Row key for the row holding the counter.
+
+    :type column: str
+    :param column: Column holding the counter; of the form ``fam:col``.
+
+    :type block_size: int
+    :param block_size: (Optional) The number of IDs reserved at once.
+
+    :type prefetch: bool
+    :param prefetch: (Optional) Flag indicating if the next block should be
+                     reserved in the background before the current one runs
+                     out.
+
+    :type prefetch_threshold: int
+    :param prefetch_threshold: (Optional) The number of IDs left in the
+                               current block when the next block is reserved.
+                               Defaults to a tenth of ``block_size``.
+
+    :raises: :class:`ValueError <exceptions.ValueError>` if ``block_size``
+             is not positive or if ``prefetch_threshold`` is negative or not
+             smaller than ``block_size``.
+    """
+
+    def __init__(
+        self,
+        table,
+        row,
+        column,
+        block_size=_DEFAULT_BLOCK_SIZE,
+        prefetch=True,
+        prefetch_threshold=None,
+    ):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        if prefetch_threshold is None:
+            prefetch_threshold = block_size // 10
+        if not 0 <= prefetch_threshold < block_size:
+            raise ValueError("prefetch_threshold must be within the block size")
+
+        self._table = table
+        self._row = row
+        self._column = column
+        self._block_size = block_size
+        self._prefetch = prefetch
+        self._prefetch_threshold = prefetch_threshold
+
+        self._lock = threading.Lock()
+        # The next ID to hand out and the last ID in the current block.
+        self._next_id = 1
+        self._last_id = 0
+        self._next_block = None
+        self._executor = None
+        if prefetch:
+            self._executor = futures.ThreadPoolExecutor(max_workers=1)
+
+    def next_id(self):
+        """Get the next unique ID.
+
+        :rtype: int
+        :returns: An ID not handed out by any allocator using this counter.
+        :raises: The error raised by :meth:`Table.counter_inc() \
+                     <google.cloud.happybase.table.Table.counter_inc>` if a
+                 block could not be reserved.
+        """
+        with self._lock:
+            if self._next_id > self._last_id:
+                self._next_id, self._last_id = self._take_next_block()
+
+            result = self._next_id
+            self._next_id += 1
+            if (
+                self._prefetch
+                and self._next_block is None
+                and self._last_id - result <= self._prefetch_threshold
+            ):
+                self._next_block = self._executor.submit(self._reserve_block)
+            return result
+
+    def _take_next_block(self):
+        """Get the next block, waiting for it if it is being prefetched.
+
+        Must be called while holding the lock.
+
+        :rtype: tuple
+        :returns: Pair of the first and last IDs in the block.
+        """
+        next_block = self._next_block
+        if next_block is None:
+            return self._reserve_block()
+
+        self._next_block = None
+        return next_block.result()
+
+    def _reserve_block(self):
+        """Reserve a block of IDs.
+
+        :rtype: tuple
+        :returns: Pair of the first and last IDs in the block.
+        """
+        last_id = self._table.counter_inc(
+            self._row, self._column, value=self._block_size
+        )
+        return last_id - self._block_size + 1, last_id
+
+    def close(self):
+        """Stop reserving blocks in the background."""
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _close_open_buffers():
+    """Flush the counter buffers which are still open."""
+    for counter_buffer in list(_OPEN_BUFFERS):
+        counter_buffer.close()
+
+
+atexit.register(_close_open_buffers)
@@ -0,0 +1,198 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Google Cloud Bigtable HappyBase flow control module."""
+
+
+import threading
+import time
+
+
+class FlowControlLimitExceeded(RuntimeError):
+    """Exception raised when mutations can't be reserved by a flow controller.
+
+    This happens if the flow controller does not block, or if a timeout was
+    specified and the outstanding mutations did not drop below the limits
+    within the specified timeout.
+    """
+
+
+class FlowController(object):
+    """Thread-safe limit on the mutations held by batches.
+
+    Every :class:`Batch <google.cloud.happybase.batch.Batch>` created from a
+    table whose connection owns a flow controller reserves its mutations
+    when they are added and releases them once they have been sent. A single
+    flow controller can be shared by several connections (e.g. by passing
+    it to a :class:`ConnectionPool <.happybase.pool.ConnectionPool>`).
+
+    A reservation larger than the limits is only granted when nothing else
+    is outstanding.
+
+    :type max_mutations: int
+    :param max_mutations: (Optional) The maximum number of outstanding
+                          mutations. If not set, the number of mutations is
+                          not limited.
+
+    :type max_bytes: int
+    :param max_bytes: (Optional) The maximum (approximate) size in bytes of
+                      the outstanding mutations. If not set, the size is not
+                      limited.
+
+    :type block: bool
+    :param block: (Optional) Flag indicating if reserving mutations should
+                  wait for outstanding mutations to be released when the
+                  limits are reached. If ``block=False``,
+                  :class:`FlowControlLimitExceeded` is raised instead.
+
+    :type timeout: int
+    :param timeout: (Optional) Time (in seconds) to wait for outstanding
+                    mutations to be released. If not set, waits forever.
+
+    :raises: :class:`ValueError <exceptions.ValueError>` if one of the limits
+             is not positive.
+    """
+
+    def __init__(self, max_mutations=None, max_bytes=None, block=True, timeout=None):
+        if max_mutations is not None and max_mutations <= 0:
+            raise ValueError("max_mutations must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        self.max_mutations = max_mutations
+        self.max_bytes = max_bytes
+        self.block = block
+        self.timeout = timeout
+
+        self._condition = threading.Condition(threading.Lock())
+        self._outstanding_mutations = 0
+        self._outstanding_bytes = 0
+
+    @property
+    def outstanding_mutations(self):
+        """The number of mutations currently reserved.
+
+        :rtype: int
+        :returns: The number of outstanding mutations.
+        """
+        return self._outstanding_mutations
+
+    @property
+    def outstanding_bytes(self):
+        """The (approximate) size of the mutations currently reserved.
+
+        :rtype: int
+        :returns: The size in bytes of the outstanding mutations.
+        """
+        return self._outstanding_bytes
+
+    def _fits(self, num_mutations, num_bytes):
+        """Check if a reservation fits within the limits.
+
+        Must be called while holding the lock.
+
+        :type num_mutations: int
+        :param num_mutations: The number of mutations to reserve.
+
+        :type num_bytes: int
+        :param num_bytes: The size of the mutations to reserve.
+
+        :rtype: bool
+        :returns: Flag indicating if the reservation can be granted.
+        """
+        if self._outstanding_mutations == 0 and self._outstanding_bytes == 0:
+            return True
+        if (
+            self.max_mutations is not None
+            and self._outstanding_mutations + num_mutations > self.max_mutations
+        ):
+            return False
+        if (
+            self.max_bytes is not None
+            and self._outstanding_bytes + num_bytes > self.max_bytes
+        ):
+            return False
+        return True
+
+    def try_acquire(self, num_mutations, num_bytes):
+        """Reserve mutations if they fit within the limits, without waiting.
+
+        :type num_mutations: int
+        :param num_mutations: The number of mutations to reserve.
+
+        :type num_bytes: int
+        :param num_bytes: The size of the mutations to reserve.
+
+        :rtype: bool
+        :returns: Flag indicating if the mutations were reserved.
+        """
+        with self._condition:
+            if not self._fits(num_mutations, num_bytes):
+                return False
+            self._outstanding_mutations += num_mutations
+            self._outstanding_bytes += num_bytes
+            return True
+
+    def acquire(self, num_mutations, num_bytes):
+        """Reserve mutations, waiting for the limits if configured to block.
+
+        :type num_mutations: int
+        :param num_mutations: The number of mutations to reserve.
+
+        :type num_bytes: int
+        :param num_bytes: The size of the mutations to reserve.
+
+        :raises: :class:`FlowControlLimitExceeded` if the mutations can't be
+                 reserved without waiting (when not blocking) or before the
+                 ``timeout`` (when one is set).
+        """
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.time() + self.timeout
+
+        with self._condition:
+            while not self._fits(num_mutations, num_bytes):
+                if not self.block:
+                    raise FlowControlLimitExceeded(
+                        "Outstanding mutations exceed the flow control limits"
+                    )
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise FlowControlLimitExceeded(
+                            "Outstanding mutations did not drop below the "
+                            "flow control limits within specified timeout"
+                        )
+                    self._condition.wait(remaining)
+
+            self._outstanding_mutations += num_mutations
+            self._outstanding_bytes += num_bytes
+
+    def release(self, num_mutations, num_bytes):
+        """Release mutations reserved by :meth:`acquire` or :meth:`try_acquire`.
+
+        :type num_mutations: int
+        :param num_mutations: The number of mutations to release.
+
+        :type num_bytes: int
+        :param num_bytes: The size of the mutations to release.
+        """
+        with self._condition:
+            self._outstanding_mutations = max(
+                0, self._outstanding_mutations - num_mutations
+            )
+            self._outstanding_bytes = max(0, self._outstanding_bytes - num_bytes)
+            self._condition.notify_all()
@@ -15,11 +15,21 @@
 """Google Cloud Bigtable HappyBase pool module."""
 
 
+import bisect
+import collections
 import contextlib
+import heapq
+import itertools
+import os
 import threading
+import time
+import warnings
+import weakref
 
 import six
 
+from google.cloud.bigtable.client import Client
+
 from google.cloud.happybase.connection import Connection
 from google.cloud.happybase.connection import _get_instance
 
@@ -27,6 +37,35 @@ from google.cloud.happybase.connection import _get_instance
 _MIN_POOL_SIZE = 1
 """Minimum allowable size of a connection pool."""
 
+ROUND_ROBIN = "round_robin"
+"""Channel policy assigning channels to acquired connections in turn."""
+
+LEAST_LOAD = "least_load"
+"""Channel policy assigning the channel with the fewest acquired connections."""
+
+_CHANNEL_POLICIES = (ROUND_ROBIN, LEAST_LOAD)
+# Upper bounds (in seconds) of the buckets of the pool's time histograms.
+_HISTOGRAM_BOUNDS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Pools to reset in the child process after a fork.
+_POOLS = weakref.WeakSet()
+# Without os.register_at_fork (Python < 3.7), pools check the process ID
+# when a connection is acquired instead.
+_CHECK_PID = not hasattr(os, "register_at_fork")
+
 
 class NoConnectionsAvailable(RuntimeError):
     """Exception raised when no connections are available.
@@ -36,9 +75,105 @@ class NoConnectionsAvailable(RuntimeError):
     """
 
 
+class PoolOverloaded(NoConnectionsAvailable):
+    """Exception raised when too many threads are waiting for a connection.
+
+    This happens when a pool created with ``max_waiters`` has no connection
+    available and ``max_waiters`` threads are already waiting for one, so
+    the request fails right away instead of queueing.
+    """
+
+
+class MetricsSink(object):
+    """Receiver of the metrics recorded by a :class:`ConnectionPool`.
+
+    This class does nothing; subclasses can forward the metrics to a
+    monitoring system. Its methods are called by the threads using the
+    pool (without holding the pool's lock), so they should be fast and
+    thread-safe. The metrics are:
+
+    * ``acquisitions`` (counter): connections handed out by the pool
+    * ``acquire_timeouts`` (counter): acquisitions which timed out
+    * ``acquire_rejections`` (counter): acquisitions which failed because
+      too many threads were waiting
+    * ``connections_created`` (counter): connections created
+    * ``connections_retired`` (counter): idle or expired connections
+      retired
+    * ``health_check_failures`` (counter): connections which failed a
+      health check and were replaced
+    * ``acquire_wait_time`` (seconds): time taken to acquire a connection
+    * ``hold_time`` (seconds): time a connection was held before release
+    * ``in_use`` (gauge): connections currently acquired
+    """
+
+    def increment(self, name, value=1):
+        """Add to a counter.
+
+        :type name: str
+        :param name: The name of the counter.
+
+        :type value: int
+        :param value: (Optional) The amount to add.
+        """
+
+    def observe(self, name, value):
+        """Record a value in a distribution (e.g. a histogram).
+
+        :type name: str
+        :param name: The name of the distribution.
+
+        :type value: float
+        :param value: The value observed.
+        """
+
+    def gauge(self, name, value):
+        """Set the current value of a gauge.
+
+        :type name: str
+        :param name: The name of the gauge.
+
+        :type value: int
+        :param value: The current value.
+        """
+
+
 class ConnectionPool(object):
     """Thread-safe connection pool.
 
+    Connections are created on demand, up to ``size`` concurrently open
+    connections. Released connections are kept for re-use, and the most
+    recently released connection is handed out first. Connections idle
+    for longer than ``idle_timeout`` are retired, but at least ``min_size``
+    connections are kept open. Connections older than ``max_age`` are
+    retired (and replaced on demand) once they are released, and the
+    client they used is replaced by a new one (with new gRPC channels).
+    Idle and expired connections are checked whenever a connection is
+    acquired or released, and every ``maintenance_interval`` seconds in a
+    background thread.
+
+    Threads waiting for a connection are served by decreasing
+    ``priority`` (see :meth:`connection`), and in the order they started
+    waiting within the same priority. A thread does not take a connection
+    ahead of threads already waiting.
+
+    If a ``health_check`` is set, idle connections are checked by the
+    background thread and (with ``validate_on_checkout=True``) before they
+    are handed out. A connection failing the check is discarded and the
+    client it used is replaced by a new one (with new gRPC channels), so
+    the caller gets another connection rather than an error.
+
+    A pool can be created before a process forks (e.g. by a pre-fork
+    server). The child process starts with an empty pool, with new locks
+    and a copy of the instance whose client (and gRPC channels) belong to
+    the child, rather than sharing the parent's connections.
+
+    By default, all connections share the gRPC channel of the instance. If
+    ``channels`` is set, the pool owns that many channels (each with a
+    client of its own) and assigns one of them to a connection each time
+    it is acquired, so that concurrent requests are spread across several
+    HTTP/2 connections. Tables should be created from the connection
+    after it is acquired, since they keep the channel of the connection.
+
     .. note::
 
         All keyword arguments are passed unmodified to the
@@ -46,12 +181,77 @@ class ConnectionPool(object):
         **except** for ``autoconnect``. This is because the ``open`` /
         ``closed`` status of a connection is managed by the pool. In addition,
         if ``instance`` is not passed, the default / inferred instance is
-        determined by the pool and then passed to each
+        determined by the pool (when the first connection is created) and
+        then passed to each
         :class:`Connection <.happybase.connection.Connection>` that is created.
 
     :type size: int
     :param size: The maximum number of concurrently open connections.
 
+    :type min_size: int
+    :param min_size: (Optional) The number of connections created with the
+                     pool and never retired. Defaults to ``0``, i.e. all
+                     connections are created on demand.
+
+    :type idle_timeout: float
+    :param idle_timeout: (Optional) Time (in seconds) after which a
+                         connection which has not been used is retired. If
+                         not set, connections are never retired.
+
+    :type max_age: float
+    :param max_age: (Optional) Time (in seconds) after its creation when a
+                    connection is retired. If not set, connections are not
+                    retired because of their age.
+
+    :type health_check: callable
+    :param health_check: (Optional) Function called with a connection,
+                         returning a truthy value if the connection is
+                         healthy. Raising an exception means the connection
+                         is broken.
+
+    :type validate_on_checkout: bool
+    :param validate_on_checkout: (Optional) Flag indicating if idle
+                                 connections should pass the
+                                 ``health_check`` before they are handed out.
+
+    :type maintenance_interval: float
+    :param maintenance_interval: (Optional) Time (in seconds) between the
+                                 checks of the idle connections in a
+                                 background thread. If not set, idle
+                                 connections are only checked when the pool
+                                 is used.
+
+    :type max_waiters: int
+    :param max_waiters: (Optional) The maximum number of threads waiting for
+                        a connection. When it is reached, acquiring a
+                        connection raises :class:`PoolOverloaded` instead of
+                        waiting. If not set, the number of waiting threads
+                        is not limited.
+
+    :type channels: int
+    :param channels: (Optional) The number of gRPC channels owned by the
+                     pool. If not set, connections use the channel of the
+                     instance.
+
+    :type channel_policy: str
+    :param channel_policy: (Optional) How a channel is picked for an
+                           acquired connection: either :data:`ROUND_ROBIN`
+                           (the default) or :data:`LEAST_LOAD`.
+
+    :type warmup: bool
+    :param warmup: (Optional) Flag indicating if every channel should be
+                   primed with :meth:`warmup` before the constructor
+                   returns.
+
+    :type warmup_tables: list
+    :param warmup_tables: (Optional) Names of the tables read when warming
+                          up. Defaults to all tables of the instance.
+
+    :type metrics_sink: :class:`MetricsSink`
+    :param metrics_sink: (Optional) Receiver of the metrics recorded by the
+                         pool, in addition to the totals returned by
+                         :meth:`stats`.
+
     :type kwargs: dict
     :param kwargs: Keyword arguments passed to
                    :class:`Connection <.happybase.Connection>`
@@ -60,50 +260,796 @@ class ConnectionPool(object):
     :raises: :class:`TypeError <exceptions.TypeError>` if ``size``
              is non an integer.
              :class:`ValueError <exceptions.ValueError>` if ``size``
-             is not positive.
+             is not positive, if ``min_size`` is negative or larger than
+             ``size``, if ``idle_timeout``, ``max_age``,
+             ``maintenance_interval`` or ``channels`` is not positive, if
+             ``max_waiters`` is negative, if
+             ``validate_on_checkout`` is set without a ``health_check`` or
+             if ``channel_policy`` is unknown.
     """
 
-    def __init__(self, size, **kwargs):
+    def __init__(
+        self,
+        size,
+        min_size=0,
+        idle_timeout=None,
+        max_age=None,
+        health_check=None,
+        validate_on_checkout=False,
+        maintenance_interval=None,
+        max_waiters=None,
+        channels=None,
+        channel_policy=ROUND_ROBIN,
+        warmup=False,
+        warmup_tables=None,
+        metrics_sink=None,
+        **kwargs
+    ):
         if not isinstance(size, six.integer_types):
             raise TypeError("Pool size arg must be an integer")
 
         if size < _MIN_POOL_SIZE:
             raise ValueError("Pool size must be positive")
 
-        self._lock = threading.Lock()
-        self._queue = six.moves.queue.LifoQueue(maxsize=size)
-        self._thread_connections = threading.local()
+        if not 0 <= min_size <= size:
+            raise ValueError("Pool min_size must be between 0 and size")
+
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("Pool idle_timeout must be positive")
+
+        if max_age is not None and max_age <= 0:
+            raise ValueError("Pool max_age must be positive")
+
+        if maintenance_interval is not None and maintenance_interval <= 0:
+            raise ValueError("Pool maintenance_interval must be positive")
+
+        if max_waiters is not None and max_waiters < 0:
+            raise ValueError("Pool max_waiters must not be negative")
+
+        if validate_on_checkout and health_check is None:
+            raise ValueError("validate_on_checkout requires a health_check")
+
+        if channels is not None and channels < 1:
+            raise ValueError("Pool channels must be positive")
+
+        if channel_policy not in _CHANNEL_POLICIES:
+            raise ValueError("Unknown channel policy", channel_policy)
+
+        self.min_size = min_size
+        self.max_size = size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.health_check = health_check
+        self.validate_on_checkout = validate_on_checkout
+        self.maintenance_interval = maintenance_interval
+        self.max_waiters = max_waiters
+        self.channels = channels
+        self.channel_policy = channel_policy
+        self.metrics_sink = metrics_sink
 
         connection_kwargs = kwargs
         connection_kwargs["autoconnect"] = False
-        if "instance" not in connection_kwargs:
+        connection_kwargs.setdefault("instance", None)
+        self._connection_kwargs = connection_kwargs
+
+        self._reset_state()
+        # Set in the child process after a fork, until the first connection
+        # is acquired there.
+        self._forked = False
+        _POOLS.add(self)
+        self._add_missing_connections()
+        self._start_maintenance()
+
+        if warmup:
+            self.warmup(tables=warmup_tables)
+
+    def _reset_state(self):
+        """Set up the locks and an empty pool, without any connection."""
+        self._pid = os.getpid()
+        # Incremented every time the pool is reset.
+        self._generation = getattr(self, "_generation", 0) + 1
+        self._lock = threading.Lock()
+        # Heap of the waiting threads, as tuples of the negated priority, a
+        # sequence number (for FIFO order within a priority) and a condition
+        # (sharing the lock) notified when the thread may take a connection.
+        self._waiters = []
+        self._waiter_sequence = itertools.count()
+        self._instance_lock = threading.Lock()
+        self._thread_connections = threading.local()
+        # Pairs of connection and the time it was released, the most
+        # recently released last.
+        self._idle = collections.deque()
+        self._num_connections = 0
+        # Time each open connection was created.
+        self._created_at = {}
+        # One instance per channel (created with the first channel
+        # assignment), the number of acquired connections using each one
+        # and the index of the channel assigned to each acquired connection.
+        self._channel_instances = []
+        self._channel_loads = []
+        self._next_channel = 0
+        self._connection_channels = {}
+        # Instances used by expired connections, to be replaced once the
+        # lock is released, and pairs of replaced instance and replacement,
+        # kept until no connection uses the replaced instance.
+        self._expired_instances = []
+        self._replaced_instances = []
+        # Instances created by the pool (with a client of their own). Only
+        # their clients are closed by the pool, since the instance given to
+        # the pool (or the default instance) may be shared.
+        self._owned_instances = []
+        # Time each acquired connection was handed out, and totals for stats().
+        self._acquired = {}
+        self._num_acquisitions = 0
+        self._num_timeouts = 0
+        self._num_rejected = 0
+        self._num_created = 0
+        self._num_retired = 0
+        self._num_broken = 0
+        self._wait_times = _Histogram()
+        self._hold_times = _Histogram()
+
+    def _add_missing_connections(self):
+        """Create idle connections until the pool has ``min_size`` of them."""
+        while True:
+            with self._lock:
+                if self._num_connections >= self.min_size:
+                    return
+                self._num_connections += 1
+
+            try:
+                connection = self._create_connection()
+            except Exception:
+                with self._lock:
+                    self._num_connections -= 1
+                    self._notify_waiter()
+                raise
+
+            with self._lock:
+                self._idle.append((connection, time.time()))
+                self._notify_waiter()
+
+    def _start_maintenance(self):
+        """Start checking the idle connections in a background thread."""
+        if self.maintenance_interval is None:
+            return
+
+        thread = threading.Thread(
+            target=_maintain_periodically,
+            args=(weakref.ref(self), self.maintenance_interval),
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _reset_after_fork(self):
+        """Drop the state inherited from the parent process.
+
+        The connections, channels and locks of the parent are dropped
+        (without closing them, since they still belong to the parent).
+        Replacing the instance and re-creating connections is left to
+        :meth:`_set_up_after_fork`, when a connection is first acquired.
+        """
+        self._reset_state()
+        self._forked = True
+
+    def _set_up_after_fork(self):
+        """Finish resetting the pool in the child process after a fork.
+
+        The instance is replaced by a copy with a client of its own, then
+        the ``min_size`` connections and the background thread are started.
+        """
+        with self._instance_lock:
+            if not self._forked:
+                return
+            instance = self._connection_kwargs["instance"]
+            if instance is not None:
+                self._connection_kwargs["instance"] = self._copy_instance(instance)
+            self._forked = False
+
+        self._add_missing_connections()
+        self._start_maintenance()
+
+    @property
+    def num_connections(self):
+        """The number of connections currently open.
+
+        :rtype: int
+        :returns: The number of connections created by the pool (either
+                  idle or in use) and not yet retired.
+        """
+        return self._num_connections
+
+    def stats(self):
+        """Get a snapshot of the pool's usage.
+
+        The returned dictionary contains:
+
+        * ``max_size``: the maximum number of connections
+        * ``connections``: the number of connections currently open
+        * ``in_use``: the number of connections currently acquired
+        * ``idle``: the number of connections waiting to be acquired
+        * ``waiting``: the number of threads waiting for a connection
+        * ``utilization``: the fraction of ``max_size`` currently acquired
+        * ``acquisitions``, ``timeouts``, ``rejections``,
+          ``connections_created``, ``connections_retired`` and
+          ``health_check_failures``: totals since the pool was created
+        * ``acquire_wait_time`` and ``hold_time``: histograms (in seconds)
+          of the time taken to acquire connections and the time they were
+          held, as dictionaries with the ``count``, ``sum``, ``mean``,
+          ``max`` and ``buckets`` (pairs of upper bound and count)
+
+        :rtype: dict
+        :returns: The current usage and totals of the pool.
+        """
+        with self._lock:
+            in_use = self._num_connections - len(self._idle)
+            return {
+                "max_size": self.max_size,
+                "connections": self._num_connections,
+                "in_use": in_use,
+                "idle": len(self._idle),
+                "waiting": len(self._waiters),
+                "utilization": float(in_use) / self.max_size,
+                "acquisitions": self._num_acquisitions,
+                "timeouts": self._num_timeouts,
+                "rejections": self._num_rejected,
+                "connections_created": self._num_created,
+                "connections_retired": self._num_retired,
+                "health_check_failures": self._num_broken,
+                "acquire_wait_time": self._wait_times.snapshot(),
+                "hold_time": self._hold_times.snapshot(),
+            }
+
+    def _record_metric(self, kind, name, value):
+        """Send a metric to the metrics sink, if there is one.
+
+        :type kind: str
+        :param kind: The :class:`MetricsSink` method to call.
+
+        :type name: str
+        :param name: The name of the metric.
+
+        :type value: float
+        :param value: The value of the metric.
+        """
+        if self.metrics_sink is not None:
+            getattr(self.metrics_sink, kind)(name, value)
+
+    def _get_base_instance(self):
+        """Get the instance passed to connections, determining it if needed.
+
+        Must be called while holding the instance lock.
+
+        :rtype: :class:`~google.cloud.bigtable.instance.Instance`
+        :returns: The instance used by the pool.
+        """
+        connection_kwargs = self._connection_kwargs
+        if connection_kwargs["instance"] is None:
             connection_kwargs["instance"] = _get_instance()
+        return connection_kwargs["instance"]
+
+    def _create_connection(self):
+        """Create a new connection, determining the instance if needed.
+
+        :rtype: :class:`Connection <.happybase.Connection>`
+        :returns: A new connection using the pool's connection arguments.
+        """
+        with self._instance_lock:
+            self._get_base_instance()
+            connection = Connection(**self._connection_kwargs)
+            with self._lock:
+                self._created_at[connection] = time.time()
+                self._num_created += 1
+        self._record_metric("increment", "connections_created", 1)
+        return connection
+
+    def _get_channel_instances(self):
+        """Get the instances owning the channels of the pool.
+
+        The first channel is the one of the pool's instance, the others
+        belong to copies of it, created the first time this is called.
+
+        :rtype: list
+        :returns: One :class:`~google.cloud.bigtable.instance.Instance` per
+                  channel.
+        """
+        with self._instance_lock:
+            if not self._channel_instances:
+                instance = self._get_base_instance()
+                channel_instances = [instance]
+                for _ in six.moves.range(self.channels - 1):
+                    channel_instances.append(self._copy_instance(instance))
+                self._channel_loads = [0] * self.channels
+                self._channel_instances = channel_instances
+            return self._channel_instances
+
+    def _assign_channel(self, connection):
+        """Make an acquired connection use one of the pool's channels.
+
+        :type connection: :class:`Connection <.happybase.Connection>`
+        :param connection: A connection acquired from this pool.
+        """
+        if self.channels is None:
+            return
+
+        channel_instances = self._get_channel_instances()
+        with self._lock:
+            loads = self._channel_loads
+            if self.channel_policy == LEAST_LOAD:
+                index = loads.index(min(loads))
+            else:
+                index = self._next_channel
+                self._next_channel = (index + 1) % len(loads)
+            loads[index] += 1
+            self._connection_channels[connection] = index
+            connection._instance = channel_instances[index]
+
+    def _replace_instance(self, instance):
+        """Replace an instance whose client is broken or expired by a copy.
+
+        The client of the replaced instance is closed once no connection
+        uses it anymore.
+
+        Must not be called while holding the lock.
+
+        :type instance: :class:`~google.cloud.bigtable.instance.Instance`
+        :param instance: The instance used by a broken or expired connection.
+        """
+        with self._instance_lock:
+            is_base = self._connection_kwargs["instance"] is instance
+            channel_indexes = [
+                index
+                for index, channel_instance in enumerate(self._channel_instances)
+                if channel_instance is instance
+            ]
+            if not is_base and not channel_indexes:
+                return
+
+            replacement = self._copy_instance(instance)
+            if is_base:
+                self._connection_kwargs["instance"] = replacement
+            with self._lock:
+                for index in channel_indexes:
+                    self._channel_instances[index] = replacement
+                for connection, _ in self._idle:
+                    if connection._instance is instance:
+                        connection._instance = replacement
+                self._replaced_instances.append((instance, replacement))
+
+        self._close_unused_instances()
+
+    def _copy_instance(self, instance):
+        """Copy an instance, recording that the pool owns the copy.
+
+        Must be called while holding the instance lock.
+
+        :type instance: :class:`~google.cloud.bigtable.instance.Instance`
+        :param instance: The instance to copy.
+
+        :rtype: :class:`~google.cloud.bigtable.instance.Instance`
+        :returns: A copy of the instance with a client of its own.
+        """
+        copied = _copy_instance(instance)
+        self._owned_instances.append(copied)
+        return copied
+
+    def _close_unused_instances(self):
+        """Close the clients of replaced instances no connection uses.
+
+        Only the clients of instances created by the pool are closed.
+        """
+        if not self._replaced_instances:
+            return
 
-        for _ in six.moves.range(size):
-            connection = Connection(**connection_kwargs)
-            self._queue.put(connection)
+        with self._instance_lock:
+            with self._lock:
+                in_use = [connection._instance for connection in self._created_at]
+                replaced_instances = []
+                unused = []
+                for pair in self._replaced_instances:
+                    instance = pair[0]
+                    if any(instance is used for used in in_use):
+                        replaced_instances.append(pair)
+                    elif any(instance is owned for owned in self._owned_instances):
+                        unused.append(instance)
+                self._replaced_instances = replaced_instances
+                self._owned_instances = [
+                    owned
+                    for owned in self._owned_instances
+                    if not any(owned is instance for instance in unused)
+                ]
+
+        for instance in unused:
+            _close_client(instance._client)
+
+    def _is_expired(self, connection, now):
+        """Check if a connection is older than ``max_age``.
+
+        Must be called while holding the lock.
+
+        :type connection: :class:`Connection <.happybase.Connection>`
+        :param connection: An open connection of the pool.
+
+        :type now: float
+        :param now: The current time.
+
+        :rtype: bool
+        :returns: Flag indicating if the connection should be retired.
+        """
+        if self.max_age is None:
+            return False
+        return now - self._created_at.get(connection, now) >= self.max_age
+
+    def _forget_connection(self, connection):
+        """Stop counting a connection removed from the pool.
+
+        Must be called while holding the lock.
+
+        :type connection: :class:`Connection <.happybase.Connection>`
+        :param connection: The connection removed from the pool.
+        """
+        self._num_connections -= 1
+        self._created_at.pop(connection, None)
+
+    def _retire_idle_connections(self):
+        """Remove the connections which are idle for too long or expired.
+
+        Must be called while holding the lock.
+
+        :rtype: list
+        :returns: The retired connections, to be closed by the caller once
+                  the lock is released.
+        """
+        retired = []
+        now = time.time()
+        if self.max_age is not None:
+            kept = collections.deque()
+            for connection, released_at in self._idle:
+                if self._is_expired(connection, now):
+                    retired.append(connection)
+                    self._expired_instances.append(connection._instance)
+                else:
+                    kept.append((connection, released_at))
+            self._idle = kept
+
+        if self.idle_timeout is not None:
+            cutoff = now - self.idle_timeout
+            while (
+                self._idle
+                and self._idle[0][1] <= cutoff
+                and self._num_connections - len(retired) > self.min_size
+            ):
+                connection, _ = self._idle.popleft()
+                retired.append(connection)
+
+        for connection in retired:
+            self._forget_connection(connection)
+        self._num_retired += len(retired)
+        return retired
+
+    def _check_health(self, connection):
+        """Run the health check on a connection.
+
+        :type connection: :class:`Connection <.happybase.Connection>`
+        :param connection: The connection to check.
+
+        :rtype: bool
+        :returns: Flag indicating if the connection is healthy.
+        """
+        try:
+            return bool(self.health_check(connection))
+        except Exception:
+            return False
+
+    def _discard_broken(self, connection):
+        """Remove a connection which failed its health check.
+
+        The client used by the connection is replaced, so that new
+        connections (and idle connections sharing the client) use new
+        channels.
+
+        :type connection: :class:`Connection <.happybase.Connection>`
+        :param connection: The connection to remove, not idle and not
+                           acquired.
+        """
+        with self._lock:
+            self._forget_connection(connection)
+            self._num_broken += 1
+            self._notify_waiter()
+
+        self._record_metric("increment", "health_check_failures", 1)
+        self._replace_instance(connection._instance)
+        connection.close()
+
+    def _maintain(self):
+        """Retire, check and replace idle connections.
+
+        Idle and expired connections are retired, idle connections failing
+        the health check (if any) are discarded and connections are created
+        until the pool has ``min_size`` connections.
+
+        Idle connections are checked one at a time, so the others can still
+        be acquired while a connection is checked.
+        """
+        with self._lock:
+            retired = self._retire_idle_connections()
+            to_check = []
+            if self.health_check is not None:
+                to_check = list(self._idle)
+        self._close_retired(retired)
+
+        for entry in to_check:
+            with self._lock:
+                # Skip the connections acquired or retired in the meantime.
+                if entry not in self._idle:
+                    continue
+                self._idle.remove(entry)
+
+            connection, _ = entry
+            if not self._check_health(connection):
+                self._discard_broken(connection)
+                continue
+
+            with self._lock:
+                # Keep the idle connections ordered by release time.
+                self._idle.append(entry)
+                self._idle = collections.deque(
+                    sorted(self._idle, key=lambda item: item[1])
+                )
+                self._notify_waiter()
+
+        self._add_missing_connections()
+
+    def _close_retired(self, retired):
+        """Close the connections removed from the pool.
+
+        The instances used by expired connections are replaced, so that new
+        connections use a new client.
+
+        :type retired: list
+        :param retired: Connections retired while holding the lock.
+        """
+        if self._expired_instances:
+            with self._lock:
+                expired = self._expired_instances
+                self._expired_instances = []
+            for instance in expired:
+                self._replace_instance(instance)
+
+        for retired_connection in retired:
+            retired_connection.close()
+        if retired:
+            self._record_metric("increment", "connections_retired", len(retired))
+        self._close_unused_instances()
+
+    def _has_connection(self):
+        """Check if a connection is idle or can be created.
+
+        Must be called while holding the lock.
+
+        :rtype: bool
+        :returns: Flag indicating if a connection can be taken right away.
+        """
+        return bool(self._idle) or self._num_connections < self.max_size
+
+    def _notify_waiter(self):
+        """Wake up the first waiting thread if a connection is available.
+
+        Must be called while holding the lock. The woken thread wakes up
+        the next one in turn if a connection is still available once it
+        stops waiting.
+        """
+        if self._waiters and self._has_connection():
+            self._waiters[0][2].notify()
+
+    def _is_overloaded(self):
+        """Check if a thread acquiring a connection should be turned away.
+
+        Must be called while holding the lock.
+
+        :rtype: bool
+        :returns: Flag indicating if the thread would have to wait and the
+                  maximum number of waiting threads is reached.
+        """
+        if self.max_waiters is None:
+            return False
+        if not self._waiters and self._has_connection():
+            return False
+        return len(self._waiters) >= self.max_waiters
+
+    def _wait_for_connection(self, deadline, priority):
+        """Wait until it is this thread's turn to take a connection.
+
+        Must be called while holding the lock.
+
+        :type deadline: float
+        :param deadline: The time to give up waiting at, or :data:`None` to
+                         wait forever.
+
+        :type priority: int
+        :param priority: The priority of the waiting thread.
 
-    def _acquire_connection(self, timeout=None):
+        :rtype: bool
+        :returns: Flag indicating if a connection is available (rather than
+                  the deadline having passed).
+        """
+        if not self._waiters and self._has_connection():
+            return True
+
+        condition = threading.Condition(self._lock)
+        entry = (-priority, next(self._waiter_sequence), condition)
+        heapq.heappush(self._waiters, entry)
+        try:
+            while self._waiters[0] is not entry or not self._has_connection():
+                if deadline is None:
+                    remaining = None
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                condition.wait(remaining)
+            return True
+        finally:
+            if self._waiters[0] is entry:
+                heapq.heappop(self._waiters)
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            self._notify_waiter()
+
+    def warmup(self, tables=None):
+        """Prime every channel used by the pool's connections.
+
+        Sends the reads of :meth:`Connection.warmup() \
+            <google.cloud.happybase.connection.Connection.warmup>` over each
+        channel owned by the pool (or over the channel of the instance, if
+        the pool does not own channels).
+
+        :type tables: list
+        :param tables: (Optional) Names of the tables to send a read to.
+                       Defaults to all tables of the instance.
+        """
+        if self._forked:
+            self._set_up_after_fork()
+        if self.channels is None:
+            with self._instance_lock:
+                channel_instances = [self._get_base_instance()]
+        else:
+            channel_instances = self._get_channel_instances()
+
+        for instance in channel_instances:
+            connection_kwargs = dict(self._connection_kwargs, instance=instance)
+            Connection(**connection_kwargs).warmup(tables=tables)
+
+    def _acquire_connection(self, timeout=None, priority=0):
         """Acquire a connection from the pool.
 
+        An idle connection is re-used if there is one. Otherwise, a new
+        connection is created if the pool is not full, or else this waits
+        for a connection to be released.
+
         :type timeout: int
         :param timeout: (Optional) Time (in seconds) to wait for a connection
                         to open.
 
+        :type priority: int
+        :param priority: (Optional) The priority of this request when
+                         waiting for a connection; higher values are served
+                         first.
+
         :rtype: :class:`Connection <.happybase.Connection>`
-        :returns: An active connection from the queue stored on the pool.
-        :raises: :class:`NoConnectionsAvailable` if ``Queue.get`` fails
-                 before the ``timeout`` (only if a timeout is specified).
+        :returns: An active connection from the pool.
+        :raises: :class:`NoConnectionsAvailable` if no connection is
+                 released before the ``timeout`` (only if a timeout is
+                 specified). :class:`PoolOverloaded` if the maximum number
+                 of waiting threads is reached.
         """
-        try:
-            return self._queue.get(block=True, timeout=timeout)
-        except six.moves.queue.Empty:
-            raise NoConnectionsAvailable(
-                "No connection available from pool " "within specified timeout"
-            )
+        if _CHECK_PID and self._pid != os.getpid():
+            self._reset_after_fork()
+        if self._forked:
+            self._set_up_after_fork()
+
+        start = time.time()
+        deadline = None
+        if timeout is not None:
+            deadline = start + timeout
+
+        while True:
+            with self._lock:
+                retired = self._retire_idle_connections()
+                overloaded = self._is_overloaded()
+                available = False
+                connection = None
+                if overloaded:
+                    self._num_rejected += 1
+                else:
+                    available = self._wait_for_connection(deadline, priority)
+                    if not available:
+                        self._num_timeouts += 1
+                        wait_time = time.time() - start
+                        self._wait_times.record(wait_time)
+
+                if available and self._idle:
+                    connection, _ = self._idle.pop()
+                elif available:
+                    self._num_connections += 1
+
+            self._close_retired(retired)
+            if overloaded:
+                self._record_metric("increment", "acquire_rejections", 1)
+                raise PoolOverloaded(
+                    "Too many threads waiting for a connection from pool"
+                )
+            if not available:
+                self._record_metric("increment", "acquire_timeouts", 1)
+                self._record_metric("observe", "acquire_wait_time", wait_time)
+                raise NoConnectionsAvailable(
+                    "No connection available from pool within specified timeout"
+                )
+
+            if connection is None:
+                try:
+                    connection = self._create_connection()
+                except Exception:
+                    with self._lock:
+                        self._num_connections -= 1
+                        self._notify_waiter()
+                    raise
+                break
+
+            if not self.validate_on_checkout or self._check_health(connection):
+                break
+            self._discard_broken(connection)
+
+        self._assign_channel(connection)
+
+        now = time.time()
+        with self._lock:
+            self._acquired[connection] = now
+            self._num_acquisitions += 1
+            self._wait_times.record(now - start)
+            in_use = self._num_connections - len(self._idle)
+        self._record_metric("increment", "acquisitions", 1)
+        self._record_metric("observe", "acquire_wait_time", now - start)
+        self._record_metric("gauge", "in_use", in_use)
+        return connection
+
+    def _release_connection(self, connection):
+        """Return a connection to the pool.
+
+        :type connection: :class:`Connection <.happybase.Connection>`
+        :param connection: A connection acquired from this pool.
+        """
+        now = time.time()
+        with self._lock:
+            index = self._connection_channels.pop(connection, None)
+            if index is not None:
+                self._channel_loads[index] -= 1
+            hold_time = now - self._acquired.pop(connection, now)
+            self._hold_times.record(hold_time)
+            if self._is_expired(connection, now):
+                self._forget_connection(connection)
+                self._num_retired += 1
+                self._expired_instances.append(connection._instance)
+                retired = [connection]
+            else:
+                # Connections acquired while their instance was replaced
+                # switch to the replacement.
+                for replaced, replacement in self._replaced_instances:
+                    if connection._instance is replaced:
+                        connection._instance = replacement
+                self._idle.append((connection, now))
+                retired = []
+            retired.extend(self._retire_idle_connections())
+            in_use = self._num_connections - len(self._idle)
+            self._notify_waiter()
+
+        self._close_retired(retired)
+        self._record_metric("observe", "hold_time", hold_time)
+        self._record_metric("gauge", "in_use", in_use)
 
     @contextlib.contextmanager
-    def connection(self, timeout=None):
+    def connection(self, timeout=None, priority=0):
         """Obtain a connection from the pool.
 
         Must be used as a context manager, for example::
@@ -112,7 +1058,9 @@ class ConnectionPool(object):
                 pass  # do something with the connection
 
         If ``timeout`` is omitted, this method waits forever for a connection
-        to become available from the local queue.
+        to become available. When several threads are waiting, the ones with
+        the highest ``priority`` get a connection first, e.g. to let
+        interactive requests go ahead of batch jobs sharing the pool.
 
         Yields an active :class:`Connection <.happybase.connection.Connection>`
         from the pool.
@@ -121,14 +1069,21 @@ class ConnectionPool(object):
         :param timeout: (Optional) Time (in seconds) to wait for a connection
                         to open.
 
+        :type priority: int
+        :param priority: (Optional) The priority of this request when
+                         waiting for a connection; higher values are served
+                         first. Defaults to ``0``.
+
         :rtype: :class:`~google.cloud.happybase.connection.Connection`
-        :returns: (Rather, yields) a connection from the queue.
+        :returns: (Rather, yields) a connection from the pool.
         :raises: :class:`NoConnectionsAvailable` if no connection can be
                  retrieved from the pool before the ``timeout`` (only if
-                 a timeout is specified).
+                 a timeout is specified). :class:`PoolOverloaded` if the
+                 pool has ``max_waiters`` threads waiting already.
         """
         connection = getattr(self._thread_connections, "current", None)
 
+        generation = self._generation
         retrieved_new_cnxn = False
         if connection is None:
             # In this case we need to actually grab a connection from the
@@ -141,16 +1096,147 @@ class ConnectionPool(object):
             #       ('https://emptysqua.re/blog/'
             #        'another-thing-about-pythons-threadlocals/')
             retrieved_new_cnxn = True
-            connection = self._acquire_connection(timeout)
+            connection = self._acquire_connection(timeout, priority)
+            generation = self._generation
             with self._lock:
                 self._thread_connections.current = connection
 
-        # This is a no-op.
-        connection.open()
-        yield connection
+        try:
+            # This is a no-op.
+            connection.open()
+            yield connection
+        finally:
+            # Remove thread local reference after the outermost 'with' block
+            # ends. Afterwards the thread no longer owns the connection. If
+            # the process forked in the meantime, the connection belongs to
+            # the parent and the pool has already been reset.
+            if retrieved_new_cnxn and self._generation == generation:
+                del self._thread_connections.current
+                self._release_connection(connection)
+
+
+def _maintain_periodically(pool_ref, interval):
+    """Maintain a pool's idle connections until the pool is collected.
 
-        # Remove thread local reference after the outermost 'with' block
-        # ends. Afterwards the thread no longer owns the connection.
-        if retrieved_new_cnxn:
-            del self._thread_connections.current
-            self._queue.put(connection)
+    :type pool_ref: :class:`weakref.ref`
+    :param pool_ref: Weak reference to the pool, so that the thread does
+                     not keep the pool alive.
+
+    :type interval: float
+    :param interval: Time (in seconds) between maintenance runs.
+    """
+    while True:
+        time.sleep(interval)
+        pool = pool_ref()
+        if pool is None:
+            return
+        try:
+            pool._maintain()
+        except Exception as exc:
+            warnings.warn("Failed to maintain connection pool: %r" % (exc,))
+        del pool
+
+
+def _reset_pools_after_fork():
+    """Reset every pool in the child process after a fork."""
+    for pool in list(_POOLS):
+        try:
+            pool._reset_after_fork()
+        except Exception as exc:
+            warnings.warn("Failed to reset connection pool after fork: %r" % (exc,))
+
+
+if not _CHECK_PID:  # pragma: NO COVER Python >= 3.7
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+class _Histogram(object):
+    """Distribution of durations, counted in fixed buckets.
+
+    Not thread-safe; the pool records values while holding its lock.
+
+    :type bounds: tuple
+    :param bounds: (Optional) Sorted upper bounds (in seconds) of the
+                   buckets. Larger values are counted in an extra bucket.
+    """
+
+    def __init__(self, bounds=_HISTOGRAM_BOUNDS):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def record(self, value):
+        """Count a value in its bucket.
+
+        :type value: float
+        :param value: The value to record.
+        """
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._count += 1
+        self._sum += value
+        self._max = max(self._max, value)
+
+    def snapshot(self):
+        """Get the current state of the histogram.
+
+        :rtype: dict
+        :returns: The ``count``, ``sum``, ``mean`` and ``max`` of the values
+                  recorded, and the ``buckets`` as pairs of upper bound and
+                  count.
+        """
+        mean = 0.0
+        if self._count:
+            mean = self._sum / self._count
+        upper_bounds = self._bounds + (float("inf"),)
+        return {
+            "count": self._count,
+            "sum": self._sum,
+            "mean": mean,
+            "max": self._max,
+            "buckets": list(zip(upper_bounds, self._counts)),
+        }
+
+
+def _copy_instance(instance):
+    """Create a copy of an instance with a client (and channel) of its own.
+
+    :type instance: :class:`~google.cloud.bigtable.instance.Instance`
+    :param instance: The instance to copy.
+
+    :rtype: :class:`~google.cloud.bigtable.instance.Instance`
+    :returns: An instance with the same ID, whose client has the same
+              project, credentials and options.
+    """
+    client = instance._client
+    channel_client = Client(
+        project=client.project,
+        credentials=client._credentials,
+        read_only=client._read_only,
+        admin=client._admin,
+        client_info=client._client_info,
+        client_options=client._client_options,
+        admin_client_options=client._admin_client_options,
+    )
+    return channel_client.instance(instance.instance_id)
+
+
+def _close_client(client):
+    """Close the gRPC channels opened by a client.
+
+    :type client: :class:`~google.cloud.bigtable.client.Client`
+    :param client: The client to close.
+    """
+    for api_name in (
+        "_table_data_client",
+        "_table_admin_client",
+        "_instance_admin_client",
+    ):
+        api = getattr(client, api_name, None)
+        if api is None:
+            continue
+        channel = getattr(api.transport, "grpc_channel", None)
+        if channel is None:  # google-cloud-bigtable < 2.0.0
+            channel = api.transport.channel
+        channel.close()
@@ -15,11 +15,17 @@
 """Google Cloud Bigtable HappyBase table module."""
 
 
+import collections
+import random
 import struct
+import threading
+import time
 import warnings
 
+from concurrent import futures
 import six
 
+from google.api_core.exceptions import from_grpc_status
 from google.cloud._helpers import _datetime_from_microseconds
 from google.cloud._helpers import _microseconds_from_datetime
 from google.cloud._helpers import _to_bytes
@@ -27,23 +33,50 @@ from google.cloud.bigtable.column_family import GCRuleIntersection
 from google.cloud.bigtable.column_family import MaxAgeGCRule
 from google.cloud.bigtable.column_family import MaxVersionsGCRule
 from google.cloud.bigtable.row_filters import CellsColumnLimitFilter
+from google.cloud.bigtable.row_filters import CellsRowLimitFilter
 from google.cloud.bigtable.row_filters import ColumnQualifierRegexFilter
+from google.cloud.bigtable.row_filters import ColumnRangeFilter
 from google.cloud.bigtable.row_filters import FamilyNameRegexFilter
+from google.cloud.bigtable.row_filters import RowFilter
 from google.cloud.bigtable.row_filters import RowFilterChain
 from google.cloud.bigtable.row_filters import RowFilterUnion
+from google.cloud.bigtable.row_filters import StripValueTransformerFilter
 from google.cloud.bigtable.row_filters import TimestampRange
 from google.cloud.bigtable.row_filters import TimestampRangeFilter
+from google.cloud.bigtable.row_filters import ValueRangeFilter
 from google.cloud.bigtable.table import Table as _LowLevelTable
 from google.cloud.bigtable.row_set import RowSet
+from google.rpc import code_pb2
 
+from google.cloud.happybase.batch import _apply_mutations
+from google.cloud.happybase.batch import _convert_timestamp
+from google.cloud.happybase.batch import _delete_mutations
 from google.cloud.happybase.batch import _get_column_pairs
+from google.cloud.happybase.batch import _MAX_REQUEST_MUTATIONS
+from google.cloud.happybase.batch import _mutation_size
+from google.cloud.happybase.batch import _parse_column
+from google.cloud.happybase.batch import _put_mutations
 from google.cloud.happybase.batch import _WAL_SENTINEL
+from google.cloud.happybase.batch import _WAL_WARNING
 from google.cloud.happybase.batch import Batch
+from google.cloud.happybase.counters import _DEFAULT_FLUSH_INTERVAL
+from google.cloud.happybase.counters import _DEFAULT_MAX_PENDING
+from google.cloud.happybase.counters import _DEFAULT_MAX_WORKERS
+from google.cloud.happybase.counters import CounterBuffer
 
 
+_DEFAULT_COUNTER_SHARDS = 16
+_SHARD_SEPARATOR = b"#"
 _PACK_I64 = struct.Struct(">q").pack
 _UNPACK_I64 = struct.Struct(">q").unpack
 _SIMPLE_GC_RULES = (MaxAgeGCRule, MaxVersionsGCRule)
+# Defaults for grouping rows into requests in Table.put_many().
+_PUT_MANY_BATCH_SIZE = 10000
+_PUT_MANY_BATCH_BYTES = 8 * 1024 * 1024
+_PUT_MANY_MAX_IN_FLIGHT = 4
+# Defaults for scanning and deleting rows in Table.delete_where().
+_DELETE_WHERE_BATCH_SIZE = 1000
+_DELETE_WHERE_MAX_WORKERS = 4
 
 
 def make_row(cell_map, include_timestamp):
@@ -103,6 +136,88 @@ def make_ordered_row(sorted_columns, include_timestamp):
     )
 
 
+class PutManyResult(object):
+    """Summary of the rows written by :meth:`Table.put_many`.
+
+    :type num_rows: int
+    :param num_rows: The number of rows consumed from the input.
+
+    :type num_mutations: int
+    :param num_mutations: The number of mutations sent.
+
+    :type elapsed: float
+    :param elapsed: The time (in seconds) taken to send all the rows.
+
+    :type failed_rows: list
+    :param failed_rows: Pairs of row key and
+                        :class:`~google.rpc.status_pb2.Status` for each row
+                        whose mutations could not be applied.
+    """
+
+    def __init__(self, num_rows=0, num_mutations=0, elapsed=0.0, failed_rows=()):
+        self.num_rows = num_rows
+        self.num_mutations = num_mutations
+        self.elapsed = elapsed
+        self.failed_rows = list(failed_rows)
+
+    def __repr__(self):
+        return "<table.PutManyResult num_rows=%d failed=%d elapsed=%.3f>" % (
+            self.num_rows,
+            len(self.failed_rows),
+            self.elapsed,
+        )
+
+    @property
+    def rows_per_second(self):
+        """Throughput of the rows written.
+
+        :rtype: float
+        :returns: The number of rows consumed per second (or ``0.0`` if no
+                  time has elapsed).
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.num_rows / self.elapsed
+
+
+class DeleteWhereResult(object):
+    """Summary of the rows deleted by :meth:`Table.delete_where`.
+
+    :type num_rows: int
+    :param num_rows: The number of rows matched by the scan and sent to be
+                     deleted.
+
+    :type elapsed: float
+    :param elapsed: The time (in seconds) taken to scan and delete the rows.
+
+    :type failed_rows: list
+    :param failed_rows: Pairs of row key and
+                        :class:`~google.rpc.status_pb2.Status` for each row
+                        which could not be deleted.
+    """
+
+    def __init__(self, num_rows=0, elapsed=0.0, failed_rows=()):
+        self.num_rows = num_rows
+        self.elapsed = elapsed
+        self.failed_rows = list(failed_rows)
+
+    def __repr__(self):
+        return "<table.DeleteWhereResult num_rows=%d failed=%d elapsed=%.3f>" % (
+            self.num_rows,
+            len(self.failed_rows),
+            self.elapsed,
+        )
+
+    @property
+    def num_deleted(self):
+        """The number of rows successfully deleted.
+
+        :rtype: int
+        :returns: The number of rows matched minus the failed rows.
+        """
+        return self.num_rows - len(self.failed_rows)
+
+
 class Table(object):
     """Representation of Cloud Bigtable table.
 
@@ -121,8 +236,10 @@ class Table(object):
         # from the connection is needed.
         self.connection = connection
         self._low_level_table = None
+        self._flow_controller = None
         if self.connection is not None:
             self._low_level_table = _LowLevelTable(self.name, self.connection._instance)
+            self._flow_controller = self.connection._flow_controller
 
     def __repr__(self):
         return "<table.Table name=%r>" % (self.name,)
@@ -130,6 +247,21 @@ class Table(object):
     def families(self):
         """Retrieve the column families for this table.
 
+        The column families can be cached by the connection (see
+        ``metadata_ttl`` in :class:`Connection \
+            <google.cloud.happybase.connection.Connection>`).
+
+        :rtype: dict
+        :returns: Mapping from column family name to garbage collection rule
+                  for a column family.
+        """
+        if self.connection is None:
+            return self._list_families()
+        return self.connection._table_families(self.name, self._list_families)
+
+    def _list_families(self):
+        """Retrieve the column families for this table from the API.
+
         :rtype: dict
         :returns: Mapping from column family name to garbage collection rule
                   for a column family.
@@ -295,12 +427,11 @@ class Table(object):
         cells = partial_row_data._cells
         # We know that `_filter_chain_helper` has already verified that
         # column will split as such.
-        column = column.decode("utf-8")
-        column_family_id, column_qualifier = column.split(":")
+        column_family_id, column_qualifier = _parse_column(column)
         # NOTE: We expect the only key in `cells` is `column_family_id`
         #       and the only key `cells[column_family_id]` is
         #       `column_qualifier`. But we don't check that this is true.
-        curr_cells = cells[column_family_id][column_qualifier.encode("utf-8")]
+        curr_cells = cells[column_family_id][column_qualifier]
         return _cells_to_pairs(curr_cells, include_timestamp=include_timestamp)
 
     def scan(
@@ -420,7 +551,7 @@ class Table(object):
 
         .. note::
 
-            This method will send a request with a single "put" mutation.
+            This method will send a single ``MutateRow`` request for the row.
             In many situations, :meth:`batch` is a more appropriate
             method to manipulate data since it helps combine many mutations
             into a single request.
@@ -438,13 +569,18 @@ class Table(object):
                           epoch) that the mutation will be applied at.
 
         :type wal: object
-        :param wal: Unused parameter (to be passed to a created batch).
-                    Provided for compatibility with HappyBase, but irrelevant
-                    for Cloud Bigtable since it does not have a Write Ahead
-                    Log.
+        :param wal: Unused parameter (Boolean for using the HBase Write Ahead
+                    Log). Provided for compatibility with HappyBase, but
+                    irrelevant for Cloud Bigtable since it does not have a
+                    Write Ahead Log.
+
+        :raises: :class:`~google.api_core.exceptions.GoogleAPICallError` if
+                 the mutations could not be applied.
         """
-        with self.batch(timestamp=timestamp, wal=wal, transaction=True) as batch:
-            batch.put(row, data)
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        self._mutate_row(row, _put_mutations(data), timestamp)
 
     def delete(self, row, columns=None, timestamp=None, wal=_WAL_SENTINEL):
         """Delete data from a row in this table.
@@ -454,7 +590,7 @@ class Table(object):
 
         .. note::
 
-            This method will send a request with a single delete mutation.
+            This method will send a single ``MutateRow`` request for the row.
             In many situations, :meth:`batch` is a more appropriate
             method to manipulate data since it helps combine many mutations
             into a single request.
@@ -474,22 +610,472 @@ class Table(object):
                           epoch) that the mutation will be applied at.
 
         :type wal: object
-        :param wal: Unused parameter (to be passed to a created batch).
-                    Provided for compatibility with HappyBase, but irrelevant
-                    for Cloud Bigtable since it does not have a Write Ahead
-                    Log.
+        :param wal: Unused parameter (Boolean for using the HBase Write Ahead
+                    Log). Provided for compatibility with HappyBase, but
+                    irrelevant for Cloud Bigtable since it does not have a
+                    Write Ahead Log.
+
+        :raises: :class:`~google.api_core.exceptions.GoogleAPICallError` if
+                 the mutations could not be applied.
+        """
+        if wal is not _WAL_SENTINEL:
+            warnings.warn(_WAL_WARNING)
+
+        _, delete_range = _convert_timestamp(timestamp)
+        self._mutate_row(row, _delete_mutations(columns, delete_range), timestamp)
+
+    def delete_prefix(self, prefix, timeout=None):
+        """Delete all rows whose row key starts with a prefix.
+
+        The rows are dropped by the server with a single ``DropRowRange``
+        admin request, without reading them. The deleted range is the same
+        as the one scanned by :meth:`scan` with ``row_prefix=prefix``
+        (i.e. from ``prefix`` up to ``_string_successor(prefix)``).
+
+        :type prefix: str
+        :param prefix: Prefix of the row keys of the rows to delete.
+
+        :type timeout: float
+        :param timeout: (Optional) Time (in seconds) to wait for the request
+                        to complete.
+
+        :raises: :class:`ValueError <exceptions.ValueError>` if ``prefix``
+                 is empty (use :meth:`truncate` to delete all rows).
+        """
+        if not prefix:
+            raise ValueError("prefix cannot be empty; use truncate() instead")
+        self._low_level_table.drop_by_prefix(_to_bytes(prefix), timeout=timeout)
+
+    def truncate(self, timeout=None):
+        """Delete all rows in this table.
+
+        The rows are dropped by the server with a single ``DropRowRange``
+        admin request. The table and its column families are kept.
+
+        :type timeout: float
+        :param timeout: (Optional) Time (in seconds) to wait for the request
+                        to complete.
+        """
+        self._low_level_table.truncate(timeout=timeout)
+
+    def delete_where(
+        self,
+        row_start=None,
+        row_stop=None,
+        filter_=None,
+        batch_size=_DELETE_WHERE_BATCH_SIZE,
+        max_workers=_DELETE_WHERE_MAX_WORKERS,
+        progress=None,
+    ):
+        """Delete all rows in a range which match a filter.
+
+        The range is split into (up to) ``max_workers`` shards using the
+        row keys sampled by the server, and the shards are scanned
+        concurrently. Scans only return the row keys (the values are
+        stripped by the server), and the matched rows are deleted in
+        batches of ``batch_size`` rows while the scans continue.
+
+        .. note::
+
+            Rows are matched when they are scanned, so a row modified
+            between the scan and the delete is still deleted (even if it no
+            longer matches ``filter_``). Use :meth:`delete_prefix` to drop
+            all rows with a common prefix without scanning them.
+
+        :type row_start: str
+        :param row_start: (Optional) Row key where the scan should start
+                          (inclusive). If not specified, the scan starts at
+                          the first row of the table.
+
+        :type row_stop: str
+        :param row_stop: (Optional) Row key where the scan should end
+                         (exclusive). If not specified, the scan continues
+                         until the last row of the table.
+
+        :type filter_: :class:`RowFilter <.row_filters.RowFilter>`
+        :param filter_: (Optional) Filter a row must match to be deleted.
+                        If not specified, all rows in the range are deleted.
+
+        :type batch_size: int
+        :param batch_size: (Optional) The maximum number of rows deleted in
+                           a single request.
+
+        :type max_workers: int
+        :param max_workers: (Optional) The maximum number of shards scanned
+                            (and deleted from) concurrently.
+
+        :type progress: callable
+        :param progress: (Optional) Function called with the
+                         :class:`DeleteWhereResult` so far each time a batch
+                         of rows has been deleted.
+
+        :rtype: :class:`DeleteWhereResult`
+        :returns: The number of rows deleted, the time taken and the rows
+                  which could not be deleted.
+        :raises: :class:`TypeError <exceptions.TypeError>` if ``filter_`` is
+                 a string. :class:`ValueError <exceptions.ValueError>` if
+                 ``batch_size`` or ``max_workers`` is not positive.
+        """
+        if isinstance(filter_, six.string_types):
+            raise TypeError(
+                "Specifying filters as a string is not supported "
+                "by Cloud Bigtable. Use a "
+                "google.cloud.bigtable.row.RowFilter instead."
+            )
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive")
+
+        if row_start is not None:
+            row_start = _to_bytes(row_start)
+        if row_stop is not None:
+            row_stop = _to_bytes(row_stop)
+
+        keys_only_filter = _keys_only_filter(filter_)
+
+        shards = [(row_start, row_stop)]
+        if max_workers > 1:
+            sample_keys = [
+                sample.row_key for sample in self._low_level_table.sample_row_keys()
+            ]
+            shards = _split_row_range(sample_keys, row_start, row_stop, max_workers)
+
+        result = DeleteWhereResult()
+        lock = threading.Lock()
+        start = time.time()
+
+        def delete_rows(row_keys):
+            batch = self.batch()
+            for row_key in row_keys:
+                batch.delete(row_key)
+            failed_rows = batch.send()
+            with lock:
+                result.num_rows += len(row_keys)
+                result.failed_rows.extend(failed_rows)
+                result.elapsed = time.time() - start
+                if progress is not None:
+                    progress(result)
+
+        def delete_shard(shard_start, shard_stop):
+            rows_generator = self._low_level_table.read_rows(
+                row_set=_get_row_set_object(shard_start, shard_stop),
+                filter_=keys_only_filter,
+            )
+            row_keys = []
+            for rowdata in rows_generator:
+                row_keys.append(rowdata.row_key)
+                if len(row_keys) >= batch_size:
+                    delete_rows(row_keys)
+                    row_keys = []
+            if row_keys:
+                delete_rows(row_keys)
+
+        with futures.ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            in_flight = [
+                executor.submit(delete_shard, shard_start, shard_stop)
+                for shard_start, shard_stop in shards
+            ]
+            for future in in_flight:
+                future.result()
+
+        result.elapsed = time.time() - start
+        return result
+
+    def _warmup(self):
+        """Read (at most) one row key to prime the channel for this table.
+
+        The first request to a table pays for setting up the channel and
+        for routing to the table, so sending a cheap keys-only read keeps
+        that cost out of later requests.
+        """
+        rows_generator = self._low_level_table.read_rows(
+            limit=1, filter_=_keys_only_filter()
+        )
+        for _ in rows_generator:
+            pass
+
+    def _mutate_row(self, row, mutations, timestamp):
+        """Send mutations for a single row without going through a batch.
+
+        Mutations which don't fit in a single request are sent by a
+        :class:`Batch <.happybase.batch.Batch>`, which splits them.
+
+        :type row: str
+        :param row: The row key the mutations apply to.
+
+        :type mutations: list
+        :param mutations: List of tuples describing the mutations (as
+                          created by a batch).
+
+        :type timestamp: int
+        :param timestamp: Timestamp (in milliseconds since the epoch) that
+                          the mutations will be applied at (or :data:`None`).
+
+        :raises: :class:`~google.api_core.exceptions.GoogleAPICallError` if
+                 the mutations could not be applied.
+        """
+        if not mutations:
+            return
+
+        if len(mutations) > _MAX_REQUEST_MUTATIONS:
+            batch = self.batch(timestamp=timestamp, transaction=True)
+            batch._add_mutations(row, mutations)
+            for _, status in batch.send():
+                raise from_grpc_status(status.code, status.message)
+            return
+
+        put_timestamp, delete_range = _convert_timestamp(timestamp)
+        row_object = self._low_level_table.row(row)
+        _apply_mutations(row_object, mutations, put_timestamp, delete_range)
+
+        flow_controller = self._flow_controller
+        if flow_controller is None:
+            status = row_object.commit()
+        else:
+            num_bytes = sum(_mutation_size(mutation) for mutation in mutations)
+            flow_controller.acquire(len(mutations), num_bytes)
+            try:
+                status = row_object.commit()
+            finally:
+                flow_controller.release(len(mutations), num_bytes)
+
+        if status.code != code_pb2.OK:
+            raise from_grpc_status(status.code, status.message)
+
+    def check_and_put(
+        self, row, filter_or_column_value, data, else_data=None, timestamp=None
+    ):
+        """Atomically insert data into a row if it matches a condition.
+
+        The condition is checked and the data inserted by the server in a
+        single request, so nothing can modify the row in between.
+
+        For example, to insert ``data`` only if the row does not contain
+        ``b'fam:col'`` yet::
+
+            table.check_and_put(row, (b'fam:col', None), {}, else_data=data)
+
+        :type row: str
+        :param row: The row key where the mutation will be "put".
+
+        :type filter_or_column_value: :class:`~google.cloud.bigtable.row.RowFilter`
+        :param filter_or_column_value: Either a filter, which matches if it
+                                       matches any cell in the row, or a pair
+                                       of a column (``fam:col``) and a value,
+                                       which matches if the latest cell in the
+                                       column has that value. If the value is
+                                       :data:`None`, it matches if the column
+                                       has any cell.
+
+        :type data: dict
+        :param data: Dictionary containing the data to be inserted if the
+                     condition matches (as accepted by :meth:`put`).
+
+        :type else_data: dict
+        :param else_data: (Optional) Dictionary containing the data to be
+                          inserted if the condition does not match.
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch) that the mutations will be applied at.
+
+        :rtype: bool
+        :returns: Flag indicating if the condition matched.
+        :raises: :class:`ValueError <exceptions.ValueError>` if there is no
+                 data to insert in either case.
+        """
+        true_mutations = _put_mutations(data)
+        false_mutations = _put_mutations(else_data or {})
+        return self._check_and_mutate(
+            row, filter_or_column_value, true_mutations, false_mutations, timestamp
+        )
+
+    def check_and_delete(
+        self, row, filter_or_column_value, columns=None, timestamp=None
+    ):
+        """Atomically delete data from a row if it matches a condition.
+
+        The condition is checked and the data deleted by the server in a
+        single request, so nothing can modify the row in between. This
+        method deletes the entire ``row`` if ``columns`` is not specified.
+
+        :type row: str
+        :param row: The row key where the delete will occur.
+
+        :type filter_or_column_value: :class:`~google.cloud.bigtable.row.RowFilter`
+        :param filter_or_column_value: The condition, as accepted by
+                                       :meth:`check_and_put`.
+
+        :type columns: list
+        :param columns: (Optional) Iterable containing column names (as
+                        strings). Each column name can be either
+
+                          * an entire column family: ``fam`` or ``fam:``
+                          * a single column: ``fam:col``
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch) that the mutation will be applied at.
+
+        :rtype: bool
+        :returns: Flag indicating if the condition matched (and the data was
+                  deleted).
         """
-        with self.batch(timestamp=timestamp, wal=wal) as batch:
-            batch.delete(row, columns)
+        _, delete_range = _convert_timestamp(timestamp)
+        true_mutations = _delete_mutations(columns, delete_range)
+        return self._check_and_mutate(
+            row, filter_or_column_value, true_mutations, [], timestamp
+        )
+
+    def _check_and_mutate(
+        self, row, filter_or_column_value, true_mutations, false_mutations, timestamp
+    ):
+        """Send a conditional mutation request for a row.
+
+        :type row: str
+        :param row: The row key the mutations apply to.
+
+        :type filter_or_column_value: :class:`~google.cloud.bigtable.row.RowFilter`
+        :param filter_or_column_value: The condition, as accepted by
+                                       :meth:`check_and_put`.
+
+        :type true_mutations: list
+        :param true_mutations: The mutations (as created by a batch) applied if
+                               the condition matches.
+
+        :type false_mutations: list
+        :param false_mutations: The mutations applied if the condition does
+                                not match.
+
+        :type timestamp: int
+        :param timestamp: Timestamp (in milliseconds since the epoch) that
+                          the mutations will be applied at (or :data:`None`).
+
+        :rtype: bool
+        :returns: Flag indicating if the condition matched.
+        :raises: :class:`ValueError <exceptions.ValueError>` if there are no
+                 mutations.
+        """
+        if not true_mutations and not false_mutations:
+            raise ValueError("Must have at least one mutation.")
+
+        filter_ = _check_filter_helper(filter_or_column_value)
+        put_timestamp, delete_range = _convert_timestamp(timestamp)
+        row_object = self._low_level_table.row(row, filter_=filter_)
+        _apply_mutations(
+            row_object, true_mutations, put_timestamp, delete_range, state=True
+        )
+        _apply_mutations(
+            row_object, false_mutations, put_timestamp, delete_range, state=False
+        )
+        return bool(row_object.commit())
+
+    def put_many(
+        self,
+        rows,
+        timestamp=None,
+        batch_size=_PUT_MANY_BATCH_SIZE,
+        batch_bytes=_PUT_MANY_BATCH_BYTES,
+        max_in_flight=_PUT_MANY_MAX_IN_FLIGHT,
+    ):
+        """Insert many rows of data into this table.
+
+        Rows are consumed from ``rows`` (which can be a generator) and
+        grouped into :class:`Batch <.happybase.batch.Batch>` objects. Each
+        batch is sent once it holds ``batch_size`` mutations or
+        ``batch_bytes`` bytes of data, in a background thread, so that up to
+        ``max_in_flight`` requests are in flight while more rows are read.
+
+        .. note::
+
+            Batches may be applied out of order. If the same row key
+            appears more than once in ``rows``, the earlier data may be
+            written after the later data.
+
+        :type rows: iterable
+        :param rows: Iterable of pairs of row key and a dictionary containing
+                     the data to be inserted in that row (as accepted by
+                     :meth:`put`).
+
+        :type timestamp: int
+        :param timestamp: (Optional) Timestamp (in milliseconds since the
+                          epoch) that all mutations will be applied at.
+
+        :type batch_size: int
+        :param batch_size: (Optional) The maximum number of mutations to
+                           accumulate before sending them in a request.
+
+        :type batch_bytes: int
+        :param batch_bytes: (Optional) The maximum (approximate) size of the
+                            mutations to accumulate before sending them in
+                            a request.
+
+        :type max_in_flight: int
+        :param max_in_flight: (Optional) The maximum number of requests sent
+                              concurrently.
+
+        :rtype: :class:`PutManyResult`
+        :returns: The number of rows and mutations sent, the time taken and
+                  the rows which could not be written.
+        :raises: :class:`ValueError <exceptions.ValueError>` if
+                 ``max_in_flight`` is not positive.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be positive")
+
+        result = PutManyResult()
+        start = time.time()
+        in_flight = collections.deque()
+        with futures.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+
+            def submit(batch):
+                if len(in_flight) >= max_in_flight:
+                    result.failed_rows.extend(in_flight.popleft().result())
+                result.num_mutations += (
+                    batch._sent_mutation_count + batch._mutation_count
+                )
+                in_flight.append(executor.submit(batch.send))
+
+            batch = self.batch(timestamp=timestamp)
+            try:
+                for row, data in rows:
+                    batch.put(row, data)
+                    result.num_rows += 1
+                    if (
+                        batch._mutation_count >= batch_size
+                        or batch._mutation_bytes >= batch_bytes
+                    ):
+                        submit(batch)
+                        batch = self.batch(timestamp=timestamp)
+
+                if batch._mutation_count:
+                    submit(batch)
+            except Exception:
+                # Release what the unsent batch reserved with the flow
+                # controller, nothing else would.
+                batch.discard()
+                raise
+            for future in in_flight:
+                result.failed_rows.extend(future.result())
+
+        result.elapsed = time.time() - start
+        return result
 
     def batch(
-        self, timestamp=None, batch_size=None, transaction=False, wal=_WAL_SENTINEL
+        self,
+        timestamp=None,
+        batch_size=None,
+        transaction=False,
+        wal=_WAL_SENTINEL,
+        coalesce=False,
     ):
         """Create a new batch operation for this table.
 
         This method returns a new
         :class:`Batch <.happybase.batch.Batch>` instance that can be
-        used for mass data manipulation.
+        used for mass data manipulation. The batch uses the flow controller
+        of the connection (if any).
 
         :type timestamp: int
         :param timestamp: (Optional) Timestamp (in milliseconds since the
@@ -514,6 +1100,11 @@ class Table(object):
                     for Cloud Bigtable since it does not have a Write Ahead
                     Log.
 
+        :type coalesce: bool
+        :param coalesce: (Optional) Flag indicating if the created batch
+                         should only keep the last "put" to each cell and
+                         drop "put"s superseded by a later delete.
+
         :rtype: :class:`~google.cloud.bigtable.happybase.batch.Batch`
         :returns: A batch bound to this table.
         """
@@ -523,13 +1114,16 @@ class Table(object):
             batch_size=batch_size,
             transaction=transaction,
             wal=wal,
+            coalesce=coalesce,
+            flow_controller=self._flow_controller,
         )
 
     def counter_get(self, row, column):
         """Retrieve the current value of a counter column.
 
-        This method retrieves the current value of a counter column. If the
-        counter column does not exist, this function initializes it to ``0``.
+        This method reads the current value of a counter column. If the
+        counter column does not exist, ``0`` is returned (the counter is not
+        initialized).
 
         .. note::
 
@@ -544,11 +1138,62 @@ class Table(object):
         :param column: Column we are ``get``-ing from; of the form ``fam:col``.
 
         :rtype: int
-        :returns: Counter value (after initializing / incrementing by 0).
+        :returns: Counter value (or ``0`` if the counter does not exist).
         """
-        # Don't query directly, but increment with value=0 so that the counter
-        # is correctly initialized if didn't exist yet.
-        return self.counter_inc(row, column, value=0)
+        filter_ = _filter_chain_helper(column=column, versions=1)
+        partial_row_data = self._low_level_table.read_row(row, filter_=filter_)
+        column_family_id, column_qualifier = _parse_column(column)
+        return _counter_value(partial_row_data, column_family_id, column_qualifier)
+
+    def counters_get(self, rows, columns):
+        """Retrieve the current values of counter columns in several rows.
+
+        All the counters are read with a single ``read_rows`` request.
+        Counters which do not exist have the value ``0``.
+
+        :type rows: list
+        :param rows: Iterable of the row keys for the rows we are getting
+                     counters from.
+
+        :type columns: list
+        :param columns: Iterable of the counter columns to get; each of the
+                        form ``fam:col``.
+
+        :rtype: dict
+        :returns: Dictionary mapping each row key in ``rows`` to a dictionary
+                  mapping each column in ``columns`` to the counter value.
+        :raises: :class:`ValueError <exceptions.ValueError>` if a column
+                 does not have a qualifier.
+        """
+        rows = list(rows)
+        columns = list(columns)
+        encoded_columns = [_to_bytes(column) for column in columns]
+        column_pairs = _get_column_pairs(encoded_columns, require_qualifier=True)
+        if not rows or not columns:
+            # Avoid round-trip if the result is empty anyway
+            return {row_key: {column: 0 for column in columns} for row_key in rows}
+
+        filters = [_columns_filter_helper(encoded_columns)]
+        filter_ = _filter_chain_helper(versions=1, filters=filters)
+        row_set = _get_row_set_from_rows(rows)
+        rows_data = {}
+        for partial_row_data in self._low_level_table.read_rows(
+            row_set=row_set, filter_=filter_
+        ):
+            rows_data[partial_row_data.row_key] = partial_row_data
+
+        result = {}
+        for row_key in rows:
+            partial_row_data = rows_data.get(_to_bytes(row_key))
+            result[row_key] = {
+                column: _counter_value(
+                    partial_row_data, column_family_id, column_qualifier
+                )
+                for column, (column_family_id, column_qualifier) in zip(
+                    columns, column_pairs
+                )
+            }
+        return result
 
     def counter_set(self, row, column, value=0):
         """Set a counter column to a specific value.
@@ -592,11 +1237,42 @@ class Table(object):
         :rtype: int
         :returns: Counter value after incrementing.
         """
-        row = self._low_level_table.row(row, append=True)
-        if isinstance(column, six.binary_type):
-            column = column.decode("utf-8")
-        column_family_id, column_qualifier = column.split(":")
-        row.increment_cell_value(column_family_id, column_qualifier, value)
+        return self.counter_inc_many(row, {column: value})[column]
+
+    def counter_inc_many(self, row, data):
+        """Atomically increment several counter columns in a row.
+
+        All the increments are sent in a single request and applied
+        atomically. If a counter column does not exist, it is automatically
+        initialized to ``0`` before being incremented.
+
+        :type row: str
+        :param row: Row key for the row we are incrementing counters in.
+
+        :type data: dict
+        :param data: Dictionary mapping the columns to increment (of the
+                     form ``fam:col``) to the amount to increment them by.
+                     (Negative amounts decrement the counter.)
+
+        :rtype: dict
+        :returns: Dictionary mapping each column in ``data`` to the counter
+                  value after incrementing.
+        :raises: :class:`ValueError <exceptions.ValueError>` if a column
+                 does not have a qualifier or if the server does not return
+                 exactly one modified cell for a column.
+        """
+        if not data:
+            return {}
+
+        append_row = self._low_level_table.row(row, append=True)
+        columns = []
+        for column, value in six.iteritems(data):
+            column_family_id, column_qualifier = _parse_column(column)
+            if column_qualifier is None:
+                raise ValueError("Counter column must include a qualifier", column)
+            append_row.increment_cell_value(column_family_id, column_qualifier, value)
+            columns.append((column, column_family_id, column_qualifier))
+
         # See AppendRow.commit() will return a dictionary:
         # {
         #     u'col-fam-id': {
@@ -607,19 +1283,17 @@ class Table(object):
         #         ...
         #     },
         # }
-        modified_cells = row.commit()
-        # Get the cells in the modified column,
-        column_cells = modified_cells[column_family_id][
-            column_qualifier.encode("utf-8")
-        ]
-        # Make sure there is exactly one cell in the column.
-        if len(column_cells) != 1:
-            raise ValueError("Expected server to return one modified cell.")
-        column_cell = column_cells[0]
-        # Get the bytes value from the column and convert it to an integer.
-        bytes_value = column_cell[0]
-        (int_value,) = _UNPACK_I64(bytes_value)
-        return int_value
+        modified_cells = append_row.commit()
+        result = {}
+        for column, column_family_id, column_qualifier in columns:
+            column_cells = modified_cells[column_family_id][column_qualifier]
+            # Make sure there is exactly one cell in the column.
+            if len(column_cells) != 1:
+                raise ValueError("Expected server to return one modified cell.")
+            # Get the bytes value from the cell and convert it to an integer.
+            bytes_value = column_cells[0][0]
+            (result[column],) = _UNPACK_I64(bytes_value)
+        return result
 
     def counter_dec(self, row, column, value=1):
         """Atomically decrement a counter column.
@@ -644,6 +1318,219 @@ class Table(object):
         """
         return self.counter_inc(row, column, -value)
 
+    def counter_buffer(
+        self,
+        max_pending=_DEFAULT_MAX_PENDING,
+        flush_interval=_DEFAULT_FLUSH_INTERVAL,
+        max_workers=_DEFAULT_MAX_WORKERS,
+    ):
+        """Create a new buffer aggregating counter increments in this table.
+
+        This method returns a new
+        :class:`CounterBuffer <.happybase.counters.CounterBuffer>` instance
+        which adds up increments in memory and sends them periodically.
+
+        :type max_pending: int
+        :param max_pending: (Optional) The maximum number of counters with
+                            pending increments before they are flushed.
+
+        :type flush_interval: float
+        :param flush_interval: (Optional) Time (in seconds) between flushes
+                               of the pending increments. If :data:`None`,
+                               increments are not flushed periodically.
+
+        :type max_workers: int
+        :param max_workers: (Optional) The maximum number of rows incremented
+                            concurrently when flushing.
+
+        :rtype: :class:`CounterBuffer <.happybase.counters.CounterBuffer>`
+        :returns: A counter buffer bound to this table.
+        """
+        return CounterBuffer(
+            self,
+            max_pending=max_pending,
+            flush_interval=flush_interval,
+            max_workers=max_workers,
+        )
+
+    def sharded_counter_inc(self, row, column, value=1, shards=_DEFAULT_COUNTER_SHARDS):
+        """Atomically increment a counter sharded across several rows.
+
+        The counter is stored in ``column`` of ``shards`` rows (the row key
+        followed by ``#`` and the shard index), and each increment is
+        applied to one of them, picked at random. Concurrent increments
+        then rarely contend on the same row.
+
+        .. note::
+
+            The same number of ``shards`` must be used for every increment
+            and read of a counter.
+
+        :type row: str
+        :param row: Row key for the counter (used as the prefix of the shard
+                    row keys).
+
+        :type column: str
+        :param column: Column we are incrementing a value in; of the
+                       form ``fam:col``.
+
+        :type value: int
+        :param value: Amount to increment the counter by. (If negative,
+                      this is equivalent to decrement.)
+
+        :type shards: int
+        :param shards: (Optional) The number of shards of the counter.
+
+        :raises: :class:`ValueError <exceptions.ValueError>` if ``shards``
+                 is not positive.
+        """
+        shard_row_keys = _shard_row_keys(row, shards)
+        self.counter_inc(random.choice(shard_row_keys), column, value=value)
+
+    def sharded_counter_dec(self, row, column, value=1, shards=_DEFAULT_COUNTER_SHARDS):
+        """Atomically decrement a counter sharded across several rows.
+
+        See :meth:`sharded_counter_inc` for how the counter is stored.
+
+        :type row: str
+        :param row: Row key for the counter (used as the prefix of the shard
+                    row keys).
+
+        :type column: str
+        :param column: Column we are decrementing a value in; of the
+                       form ``fam:col``.
+
+        :type value: int
+        :param value: Amount to decrement the counter by. (If negative,
+                      this is equivalent to increment.)
+
+        :type shards: int
+        :param shards: (Optional) The number of shards of the counter.
+
+        :raises: :class:`ValueError <exceptions.ValueError>` if ``shards``
+                 is not positive.
+        """
+        self.sharded_counter_inc(row, column, value=-value, shards=shards)
+
+    def sharded_counter_get(self, row, column, shards=_DEFAULT_COUNTER_SHARDS):
+        """Retrieve the current value of a counter sharded across several rows.
+
+        All the shards are read with a single ``read_rows`` request (see
+        :meth:`counters_get`) and added up.
+
+        :type row: str
+        :param row: Row key for the counter (used as the prefix of the shard
+                    row keys).
+
+        :type column: str
+        :param column: Column we are ``get``-ing from; of the form ``fam:col``.
+
+        :type shards: int
+        :param shards: (Optional) The number of shards of the counter.
+
+        :rtype: int
+        :returns: Counter value (or ``0`` if the counter does not exist).
+        :raises: :class:`ValueError <exceptions.ValueError>` if ``shards``
+                 is not positive.
+        """
+        counters = self.counters_get(_shard_row_keys(row, shards), [column])
+        return sum(row_counters[column] for row_counters in six.itervalues(counters))
+
+
+def _shard_row_keys(row, shards):
+    """Get the row keys of the shards of a sharded counter.
+
+    :type row: str
+    :param row: Row key for the counter.
+
+    :type shards: int
+    :param shards: The number of shards of the counter.
+
+    :rtype: list
+    :returns: The row keys of the shards (as bytes).
+    :raises: :class:`ValueError <exceptions.ValueError>` if ``shards``
+             is not positive.
+    """
+    if shards < 1:
+        raise ValueError("shards must be positive")
+
+    prefix = _to_bytes(row) + _SHARD_SEPARATOR
+    return [prefix + str(shard).encode("ascii") for shard in six.moves.range(shards)]
+
+
+def _split_row_range(sample_keys, row_start, row_stop, num_shards):
+    """Split a range of rows into shards of roughly equal size.
+
+    :type sample_keys: list
+    :param sample_keys: Sorted row keys returned by ``SampleRowKeys``,
+                        delimiting sections of the table of roughly equal
+                        size. An empty key (the end of the table) is
+                        ignored.
+
+    :type row_start: bytes
+    :param row_start: Row key where the range starts (inclusive), or
+                      :data:`None` for the start of the table.
+
+    :type row_stop: bytes
+    :param row_stop: Row key where the range ends (exclusive), or
+                     :data:`None` for the end of the table.
+
+    :type num_shards: int
+    :param num_shards: The maximum number of shards.
+
+    :rtype: list
+    :returns: Pairs of start (inclusive) and stop (exclusive) row keys of
+              contiguous shards covering the range. The first start is
+              ``row_start`` and the last stop is ``row_stop``.
+    """
+    split_keys = [
+        row_key
+        for row_key in sample_keys
+        if row_key
+        and (row_start is None or row_key > row_start)
+        and (row_stop is None or row_key < row_stop)
+    ]
+    num_splits = min(num_shards - 1, len(split_keys))
+    if num_splits < len(split_keys):
+        # The sample keys delimit len(split_keys) + 1 sections, which are
+        # merged into num_splits + 1 shards.
+        step = float(len(split_keys) + 1) / (num_splits + 1)
+        split_keys = [
+            split_keys[int(step * index) - 1] for index in range(1, num_splits + 1)
+        ]
+
+    boundaries = [row_start] + split_keys + [row_stop]
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _counter_value(partial_row_data, column_family_id, column_qualifier):
+    """Decode the value of a counter column from a row read.
+
+    :type partial_row_data: :class:`.row_data.PartialRowData`
+    :param partial_row_data: Row data read from the table (or :data:`None`
+                             if the row does not exist).
+
+    :type column_family_id: str
+    :param column_family_id: The column family of the counter.
+
+    :type column_qualifier: bytes
+    :param column_qualifier: The column qualifier of the counter.
+
+    :rtype: int
+    :returns: The value in the latest cell of the counter column, or ``0``
+              if there is no such cell.
+    """
+    if partial_row_data is None:
+        return 0
+
+    column_cells = partial_row_data._cells.get(column_family_id, {})
+    cells = column_cells.get(column_qualifier)
+    if not cells:
+        return 0
+
+    (int_value,) = _UNPACK_I64(cells[0].value)
+    return int_value
+
 
 def _gc_rule_to_dict(gc_rule):
     """Converts garbage collection rule to dictionary if possible.
@@ -872,15 +1759,15 @@ def _filter_chain_helper(column=None, versions=None, timestamp=None, filters=Non
     :returns: The chained filter created, or just a single filter if only
               one was needed.
     :raises: :class:`ValueError <exceptions.ValueError>` if there are no
-             filters to chain.
+             filters to chain or if ``column`` does not contain a qualifier.
     """
     if filters is None:
         filters = []
 
     if column is not None:
-        if isinstance(column, six.binary_type):
-            column = column.decode("utf-8")
-        column_family_id, column_qualifier = column.split(":")
+        column_family_id, column_qualifier = _parse_column(column)
+        if column_qualifier is None:
+            raise ValueError("Column does not contain a qualifier", column)
         fam_filter = FamilyNameRegexFilter(column_family_id)
         qual_filter = ColumnQualifierRegexFilter(column_qualifier)
         filters.extend([fam_filter, qual_filter])
@@ -899,6 +1786,72 @@ def _filter_chain_helper(column=None, versions=None, timestamp=None, filters=Non
         return RowFilterChain(filters=filters)
 
 
+def _keys_only_filter(filter_=None):
+    """Create a filter returning only the key of matching rows.
+
+    :type filter_: :class:`RowFilter <.row_filters.RowFilter>`
+    :param filter_: (Optional) Filter a row must match to be returned.
+
+    :rtype: :class:`RowFilterChain <.row_filters.RowFilterChain>`
+    :returns: A chain returning the first cell of each (matching) row,
+              with its value stripped.
+    """
+    filters = [CellsRowLimitFilter(1), StripValueTransformerFilter(True)]
+    if filter_ is not None:
+        filters.insert(0, filter_)
+    return RowFilterChain(filters=filters)
+
+
+def _check_filter_helper(filter_or_column_value):
+    """Create the filter checked by a conditional mutation.
+
+    :type filter_or_column_value: :class:`~google.cloud.bigtable.row.RowFilter`
+    :param filter_or_column_value: Either a filter, or a pair of a column
+                                   (``fam:col``) and a value (or
+                                   :data:`None`).
+
+    :rtype: :class:`~google.cloud.bigtable.row.RowFilter`
+    :returns: The filter, or a filter matching the latest cell in the column
+              if it has the value (or any value if the value is
+              :data:`None`).
+    :raises: :class:`TypeError <exceptions.TypeError>` if the condition is
+             neither a filter nor a pair of column and value.
+             :class:`ValueError <exceptions.ValueError>` if the column does
+             not contain a qualifier.
+    """
+    if isinstance(filter_or_column_value, RowFilter):
+        return filter_or_column_value
+
+    if (
+        not isinstance(filter_or_column_value, tuple)
+        or len(filter_or_column_value) != 2
+    ):
+        raise TypeError(
+            "Condition must be a RowFilter or a pair of column and value",
+            filter_or_column_value,
+        )
+
+    column, value = filter_or_column_value
+    column_family_id, column_qualifier = _parse_column(column)
+    if column_qualifier is None:
+        raise ValueError("Column does not contain a qualifier", column)
+    # A range holding only the column matches it exactly, even if the
+    # qualifier contains regular expression metacharacters.
+    column_filter = ColumnRangeFilter(
+        column_family_id,
+        start_column=column_qualifier,
+        end_column=column_qualifier,
+        inclusive_start=True,
+        inclusive_end=True,
+    )
+    # Limit to 1 version since we only want to check the latest.
+    filter_ = RowFilterChain(filters=[column_filter, CellsColumnLimitFilter(1)])
+    if value is None:
+        return filter_
+    value_filter = ValueRangeFilter(start_value=value, end_value=value)
+    return RowFilterChain(filters=[filter_, value_filter])
+
+
 def _scan_filter_helper(
     row_start, row_stop, row_prefix, columns, timestamp, limit, kwargs
 ):
@@ -0,0 +1,750 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import unittest
+
+import mock
+
+try:
+    from google.cloud.bigtable import data as _data
+except ImportError:  # pragma: NO COVER google-cloud-bigtable < 2.23.0
+    _data = None
+
+_requires_data_client = unittest.skipIf(
+    _data is None, "Requires the google.cloud.bigtable.data client"
+)
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+async def _collect(async_iterable):
+    return [item async for item in async_iterable]
+
+
+def _mutation_dicts(mutations):
+    return [mutation._to_dict() for mutation in mutations]
+
+
+@_requires_data_client
+class TestAsyncConnection(unittest.TestCase):
+    @staticmethod
+    def _get_target_class():
+        from google.cloud.happybase.aio import AsyncConnection
+
+        return AsyncConnection
+
+    def _make_one(self, *args, **kwargs):
+        return self._get_target_class()(*args, **kwargs)
+
+    def test_constructor_defaults(self):
+        instance = _Instance()
+        client = _DataClient()
+        connection = self._make_one(instance=instance, client=client)
+
+        self.assertTrue(connection._instance is instance)
+        self.assertTrue(connection._client is client)
+        self.assertFalse(connection._owns_client)
+        self.assertEqual(connection.table_prefix, None)
+        self.assertEqual(connection.table_prefix_separator, "_")
+        self.assertEqual(connection._app_profile_id, None)
+
+    def test_constructor_creates_client(self):
+        instance = _Instance()
+        client = _DataClient()
+
+        with mock.patch(
+            "google.cloud.happybase.aio.BigtableDataClientAsync", return_value=client
+        ) as client_class:
+            connection = self._make_one(instance=instance)
+
+        client_class.assert_called_once_with(
+            project="project-id", credentials=instance._client._credentials
+        )
+        self.assertTrue(connection._client is client)
+        self.assertTrue(connection._owns_client)
+
+    def test_constructor_missing_instance(self):
+        instance = _Instance()
+
+        with mock.patch(
+            "google.cloud.happybase.aio._get_instance", return_value=instance
+        ):
+            connection = self._make_one(client=_DataClient())
+
+        self.assertTrue(connection._instance is instance)
+
+    def test_constructor_non_string_prefix(self):
+        with self.assertRaises(TypeError):
+            self._make_one(table_prefix=1, instance=_Instance(), client=_DataClient())
+
+    def test_constructor_non_string_prefix_separator(self):
+        with self.assertRaises(TypeError):
+            self._make_one(
+                table_prefix_separator=1, instance=_Instance(), client=_DataClient()
+            )
+
+    def test_table(self):
+        from google.cloud.happybase.aio import AsyncTable
+
+        client = _DataClient()
+        connection = self._make_one(
+            table_prefix="prefix",
+            instance=_Instance(),
+            client=client,
+            app_profile_id="profile",
+        )
+
+        table = connection.table("table-name")
+
+        self.assertTrue(isinstance(table, AsyncTable))
+        self.assertEqual(table.name, "prefix_table-name")
+        self.assertTrue(table.connection is connection)
+        self.assertEqual(
+            client.tables[0].args, ("instance-id", "prefix_table-name", "profile")
+        )
+        self.assertTrue(connection.table("table-name") is table)
+        self.assertEqual(
+            connection.table("table-name", use_prefix=False).name, "table-name"
+        )
+        self.assertEqual(len(client.tables), 2)
+
+    def test_close(self):
+        client = _DataClient()
+        with mock.patch(
+            "google.cloud.happybase.aio.BigtableDataClientAsync", return_value=client
+        ):
+            connection = self._make_one(instance=_Instance())
+        connection.table("table-name")
+
+        _run(connection.close())
+
+        self.assertTrue(client.tables[0].closed)
+        self.assertTrue(client.closed)
+        self.assertEqual(connection._tables, {})
+
+    def test_close_shared_client(self):
+        client = _DataClient()
+        connection = self._make_one(instance=_Instance(), client=client)
+
+        async def use_connection():
+            async with connection as result:
+                self.assertTrue(result is connection)
+                result.table("table-name")
+
+        _run(use_connection())
+
+        self.assertTrue(client.tables[0].closed)
+        self.assertFalse(client.closed)
+
+
+@_requires_data_client
+class TestAsyncTable(unittest.TestCase):
+    @staticmethod
+    def _get_target_class():
+        from google.cloud.happybase.aio import AsyncTable
+
+        return AsyncTable
+
+    def _make_one(self, name="table-name", rows=()):
+        from google.cloud.happybase.aio import AsyncConnection
+
+        client = _DataClient(rows)
+        connection = AsyncConnection(instance=_Instance(), client=client)
+        return self._get_target_class()(name, connection)
+
+    def test___repr__(self):
+        table = self._make_one()
+        self.assertEqual(repr(table), "<aio.AsyncTable name='table-name'>")
+
+    def test_row(self):
+        from google.cloud.happybase.table import _columns_filter_helper
+        from google.cloud.happybase.table import _filter_chain_helper
+
+        table = self._make_one(
+            rows=[_make_row(b"row-key", [("cf", b"col", b"val", 5000)])]
+        )
+
+        result = _run(table.row(b"row-key", columns=[b"cf:col"], timestamp=10))
+
+        self.assertEqual(result, {b"cf:col": b"val"})
+        ((method, row_key, row_filter),) = table._data_table.calls
+        self.assertEqual((method, row_key), ("read_row", b"row-key"))
+        expected = _filter_chain_helper(
+            versions=1, timestamp=10, filters=[_columns_filter_helper([b"cf:col"])]
+        )
+        self.assertEqual(row_filter, expected)
+
+    def test_row_missing(self):
+        table = self._make_one()
+        self.assertEqual(_run(table.row(b"row-key")), {})
+
+    def test_rows(self):
+        table = self._make_one(
+            rows=[
+                _make_row(b"row1", [("cf", b"col", b"val1", 1000)]),
+                _make_row(b"row2", [("cf", b"col", b"val2", 2000)]),
+            ]
+        )
+
+        result = _run(
+            table.rows(iter([b"row1", b"row2"]), columns=["cf"], include_timestamp=True)
+        )
+
+        self.assertEqual(
+            result,
+            [
+                (b"row1", {b"cf:col": (b"val1", 1)}),
+                (b"row2", {b"cf:col": (b"val2", 2)}),
+            ],
+        )
+        ((method, query),) = table._data_table.calls
+        self.assertEqual(method, "read_rows")
+        self.assertEqual(sorted(query.row_keys), [b"row1", b"row2"])
+        self.assertTrue(query.filter is not None)
+
+    def test_rows_all_columns(self):
+        table = self._make_one(rows=[_make_row(b"row1", [])])
+
+        self.assertEqual(_run(table.rows([b"row1"])), [(b"row1", {})])
+
+    def test_rows_empty(self):
+        table = self._make_one()
+        self.assertEqual(_run(table.rows([])), [])
+        self.assertEqual(table._data_table.calls, [])
+
+    def test_scan(self):
+        table = self._make_one(
+            rows=[
+                _make_row(b"row1", [("cf", b"col", b"val1", 1000)]),
+                _make_row(b"row2", []),
+            ]
+        )
+
+        result = _run(_collect(table.scan(row_prefix=b"row", limit=5)))
+
+        self.assertEqual(result, [(b"row1", {b"cf:col": b"val1"}), (b"row2", {})])
+        ((method, query),) = table._data_table.calls
+        self.assertEqual(method, "read_rows_stream")
+        self.assertEqual(query.limit, 5)
+        (row_range,) = query.row_ranges
+        self.assertEqual(row_range.start_key, b"row")
+        self.assertEqual(row_range.end_key, b"rox")
+
+    def test_scan_full_table(self):
+        table = self._make_one()
+
+        self.assertEqual(_run(_collect(table.scan())), [])
+        ((_, query),) = table._data_table.calls
+        (row_range,) = query.row_ranges
+        self.assertEqual(row_range.start_key, None)
+        self.assertEqual(row_range.end_key, None)
+
+    def test_scan_string_filter(self):
+        table = self._make_one()
+        with self.assertRaises(TypeError):
+            _run(_collect(table.scan(filter="KeyOnlyFilter ()")))
+
+    def test_put(self):
+        from google.cloud.bigtable.data import SetCell
+
+        table = self._make_one()
+
+        _run(table.put(b"row-key", {b"cf:col": b"val"}, timestamp=5))
+
+        ((method, row_key, mutations),) = table._data_table.calls
+        self.assertEqual((method, row_key), ("mutate_row", b"row-key"))
+        self.assertEqual(
+            _mutation_dicts(mutations),
+            _mutation_dicts([SetCell("cf", b"col", b"val", timestamp_micros=5000)]),
+        )
+
+    def test_put_wal(self):
+        import warnings
+        from google.cloud.happybase.batch import _WAL_WARNING
+
+        table = self._make_one()
+        with warnings.catch_warnings(record=True) as warned:
+            _run(table.put(b"row-key", {b"cf:col": b"val"}, wal=False))
+
+        self.assertEqual([str(warning.message) for warning in warned], [_WAL_WARNING])
+
+    def test_delete(self):
+        from google.cloud.bigtable.data import DeleteAllFromRow
+
+        table = self._make_one()
+
+        _run(table.delete(b"row-key"))
+
+        ((method, row_key, mutations),) = table._data_table.calls
+        self.assertEqual((method, row_key), ("mutate_row", b"row-key"))
+        self.assertEqual(
+            _mutation_dicts(mutations), _mutation_dicts([DeleteAllFromRow()])
+        )
+
+    def test_delete_columns_with_timestamp(self):
+        from google.cloud.bigtable.data import DeleteRangeFromColumn
+
+        table = self._make_one()
+
+        _run(table.delete(b"row-key", columns=[b"cf:col"], timestamp=5))
+
+        ((_, _, mutations),) = table._data_table.calls
+        self.assertEqual(
+            _mutation_dicts(mutations),
+            _mutation_dicts(
+                [DeleteRangeFromColumn("cf", b"col", end_timestamp_micros=6000)]
+            ),
+        )
+
+    def test_delete_wal(self):
+        import warnings
+        from google.cloud.happybase.batch import _WAL_WARNING
+
+        table = self._make_one()
+        with warnings.catch_warnings(record=True) as warned:
+            _run(table.delete(b"row-key", wal=False))
+
+        self.assertEqual([str(warning.message) for warning in warned], [_WAL_WARNING])
+
+    def test__mutate_row_no_mutations(self):
+        table = self._make_one()
+        _run(table._mutate_row(b"row-key", [], None))
+        self.assertEqual(table._data_table.calls, [])
+
+    def test__mutate_row_too_many_mutations(self):
+        table = self._make_one()
+        data = {b"cf:col1": b"val1", b"cf:col2": b"val2"}
+
+        with mock.patch("google.cloud.happybase.aio._MAX_REQUEST_MUTATIONS", 1):
+            with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 1):
+                _run(table.put(b"row-key", data))
+
+        methods = [call[0] for call in table._data_table.calls]
+        self.assertEqual(methods, ["bulk_mutate_rows", "bulk_mutate_rows"])
+
+    def test__mutate_row_too_many_mutations_failure(self):
+        from google.cloud.bigtable.data import MutationsExceptionGroup
+        from google.cloud.bigtable.data.exceptions import FailedMutationEntryError
+
+        table = self._make_one()
+        data_table = table._data_table
+        cause = RuntimeError("row failed")
+
+        async def bulk_mutate_rows(entries):
+            data_table.calls.append(("bulk_mutate_rows", entries))
+            error = FailedMutationEntryError(0, entries[0], cause)
+            raise MutationsExceptionGroup([error], len(entries))
+
+        data_table.bulk_mutate_rows = bulk_mutate_rows
+        data = {b"cf:col1": b"val1", b"cf:col2": b"val2"}
+
+        with mock.patch("google.cloud.happybase.aio._MAX_REQUEST_MUTATIONS", 1):
+            with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 1):
+                with self.assertRaises(RuntimeError) as exc_info:
+                    _run(table.put(b"row-key", data))
+
+        self.assertIs(exc_info.exception, cause)
+        # The remaining parts of the row are not sent.
+        self.assertEqual(len(data_table.calls), 1)
+
+    def test_batch(self):
+        from google.cloud.happybase.aio import AsyncBatch
+
+        table = self._make_one()
+
+        batch = table.batch(timestamp=5, batch_size=10)
+
+        self.assertTrue(isinstance(batch, AsyncBatch))
+        self.assertTrue(batch._table is table)
+        self.assertEqual(batch._timestamp, 5)
+        self.assertEqual(batch._batch_size, 10)
+        self.assertFalse(batch._transaction)
+
+    def test_counter_inc(self):
+        import struct
+
+        table = self._make_one()
+        table._data_table.read_modify_write_result = _make_row(
+            b"row-key", [("cf", b"col", struct.pack(">q", 42), 1000)]
+        )
+
+        result = _run(table.counter_inc(b"row-key", b"cf:col", 2))
+
+        self.assertEqual(result, 42)
+        ((method, row_key, rule),) = table._data_table.calls
+        self.assertEqual((method, row_key), ("read_modify_write_row", b"row-key"))
+        self.assertEqual(
+            (rule.family, rule.qualifier, rule.increment_amount), ("cf", b"col", 2)
+        )
+
+    def test_counter_dec(self):
+        import struct
+
+        table = self._make_one()
+        table._data_table.read_modify_write_result = _make_row(
+            b"row-key", [("cf", b"col", struct.pack(">q", -3), 1000)]
+        )
+
+        self.assertEqual(_run(table.counter_dec(b"row-key", b"cf:col", 3)), -3)
+        ((_, _, rule),) = table._data_table.calls
+        self.assertEqual(rule.increment_amount, -3)
+
+    def test_counter_inc_column_family(self):
+        table = self._make_one()
+        with self.assertRaises(ValueError):
+            _run(table.counter_inc(b"row-key", b"cf"))
+        self.assertEqual(table._data_table.calls, [])
+
+    def test_counter_inc_bad_result(self):
+        table = self._make_one()
+        table._data_table.read_modify_write_result = _make_row(
+            b"row-key",
+            [("cf", b"col", b"\x00" * 8, 2000), ("cf", b"col", b"\x00" * 8, 1000)],
+        )
+
+        with self.assertRaises(ValueError):
+            _run(table.counter_inc(b"row-key", b"cf:col"))
+
+
+@_requires_data_client
+class TestAsyncBatch(unittest.TestCase):
+    @staticmethod
+    def _get_target_class():
+        from google.cloud.happybase.aio import AsyncBatch
+
+        return AsyncBatch
+
+    def _make_one(self, **kwargs):
+        from google.cloud.happybase.aio import AsyncConnection
+
+        connection = AsyncConnection(instance=_Instance(), client=_DataClient())
+        return self._get_target_class()(connection.table("table-name"), **kwargs)
+
+    def test_constructor_transactional_batch_size(self):
+        with self.assertRaises(TypeError):
+            self._make_one(batch_size=1, transaction=True)
+
+    def test_constructor_non_positive_batch_size(self):
+        with self.assertRaises(ValueError):
+            self._make_one(batch_size=0)
+
+    def test_constructor_wal(self):
+        import warnings
+        from google.cloud.happybase.batch import _WAL_WARNING
+
+        with warnings.catch_warnings(record=True) as warned:
+            self._make_one(wal=False)
+
+        self.assertEqual([str(warning.message) for warning in warned], [_WAL_WARNING])
+
+    def test_send(self):
+        from google.cloud.bigtable.data import DeleteAllFromFamily
+        from google.cloud.bigtable.data import SetCell
+
+        batch = self._make_one()
+
+        async def use_batch():
+            await batch.put(b"row1", {b"cf:col": b"val"})
+            await batch.delete(b"row2", columns=["cf"])
+            await batch.put(b"row1", {b"cf:col2": b"val2"})
+            return await batch.send()
+
+        self.assertEqual(_run(use_batch()), [])
+
+        ((method, entries),) = batch._table._data_table.calls
+        self.assertEqual(method, "bulk_mutate_rows")
+        self.assertEqual([entry.row_key for entry in entries], [b"row1", b"row2"])
+        self.assertEqual(
+            _mutation_dicts(entries[0].mutations),
+            _mutation_dicts(
+                [
+                    SetCell("cf", b"col", b"val", timestamp_micros=-1),
+                    SetCell("cf", b"col2", b"val2", timestamp_micros=-1),
+                ]
+            ),
+        )
+        self.assertEqual(
+            _mutation_dicts(entries[1].mutations),
+            _mutation_dicts([DeleteAllFromFamily("cf")]),
+        )
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+
+    def test_send_empty(self):
+        batch = self._make_one()
+        self.assertEqual(_run(batch.send()), [])
+        self.assertEqual(batch._table._data_table.calls, [])
+
+    def test_send_failed_rows(self):
+        from google.cloud.bigtable.data import MutationsExceptionGroup
+        from google.cloud.bigtable.data.exceptions import FailedMutationEntryError
+
+        batch = self._make_one()
+        data_table = batch._table._data_table
+        cause = RuntimeError("row failed")
+
+        async def bulk_mutate_rows(entries):
+            data_table.calls.append(("bulk_mutate_rows", entries))
+            if len(data_table.calls) == 1:
+                error = FailedMutationEntryError(0, entries[0], cause)
+                raise MutationsExceptionGroup([error], len(entries))
+
+        data_table.bulk_mutate_rows = bulk_mutate_rows
+
+        async def use_batch():
+            await batch.put(b"row1", {b"cf:col1": b"val1", b"cf:col2": b"val2"})
+            await batch.put(b"row2", {b"cf:col": b"val"})
+            return await batch.send()
+
+        # Each row is split across requests, one mutation per request.
+        with mock.patch("google.cloud.happybase.aio._MAX_REQUEST_MUTATIONS", 1):
+            with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 1):
+                failed_rows = _run(use_batch())
+
+        self.assertEqual(failed_rows, [(b"row1", cause)])
+        # The second part of the failed row is not sent.
+        self.assertEqual(
+            [[entry.row_key for entry in entries] for _, entries in data_table.calls],
+            [[b"row1"], [b"row2"]],
+        )
+
+    def test_batch_size(self):
+        batch = self._make_one(batch_size=2)
+
+        async def use_batch():
+            await batch.put(b"row1", {b"cf:col": b"val"})
+            await batch.delete(b"row2", columns=[b"cf:col"])
+            await batch.delete(b"row3")
+
+        _run(use_batch())
+
+        self.assertEqual(len(batch._table._data_table.calls), 1)
+        self.assertEqual(batch._mutation_count, 1)
+
+    def test_put_and_delete_wal(self):
+        import warnings
+        from google.cloud.happybase.batch import _WAL_WARNING
+
+        batch = self._make_one()
+
+        async def use_batch():
+            await batch.put(b"row1", {b"cf:col": b"val"}, wal=False)
+            await batch.delete(b"row1", wal=False)
+
+        with warnings.catch_warnings(record=True) as warned:
+            _run(use_batch())
+
+        self.assertEqual(
+            [str(warning.message) for warning in warned], [_WAL_WARNING] * 2
+        )
+
+    def test_context_manager(self):
+        batch = self._make_one()
+
+        async def use_batch():
+            async with batch as result:
+                self.assertTrue(result is batch)
+                await batch.put(b"row1", {b"cf:col": b"val"})
+
+        _run(use_batch())
+        self.assertEqual(len(batch._table._data_table.calls), 1)
+
+    def _context_manager_error_helper(self, transaction):
+        batch = self._make_one(transaction=transaction)
+
+        async def use_batch():
+            async with batch:
+                await batch.put(b"row1", {b"cf:col": b"val"})
+                raise RuntimeError("failed")
+
+        with self.assertRaises(RuntimeError):
+            _run(use_batch())
+        return batch._table._data_table.calls
+
+    def test_context_manager_error(self):
+        self.assertEqual(len(self._context_manager_error_helper(False)), 1)
+
+    def test_context_manager_error_transactional(self):
+        self.assertEqual(self._context_manager_error_helper(True), [])
+
+
+@_requires_data_client
+class Test__to_data_mutations(unittest.TestCase):
+    def _call_fut(self, mutations, timestamp):
+        from google.cloud.happybase.aio import _to_data_mutations
+
+        return _to_data_mutations(mutations, timestamp)
+
+    def test_without_timestamp(self):
+        from google.cloud.bigtable.data import DeleteAllFromFamily
+        from google.cloud.bigtable.data import DeleteAllFromRow
+        from google.cloud.bigtable.data import DeleteRangeFromColumn
+        from google.cloud.bigtable.data import SetCell
+        from google.cloud.happybase.batch import _DELETE_CELL
+        from google.cloud.happybase.batch import _DELETE_FAMILY
+        from google.cloud.happybase.batch import _DELETE_ROW
+        from google.cloud.happybase.batch import _SET_CELL
+
+        mutations = [
+            (_SET_CELL, "cf", b"col", b"val"),
+            (_DELETE_CELL, "cf", b"col"),
+            (_DELETE_FAMILY, "cf"),
+            (_DELETE_ROW,),
+        ]
+
+        result = self._call_fut(mutations, None)
+
+        self.assertEqual(
+            _mutation_dicts(result),
+            _mutation_dicts(
+                [
+                    SetCell("cf", b"col", b"val", timestamp_micros=-1),
+                    DeleteRangeFromColumn("cf", b"col"),
+                    DeleteAllFromFamily("cf"),
+                    DeleteAllFromRow(),
+                ]
+            ),
+        )
+
+    def test_with_timestamp(self):
+        from google.cloud.bigtable.data import DeleteRangeFromColumn
+        from google.cloud.bigtable.data import SetCell
+        from google.cloud.happybase.batch import _DELETE_CELL
+        from google.cloud.happybase.batch import _SET_CELL
+
+        mutations = [(_SET_CELL, "cf", b"col", b"val"), (_DELETE_CELL, "cf", b"col")]
+
+        result = self._call_fut(mutations, 1234)
+
+        self.assertEqual(
+            _mutation_dicts(result),
+            _mutation_dicts(
+                [
+                    SetCell("cf", b"col", b"val", timestamp_micros=1234000),
+                    DeleteRangeFromColumn("cf", b"col", end_timestamp_micros=1235000),
+                ]
+            ),
+        )
+
+
+@_requires_data_client
+class Test__row_to_dict(unittest.TestCase):
+    def _call_fut(self, row_data, include_timestamp=False):
+        from google.cloud.happybase.aio import _row_to_dict
+
+        return _row_to_dict(row_data, include_timestamp=include_timestamp)
+
+    def test_latest_cells(self):
+        row_data = _make_row(
+            b"row-key",
+            [
+                ("cf1", b"col", b"new", 2000),
+                ("cf1", b"col", b"old", 1000),
+                ("cf2", b"col", b"val", 3000),
+            ],
+        )
+
+        self.assertEqual(
+            self._call_fut(row_data), {b"cf1:col": b"new", b"cf2:col": b"val"}
+        )
+        self.assertEqual(
+            self._call_fut(row_data, include_timestamp=True),
+            {b"cf1:col": (b"new", 2), b"cf2:col": (b"val", 3)},
+        )
+
+
+def _make_row(row_key, cells):
+    from google.cloud.bigtable.data import Cell
+    from google.cloud.bigtable.data import Row
+
+    return Row(
+        row_key,
+        [
+            Cell(value, row_key, family, qualifier, timestamp_micros)
+            for family, qualifier, value, timestamp_micros in cells
+        ],
+    )
+
+
+class _Client(object):
+    def __init__(self):
+        self.project = "project-id"
+        self._credentials = object()
+
+
+class _Instance(object):
+    def __init__(self):
+        self.instance_id = "instance-id"
+        self._client = _Client()
+
+
+class _DataTable(object):
+    def __init__(self, rows, *args):
+        self.args = args
+        self.rows = list(rows)
+        self.calls = []
+        self.read_modify_write_result = None
+        self.closed = False
+
+    async def read_row(self, row_key, row_filter=None):
+        self.calls.append(("read_row", row_key, row_filter))
+        return self.rows[0] if self.rows else None
+
+    async def read_rows(self, query):
+        self.calls.append(("read_rows", query))
+        return self.rows
+
+    async def read_rows_stream(self, query):
+        self.calls.append(("read_rows_stream", query))
+        return self._stream()
+
+    async def _stream(self):
+        for row_data in self.rows:
+            yield row_data
+
+    async def mutate_row(self, row_key, mutations):
+        self.calls.append(("mutate_row", row_key, mutations))
+
+    async def bulk_mutate_rows(self, entries):
+        self.calls.append(("bulk_mutate_rows", entries))
+
+    async def read_modify_write_row(self, row_key, rules):
+        self.calls.append(("read_modify_write_row", row_key, rules))
+        return self.read_modify_write_result
+
+    async def close(self):
+        self.closed = True
+
+
+class _DataClient(object):
+    def __init__(self, rows=()):
+        self.rows = rows
+        self.tables = []
+        self.closed = False
+
+    def get_table(self, instance_id, table_id, app_profile_id=None):
+        table = _DataTable(self.rows, instance_id, table_id, app_profile_id)
+        self.tables.append(table)
+        return table
+
+    async def close(self):
+        self.closed = True
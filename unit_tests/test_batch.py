@@ -15,6 +15,8 @@
 
 import unittest
 
+import mock
+
 
 class _SendMixin(object):
 
@@ -41,8 +43,11 @@ class TestBatch(unittest.TestCase):
         self.assertEqual(batch._timestamp, None)
         self.assertEqual(batch._delete_range, None)
         self.assertEqual(batch._transaction, False)
+        self.assertEqual(batch._coalesce, False)
+        self.assertEqual(batch._flow_controller, None)
         self.assertEqual(batch._row_map, {})
         self.assertEqual(batch._mutation_count, 0)
+        self.assertEqual(batch._mutation_bytes, 0)
 
     def test_constructor_explicit(self):
         from google.cloud._helpers import _datetime_from_microseconds
@@ -103,23 +108,131 @@ class TestBatch(unittest.TestCase):
         batch = self._make_one(table)
 
         batch._row_map = row_map = _MockRowMap()
-        row_map["row-key1"] = row1 = _MockRow()
-        row_map["row-key2"] = row2 = _MockRow()
+        row_map["row-key1"] = [("delete_row",)]
+        row_map["row-key2"] = [("delete_row",)]
         batch._mutation_count = 1337
+        batch._mutation_bytes = 42
 
         self.assertEqual(row_map.clear_count, 0)
         self.assertNotEqual(batch._mutation_count, 0)
         self.assertNotEqual(row_map, {})
         self.assertEqual(len(table._low_level_table.rows_mutate), 0)
 
-        batch.send()
+        failed_rows = batch.send()
+        self.assertEqual(failed_rows, [])
         self.assertEqual(row_map.clear_count, 1)
         self.assertEqual(batch._mutation_count, 0)
+        self.assertEqual(batch._mutation_bytes, 0)
+        self.assertEqual(sorted(low_level_table.rows_made), ["row-key1", "row-key2"])
+        row1 = low_level_table.mock_rows["row-key1"]
+        row2 = low_level_table.mock_rows["row-key2"]
         self.assertEqual(len(table._low_level_table.rows_mutate), 2)
         self.assertTrue(row1 in table._low_level_table.rows_mutate)
         self.assertTrue(row2 in table._low_level_table.rows_mutate)
+        self.assertEqual(row1.deletes, 1)
+        self.assertEqual(row2.deletes, 1)
         self.assertEqual(row_map, {})
 
+    def test_send_with_failed_rows(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table)
+
+        batch.delete("row-key1")
+        batch.delete("row-key2")
+        failed_status = _MockStatus(code=4)
+        low_level_table.statuses = [_MockStatus(), failed_status]
+
+        failed_rows = batch.send()
+        _, row_key2 = [row.row_key for row in low_level_table.rows_mutate]
+        self.assertEqual(failed_rows, [(row_key2, failed_status)])
+
+    def test_send_empty(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table)
+
+        self.assertEqual(batch.send(), [])
+        self.assertEqual(low_level_table.mutate_rows_calls, 0)
+
+    def _requests_sent(self, low_level_table):
+        return [
+            [(row.row_key, len(row.set_cell_calls) + row.deletes) for row in rows]
+            for rows in low_level_table.mutate_rows_requests
+        ]
+
+    def test_send_split_by_mutations(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table)
+
+        batch.put(b"row-key1", {b"cf:a": b"1", b"cf:b": b"2", b"cf:c": b"3"})
+        batch.put(b"row-key2", {b"cf:a": b"1"})
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 2):
+            failed_rows = batch.send()
+
+        self.assertEqual(failed_rows, [])
+        self.assertEqual(
+            self._requests_sent(low_level_table),
+            [[(b"row-key1", 2)], [(b"row-key1", 1), (b"row-key2", 1)]],
+        )
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+
+    def test_send_split_by_bytes(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table, coalesce=True)
+
+        batch.put(b"row-key1", {b"cf:a": b"1"})
+        batch.put(b"row-key2", {b"cf:a": b"1"})
+        batch.delete(b"row-key3")
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_BYTES", 6):
+            batch.send()
+
+        self.assertEqual(
+            self._requests_sent(low_level_table),
+            [[(b"row-key1", 1)], [(b"row-key2", 1), (b"row-key3", 1)]],
+        )
+
+    def test_send_split_row_failed(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table)
+        failed_status = _MockStatus(code=4)
+        statuses = [[_MockStatus()], [failed_status], [_MockStatus()]]
+
+        def mutate_rows(rows):
+            low_level_table.mutate_rows_requests.append(rows)
+            return statuses.pop(0)
+
+        low_level_table.mutate_rows = mutate_rows
+        batch.put(b"row-key1", {b"cf:a": b"1"})
+        batch.put(b"row-key2", {b"cf:a": b"1", b"cf:b": b"2", b"cf:c": b"3"})
+        batch.put(b"row-key3", {b"cf:a": b"1"})
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 2):
+            failed_rows = batch.send()
+
+        # The remaining part of the failed row is not sent.
+        self.assertEqual(failed_rows, [(b"row-key2", failed_status)])
+        self.assertEqual(
+            self._requests_sent(low_level_table),
+            [[(b"row-key1", 1)], [(b"row-key2", 2)], [(b"row-key3", 1)]],
+        )
+
+    def test_send_split_row_failed_skips_request(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table)
+        low_level_table.statuses = [_MockStatus(code=4)]
+
+        batch.put(b"row-key", {b"cf:a": b"1", b"cf:b": b"2", b"cf:c": b"3"})
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 1):
+            failed_rows = batch.send()
+
+        self.assertEqual(failed_rows, [(b"row-key", low_level_table.statuses[0])])
+        self.assertEqual(low_level_table.mutate_rows_calls, 1)
+
     def test__try_send_no_batch_size(self):
         klass = self._get_target_class()
 
@@ -170,46 +283,41 @@ class TestBatch(unittest.TestCase):
         batch._try_send()
         self.assertTrue(batch._send_called)
 
-    def test__get_row_exists(self):
-        table = object()
-        batch = self._make_one(table)
-
-        row_key = "row-key"
-        row_obj = object()
-        batch._row_map[row_key] = row_obj
-        result = batch._get_row(row_key)
-        self.assertEqual(result, row_obj)
-
-    def test__get_row_create_new(self):
-        # Make mock batch and make sure we can create a low-level table.
+    def test__make_row(self):
         low_level_table = _MockLowLevelTable()
         table = _MockTable(low_level_table)
         batch = self._make_one(table)
+        batch._timestamp = timestamp = object()
+        batch._delete_range = time_range = object()
 
-        # Make sure row map is empty.
-        self.assertEqual(batch._row_map, {})
-
-        # Customize/capture mock table creation.
-        low_level_table.mock_row = mock_row = object()
-
-        # Actually get the row (which creates a row via a low-level table).
-        row_key = "row-key"
-        result = batch._get_row(row_key)
-        self.assertEqual(result, mock_row)
+        mutations = [
+            ("set_cell", "cf1", b"qual1", b"value1"),
+            ("delete_cell", "cf2", b"qual2"),
+            ("delete_family", "cf3"),
+            ("delete_row",),
+        ]
+        row = batch._make_row("row-key", mutations)
 
-        # Check all the things that were constructed.
-        self.assertEqual(low_level_table.rows_made, [row_key])
-        # Check how the batch was updated.
-        self.assertEqual(batch._row_map, {row_key: mock_row})
+        self.assertIs(row, low_level_table.mock_rows["row-key"])
+        self.assertEqual(low_level_table.rows_made, ["row-key"])
+        self.assertEqual(
+            row.set_cell_calls,
+            [(("cf1", b"qual1", b"value1"), {"timestamp": timestamp})],
+        )
+        self.assertEqual(
+            row.delete_cell_calls, [(("cf2", b"qual2"), {"time_range": time_range})]
+        )
+        self.assertEqual(
+            row.delete_cells_calls, [(("cf3",), {"columns": row.ALL_COLUMNS})]
+        )
+        self.assertEqual(row.deletes, 1)
 
     def _put_helper(self, use_wal_none=False, use_value_string=False):
         import operator
 
         table = object()
         batch = self._make_one(table)
-        batch._timestamp = timestamp = object()
         row_key = "row-key"
-        batch._row_map[row_key] = row = _MockRow()
 
         col1_fam = "cf1"
         col1_qual = "qual1"
@@ -223,7 +331,7 @@ class TestBatch(unittest.TestCase):
         }
 
         self.assertEqual(batch._mutation_count, 0)
-        self.assertEqual(row.set_cell_calls, [])
+        self.assertEqual(batch._row_map, {})
 
         if use_wal_none:
             batch.put(row_key, data, wal=None)
@@ -236,18 +344,15 @@ class TestBatch(unittest.TestCase):
             batch.put(row_key, data)
 
         self.assertEqual(batch._mutation_count, 2)
-        # Since the calls depend on data.keys(), the order
+        self.assertEqual(batch._mutation_bytes, 2 * len("cf1qual1value1"))
+        # Since the mutations depend on data.keys(), the order
         # is non-deterministic.
-        first_elt = operator.itemgetter(0)
-        ordered_calls = sorted(row.set_cell_calls, key=first_elt)
+        first_elt = operator.itemgetter(1)
+        ordered_mutations = sorted(batch._row_map[row_key], key=first_elt)
 
-        cell1_args = (col1_fam, col1_qual, value1)
-        cell1_kwargs = {"timestamp": timestamp}
-        cell2_args = (col2_fam, col2_qual, value2)
-        cell2_kwargs = {"timestamp": timestamp}
-        self.assertEqual(
-            ordered_calls, [(cell1_args, cell1_kwargs), (cell2_args, cell2_kwargs)]
-        )
+        mutation1 = ("set_cell", col1_fam, col1_qual.encode("utf-8"), value1)
+        mutation2 = ("set_cell", col2_fam, col2_qual.encode("utf-8"), value2)
+        self.assertEqual(ordered_mutations, [mutation1, mutation2])
 
     def test_put_bad_wal(self):
         import warnings
@@ -266,6 +371,23 @@ class TestBatch(unittest.TestCase):
     def test_put(self):
         self._put_helper()
 
+    def test_put_appends_to_row(self):
+        table = object()
+        batch = self._make_one(table)
+
+        batch.put("row-key", {b"cf1:qual1": b"value1"})
+        batch.put("row-key", {b"cf1:qual1": b"value2"})
+        self.assertEqual(batch._mutation_count, 2)
+        self.assertEqual(
+            batch._row_map,
+            {
+                "row-key": [
+                    ("set_cell", "cf1", b"qual1", b"value1"),
+                    ("set_cell", "cf1", b"qual1", b"value2"),
+                ]
+            },
+        )
+
     def test_put_call_try_send(self):
         klass = self._get_target_class()
 
@@ -280,56 +402,21 @@ class TestBatch(unittest.TestCase):
         batch = CallTrySend(table)
 
         row_key = "row-key"
-        batch._row_map[row_key] = _MockRow()
 
         self.assertEqual(batch._mutation_count, 0)
         self.assertEqual(batch.try_send_calls, 0)
         # No data so that nothing happens
         batch.put(row_key, data={})
         self.assertEqual(batch._mutation_count, 0)
+        self.assertEqual(batch._row_map, {})
         self.assertEqual(batch.try_send_calls, 1)
 
-    def _delete_columns_test_helper(self, time_range=None):
-        table = object()
-        batch = self._make_one(table)
-        batch._delete_range = time_range
-
-        col1_fam = "cf1"
-        col2_fam = b"cf2"
-        col2_qual = b"col-name"
-        columns = [col1_fam + ":", col2_fam + b":" + col2_qual]
-        row_object = _MockRow()
-
-        batch._delete_columns(columns, row_object)
-        self.assertEqual(row_object.commits, 0)
-
-        cell_deleted_args = (col2_fam.decode("utf-8"), col2_qual.decode("utf-8"))
-        cell_deleted_kwargs = {"time_range": time_range}
-        self.assertEqual(
-            row_object.delete_cell_calls, [(cell_deleted_args, cell_deleted_kwargs)]
-        )
-        fam_deleted_args = (col1_fam,)
-        fam_deleted_kwargs = {"columns": row_object.ALL_COLUMNS}
-        self.assertEqual(
-            row_object.delete_cells_calls, [(fam_deleted_args, fam_deleted_kwargs)]
-        )
-
-    def test__delete_columns(self):
-        self._delete_columns_test_helper()
-
-    def test__delete_columns_w_time_and_col_fam(self):
-        time_range = object()
-        with self.assertRaises(ValueError):
-            self._delete_columns_test_helper(time_range=time_range)
-
     def _delete_entire_row_helper(self, use_wal_none=False):
         table = object()
         batch = self._make_one(table)
 
         row_key = "row-key"
-        batch._row_map[row_key] = row = _MockRow()
 
-        self.assertEqual(row.deletes, 0)
         self.assertEqual(batch._mutation_count, 0)
 
         if use_wal_none:
@@ -337,7 +424,7 @@ class TestBatch(unittest.TestCase):
         else:
             batch.delete(row_key, columns=None)
 
-        self.assertEqual(row.deletes, 1)
+        self.assertEqual(batch._row_map, {row_key: [("delete_row",)]})
         self.assertEqual(batch._mutation_count, 1)
 
     def test_delete_bad_wal(self):
@@ -359,13 +446,11 @@ class TestBatch(unittest.TestCase):
         batch._delete_range = object()
 
         row_key = "row-key"
-        batch._row_map[row_key] = row = _MockRow()
 
-        self.assertEqual(row.deletes, 0)
         self.assertEqual(batch._mutation_count, 0)
         with self.assertRaises(ValueError):
             batch.delete(row_key, columns=None)
-        self.assertEqual(row.deletes, 0)
+        self.assertEqual(batch._row_map, {})
         self.assertEqual(batch._mutation_count, 0)
 
     def test_delete_call_try_send(self):
@@ -382,13 +467,13 @@ class TestBatch(unittest.TestCase):
         batch = CallTrySend(table)
 
         row_key = "row-key"
-        batch._row_map[row_key] = _MockRow()
 
         self.assertEqual(batch._mutation_count, 0)
         self.assertEqual(batch.try_send_calls, 0)
         # No columns so that nothing happens
         batch.delete(row_key, columns=[])
         self.assertEqual(batch._mutation_count, 0)
+        self.assertEqual(batch._row_map, {})
         self.assertEqual(batch.try_send_calls, 1)
 
     def test_delete_some_columns(self):
@@ -396,7 +481,6 @@ class TestBatch(unittest.TestCase):
         batch = self._make_one(table)
 
         row_key = "row-key"
-        batch._row_map[row_key] = row = _MockRow()
 
         self.assertEqual(batch._mutation_count, 0)
 
@@ -407,17 +491,285 @@ class TestBatch(unittest.TestCase):
         batch.delete(row_key, columns=columns)
 
         self.assertEqual(batch._mutation_count, 2)
-        cell_deleted_args = (col2_fam.decode("utf-8"), col2_qual.decode("utf-8"))
-        cell_deleted_kwargs = {"time_range": None}
         self.assertEqual(
-            row.delete_cell_calls, [(cell_deleted_args, cell_deleted_kwargs)]
+            batch._row_map[row_key],
+            [
+                ("delete_family", col1_fam),
+                ("delete_cell", col2_fam.decode("utf-8"), col2_qual),
+            ],
         )
-        fam_deleted_args = (col1_fam,)
-        fam_deleted_kwargs = {"columns": row.ALL_COLUMNS}
+
+    def test_put_coalesce(self):
+        table = object()
+        batch = self._make_one(table, coalesce=True)
+
+        batch.put("row-key", {b"cf1:qual1": b"value1", b"cf1:qual2": b"value2"})
+        self.assertEqual(batch._mutation_count, 2)
+        batch.put("row-key", {b"cf1:qual1": b"value3"})
+        self.assertEqual(batch._mutation_count, 2)
+        # Coalesced mutations are still counted in the size.
+        self.assertEqual(batch._mutation_bytes, 3 * len("cf1qual1value1"))
+
+        row_mutations = batch._row_map["row-key"]
         self.assertEqual(
-            row.delete_cells_calls, [(fam_deleted_args, fam_deleted_kwargs)]
+            sorted(row_mutations.values()),
+            [
+                ("set_cell", "cf1", b"qual1", b"value3"),
+                ("set_cell", "cf1", b"qual2", b"value2"),
+            ],
         )
 
+    def test_put_coalesce_bad_value(self):
+        table = object()
+        batch = self._make_one(table, coalesce=True)
+        with self.assertRaises(ValueError):
+            batch.put("row-key", {b"cf1:qual1": u"value1"})
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+
+    def test_delete_coalesce_columns(self):
+        table = object()
+        batch = self._make_one(table, coalesce=True)
+
+        batch.put("row-key", {b"cf1:qual1": b"value1"})
+        batch.put("row-key", {b"cf2:qual2": b"value2"})
+        batch.put("row-key", {b"cf2:qual3": b"value3"})
+        self.assertEqual(batch._mutation_count, 3)
+        batch.delete("row-key", columns=[b"cf1:qual1", b"cf2"])
+        self.assertEqual(batch._mutation_count, 2)
+        # A later put is not superseded by an earlier delete.
+        batch.put("row-key", {b"cf1:qual1": b"value4"})
+        self.assertEqual(batch._mutation_count, 3)
+
+        row_mutations = batch._row_map["row-key"]
+        self.assertEqual(
+            list(row_mutations.values()),
+            [
+                ("delete_cell", "cf1", b"qual1"),
+                ("delete_family", "cf2"),
+                ("set_cell", "cf1", b"qual1", b"value4"),
+            ],
+        )
+
+    def test_delete_coalesce_entire_row(self):
+        table = object()
+        batch = self._make_one(table, coalesce=True)
+
+        batch.put("row-key", {b"cf1:qual1": b"value1", b"cf1:qual2": b"value2"})
+        batch.delete("row-key", columns=[b"cf1:qual1"])
+        batch.delete("row-key")
+        self.assertEqual(batch._mutation_count, 1)
+        batch.put("row-key", {b"cf1:qual1": b"value3"})
+        batch.delete("row-key", columns=[b"cf2"])
+        self.assertEqual(batch._mutation_count, 3)
+
+        row_mutations = batch._row_map["row-key"]
+        self.assertEqual(
+            list(row_mutations.values()),
+            [
+                ("delete_row",),
+                ("set_cell", "cf1", b"qual1", b"value3"),
+                ("delete_family", "cf2"),
+            ],
+        )
+
+    def test_delete_coalesce_family_with_ts(self):
+        table = object()
+        batch = self._make_one(table, coalesce=True)
+        batch._delete_range = object()
+
+        with self.assertRaises(ValueError):
+            batch.delete("row-key", columns=[b"cf1"])
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+
+    def test_send_coalesced(self):
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        batch = self._make_one(table, coalesce=True)
+        batch._timestamp = timestamp = object()
+        batch._delete_range = time_range = object()
+
+        batch.put("row-key", {b"cf1:qual1": b"value1"})
+        batch.put("row-key", {b"cf1:qual1": b"value2"})
+        batch.delete("row-key", columns=[b"cf2:qual2"])
+        batch.send()
+
+        row = low_level_table.mock_rows["row-key"]
+        self.assertEqual(low_level_table.rows_mutate, [row])
+        self.assertEqual(
+            row.set_cell_calls,
+            [(("cf1", b"qual1", b"value2"), {"timestamp": timestamp})],
+        )
+        self.assertEqual(
+            row.delete_cell_calls, [(("cf2", b"qual2"), {"time_range": time_range})]
+        )
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+
+    def test_put_with_flow_controller(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=10)
+        batch = self._make_one(table, flow_controller=flow_controller)
+
+        batch.put(b"row-key", {b"cf:a": b"1", b"cf:b": b"22"})
+        self.assertEqual(flow_controller.outstanding_mutations, 2)
+        self.assertEqual(flow_controller.outstanding_bytes, 9)
+        self.assertEqual(batch._reserved_mutations, 2)
+        self.assertEqual(batch._reserved_bytes, 9)
+
+        batch.send()
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_bytes, 0)
+        self.assertEqual(batch._reserved_mutations, 0)
+        self.assertEqual(batch._reserved_bytes, 0)
+
+    def test_put_with_flow_controller_sends_reserved(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=2, block=False)
+        batch = self._make_one(table, flow_controller=flow_controller)
+
+        batch.put(b"row-key1", {b"cf:a": b"1", b"cf:b": b"2"})
+        self.assertEqual(low_level_table.mutate_rows_calls, 0)
+        # The limit is reached, so the batch sends the mutations it holds
+        # rather than waiting for them to be released.
+        batch.put(b"row-key2", {b"cf:a": b"1"})
+        self.assertEqual(low_level_table.mutate_rows_calls, 1)
+        self.assertEqual(low_level_table.rows_made, [b"row-key1"])
+        self.assertEqual(flow_controller.outstanding_mutations, 1)
+        self.assertEqual(list(batch._row_map), [b"row-key2"])
+
+    def test_put_with_flow_controller_forced_send_failed(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        failed_status = _MockStatus(code=14)
+        low_level_table.statuses = [failed_status]
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=2, block=False)
+        batch = self._make_one(table, flow_controller=flow_controller)
+
+        batch.put(b"row-key1", {b"cf:a": b"1", b"cf:b": b"2"})
+        batch.put(b"row-key2", {b"cf:a": b"1"})
+        # The forced send is reported by the next send.
+        self.assertEqual(batch._sent_mutation_count, 2)
+        self.assertEqual(batch._failed_rows, [(b"row-key1", failed_status)])
+
+        low_level_table.statuses = None
+        self.assertEqual(batch.send(), [(b"row-key1", failed_status)])
+        self.assertEqual(batch._sent_mutation_count, 0)
+        self.assertEqual(batch._failed_rows, [])
+        self.assertEqual(batch.send(), [])
+
+    def test_discard(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=10)
+        batch = self._make_one(table, flow_controller=flow_controller)
+
+        batch.put(b"row-key", {b"cf:a": b"1", b"cf:b": b"2"})
+        self.assertEqual(flow_controller.outstanding_mutations, 2)
+        batch.discard()
+        self.assertEqual(low_level_table.mutate_rows_calls, 0)
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+        self.assertEqual(batch._mutation_bytes, 0)
+        self.assertEqual(batch._reserved_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_bytes, 0)
+
+    def test_discard_without_flow_controller(self):
+        table = _MockTable(_MockLowLevelTable())
+        batch = self._make_one(table)
+        batch.put(b"row-key", {b"cf:a": b"1"})
+        batch.discard()
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._mutation_count, 0)
+
+    def test_put_with_flow_controller_limit_exceeded(self):
+        from google.cloud.happybase.flow_control import FlowControlLimitExceeded
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=2, block=False)
+        flow_controller.acquire(2, 0)
+        batch = self._make_one(table, flow_controller=flow_controller)
+
+        with self.assertRaises(FlowControlLimitExceeded):
+            batch.put(b"row-key", {b"cf:a": b"1"})
+        self.assertEqual(batch._row_map, {})
+        self.assertEqual(batch._reserved_mutations, 0)
+        self.assertEqual(low_level_table.mutate_rows_calls, 0)
+
+    def test_send_transactional_with_flow_controller(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=10)
+        batch = self._make_one(
+            table, transaction=True, flow_controller=flow_controller
+        )
+
+        batch.put(b"row-key", {b"cf:a": b"1"})
+        # Transactional batches only reserve their mutations when sent.
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+
+        acquired = []
+        original_acquire = flow_controller.acquire
+
+        def acquire(num_mutations, num_bytes):
+            acquired.append((num_mutations, num_bytes))
+            original_acquire(num_mutations, num_bytes)
+
+        flow_controller.acquire = acquire
+        flow_controller.try_acquire = lambda *args: False
+        batch.send()
+        self.assertEqual(acquired, [(1, 4)])
+        self.assertEqual(low_level_table.mutate_rows_calls, 1)
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+
+    def test_send_transactional_empty_with_flow_controller(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=1, block=False)
+        flow_controller.acquire(5, 0)
+        batch = self._make_one(
+            table, transaction=True, flow_controller=flow_controller
+        )
+
+        self.assertEqual(batch.send(), [])
+        self.assertEqual(flow_controller.outstanding_mutations, 5)
+
+    def test_send_failure_releases_flow_controller(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        low_level_table = _MockLowLevelTable()
+        table = _MockTable(low_level_table)
+        flow_controller = FlowController(max_mutations=10)
+        batch = self._make_one(table, flow_controller=flow_controller)
+
+        def mutate_rows(rows):
+            raise RuntimeError("Failed")
+
+        low_level_table.mutate_rows = mutate_rows
+        batch.delete(b"row-key")
+        self.assertEqual(flow_controller.outstanding_mutations, 1)
+        with self.assertRaises(RuntimeError):
+            batch.send()
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+
     def test_context_manager(self):
         klass = self._get_target_class()
 
@@ -470,6 +822,184 @@ class TestBatch(unittest.TestCase):
         self.assertTrue(batch._send_called)
 
 
+class Test__convert_timestamp(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _convert_timestamp
+
+        return _convert_timestamp(*args, **kwargs)
+
+    def test_null(self):
+        self.assertEqual(self._call_fut(None), (None, None))
+
+    def test_it(self):
+        from google.cloud._helpers import _datetime_from_microseconds
+        from google.cloud.bigtable.row_filters import TimestampRange
+
+        timestamp = 144185290431
+        put_timestamp, delete_range = self._call_fut(timestamp)
+        self.assertEqual(put_timestamp, _datetime_from_microseconds(1000 * timestamp))
+        next_timestamp = _datetime_from_microseconds(1000 * (timestamp + 1))
+        self.assertEqual(delete_range, TimestampRange(end=next_timestamp))
+
+
+class Test__put_mutations(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _put_mutations
+
+        return _put_mutations(*args, **kwargs)
+
+    def test_it(self):
+        mutations = self._call_fut({b"cf1:qual1": b"value1"})
+        self.assertEqual(mutations, [("set_cell", "cf1", b"qual1", b"value1")])
+
+    def test_bad_value(self):
+        with self.assertRaises(ValueError):
+            self._call_fut({b"cf1:qual1": 1})
+
+    def test_column_family(self):
+        with self.assertRaises(ValueError):
+            self._call_fut({b"cf1": b"value1"})
+
+
+class Test__delete_mutations(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _delete_mutations
+
+        return _delete_mutations(*args, **kwargs)
+
+    def _delete_columns_test_helper(self, time_range=None):
+        col1_fam = "cf1"
+        col2_fam = b"cf2"
+        col2_qual = b"col-name"
+        columns = [col1_fam + ":", col2_fam + b":" + col2_qual]
+
+        mutations = self._call_fut(columns, time_range)
+        self.assertEqual(
+            mutations,
+            [
+                ("delete_family", col1_fam),
+                ("delete_cell", col2_fam.decode("utf-8"), col2_qual),
+            ],
+        )
+
+    def test_columns(self):
+        self._delete_columns_test_helper()
+
+    def test_columns_w_time_and_col_fam(self):
+        time_range = object()
+        with self.assertRaises(ValueError):
+            self._delete_columns_test_helper(time_range=time_range)
+
+    def test_entire_row(self):
+        self.assertEqual(self._call_fut(None, None), [("delete_row",)])
+
+    def test_entire_row_w_time(self):
+        with self.assertRaises(ValueError):
+            self._call_fut(None, object())
+
+
+class Test__apply_mutations(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _apply_mutations
+
+        return _apply_mutations(*args, **kwargs)
+
+    def test_with_kwargs(self):
+        row = _MockRow()
+        timestamp = object()
+        time_range = object()
+        mutations = [
+            ("set_cell", "cf1", b"qual1", b"value1"),
+            ("delete_cell", "cf2", b"qual2"),
+            ("delete_family", "cf3"),
+            ("delete_row",),
+        ]
+        self._call_fut(row, mutations, timestamp, time_range, state=False)
+
+        self.assertEqual(
+            row.set_cell_calls,
+            [(("cf1", b"qual1", b"value1"), {"timestamp": timestamp, "state": False})],
+        )
+        self.assertEqual(
+            row.delete_cell_calls,
+            [(("cf2", b"qual2"), {"time_range": time_range, "state": False})],
+        )
+        self.assertEqual(
+            row.delete_cells_calls,
+            [(("cf3",), {"columns": row.ALL_COLUMNS, "state": False})],
+        )
+        self.assertEqual(row.delete_calls, [{"state": False}])
+
+
+class Test__split_row(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _split_row
+
+        return _split_row(*args, **kwargs)
+
+    def test_within_limits(self):
+        mutations = [("set_cell", "cf", b"a", b"1"), ("delete_row",)]
+        self.assertEqual(self._call_fut(mutations), [(mutations, 4)])
+
+    def test_too_many_mutations(self):
+        mutations = [("set_cell", "cf", b"a", b"1")] * 5
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 2):
+            parts = self._call_fut(mutations)
+        self.assertEqual(
+            parts, [(mutations[:2], 8), (mutations[2:4], 8), (mutations[4:], 4)]
+        )
+
+    def test_too_many_bytes(self):
+        small = ("set_cell", "cf", b"a", b"1")
+        large = ("set_cell", "cf", b"a", b"value")
+        mutations = [small, large, small, small]
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_BYTES", 8):
+            parts = self._call_fut(mutations)
+        # The large mutation exceeds the limit on its own.
+        self.assertEqual(parts, [([small], 4), ([large], 8), ([small, small], 8)])
+
+
+class Test__split_requests(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _split_requests
+
+        return _split_requests(*args, **kwargs)
+
+    def test_empty(self):
+        self.assertEqual(self._call_fut([]), [])
+
+    def test_rows_grouped(self):
+        mutation = ("set_cell", "cf", b"a", b"1")
+        row_mutations = [
+            (b"row-key1", [mutation]),
+            (b"row-key2", [mutation, mutation]),
+            (b"row-key3", [mutation]),
+        ]
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 3):
+            requests = self._call_fut(row_mutations)
+        self.assertEqual(requests, [row_mutations[:2], row_mutations[2:]])
+
+    def test_split_row_parts_in_consecutive_requests(self):
+        mutation = ("set_cell", "cf", b"a", b"1")
+        row_mutations = [(b"row-key1", [mutation] * 3), (b"row-key2", [mutation])]
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_MUTATIONS", 2):
+            requests = self._call_fut(row_mutations)
+        self.assertEqual(
+            requests,
+            [
+                [(b"row-key1", [mutation] * 2)],
+                [(b"row-key1", [mutation]), (b"row-key2", [mutation])],
+            ],
+        )
+
+    def test_split_by_bytes(self):
+        mutation = ("set_cell", "cf", b"a", b"1")
+        row_mutations = [(b"row-key1", [mutation]), (b"row-key2", [mutation])]
+        with mock.patch("google.cloud.happybase.batch._MAX_REQUEST_BYTES", 7):
+            requests = self._call_fut(row_mutations)
+        self.assertEqual(requests, [row_mutations[:1], row_mutations[1:]])
+
+
 class Test__get_column_pairs(unittest.TestCase):
     def _call_fut(self, *args, **kwargs):
         from google.cloud.happybase.batch import _get_column_pairs
@@ -480,11 +1010,11 @@ class Test__get_column_pairs(unittest.TestCase):
         columns = [b"cf1", u"cf2:", b"cf3::", b"cf3:name1", b"cf3:name2"]
         result = self._call_fut(columns)
         expected_result = [
-            ["cf1", None],
-            ["cf2", None],
-            ["cf3", ""],
-            ["cf3", "name1"],
-            ["cf3", "name2"],
+            ("cf1", None),
+            ("cf2", None),
+            ("cf3", b""),
+            ("cf3", b"name1"),
+            ("cf3", b"name2"),
         ]
         self.assertEqual(result, expected_result)
 
@@ -514,6 +1044,55 @@ class Test__get_column_pairs(unittest.TestCase):
             self._call_fut(columns, require_qualifier=True)
 
 
+class Test__parse_column(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.batch import _parse_column
+
+        return _parse_column(*args, **kwargs)
+
+    def _call_with_cache(self, column, cache, cache_size=1024):
+        with mock.patch("google.cloud.happybase.batch._COLUMN_CACHE", cache):
+            with mock.patch(
+                "google.cloud.happybase.batch._COLUMN_CACHE_SIZE", cache_size
+            ):
+                return self._call_fut(column)
+
+    def test_column(self):
+        cache = {}
+        result = self._call_with_cache(b"cf1:qual1", cache)
+        self.assertEqual(result, ("cf1", b"qual1"))
+        self.assertEqual(cache, {b"cf1:qual1": result})
+
+    def test_column_family(self):
+        cache = {}
+        self.assertEqual(self._call_with_cache(b"cf1", cache), ("cf1", None))
+        self.assertEqual(self._call_with_cache(u"cf2:", cache), ("cf2", None))
+        self.assertEqual(cache, {b"cf1": ("cf1", None), u"cf2:": ("cf2", None)})
+
+    def test_column_unicode(self):
+        result = self._call_with_cache(u"cf1:qual1", {})
+        self.assertEqual(result, ("cf1", b"qual1"))
+
+    def test_cached_value_reused(self):
+        cached = object()
+        cache = {b"cf1:qual1": cached}
+        self.assertIs(self._call_with_cache(b"cf1:qual1", cache), cached)
+
+    def test_cache_full(self):
+        cache = {}
+        self._call_with_cache(b"cf1:qual1", cache, cache_size=2)
+        self._call_with_cache(b"cf1:qual2", cache, cache_size=2)
+        self.assertEqual(len(cache), 2)
+        self._call_with_cache(b"cf1:qual3", cache, cache_size=2)
+        self.assertEqual(cache, {b"cf1:qual3": ("cf1", b"qual3")})
+
+    def test_bad_column_not_cached(self):
+        cache = {}
+        with self.assertRaises(ValueError):
+            self._call_with_cache(b"a:b:c", cache)
+        self.assertEqual(cache, {})
+
+
 class _MockRowMap(dict):
 
     clear_count = 0
@@ -527,15 +1106,17 @@ class _MockRow(object):
 
     ALL_COLUMNS = object()
 
-    def __init__(self):
-        self.commits = 0
+    def __init__(self, row_key=None):
+        self.row_key = row_key
         self.deletes = 0
+        self.delete_calls = []
         self.set_cell_calls = []
         self.delete_cell_calls = []
         self.delete_cells_calls = []
 
-    def delete(self):
+    def delete(self, **kwargs):
         self.deletes += 1
+        self.delete_calls.append(kwargs)
 
     def set_cell(self, *args, **kwargs):
         self.set_cell_calls.append((args, kwargs))
@@ -558,11 +1139,25 @@ class _MockLowLevelTable(object):
         self.kwargs = kwargs
         self.rows_made = []
         self.rows_mutate = []
-        self.mock_row = None
+        self.mock_rows = {}
+        self.mutate_rows_calls = 0
+        self.mutate_rows_requests = []
+        self.statuses = None
 
     def row(self, row_key):
         self.rows_made.append(row_key)
-        return self.mock_row
+        self.mock_rows[row_key] = row = _MockRow(row_key)
+        return row
 
     def mutate_rows(self, rows):
+        self.mutate_rows_calls += 1
+        self.mutate_rows_requests.append(rows)
         self.rows_mutate.extend(rows)
+        if self.statuses is None:
+            return [_MockStatus() for _ in rows]
+        return self.statuses
+
+
+class _MockStatus(object):
+    def __init__(self, code=0):
+        self.code = code
@@ -19,12 +19,18 @@ import mock
 
 
 class Test__get_instance(unittest.TestCase):
+    def setUp(self):
+        from google.cloud.happybase.connection import _clear_instance_cache
+
+        _clear_instance_cache()
+        self.addCleanup(_clear_instance_cache)
+
     def _call_fut(self):
         from google.cloud.happybase.connection import _get_instance
 
         return _get_instance()
 
-    def _helper(self, instances=(), failed_locations=()):
+    def _helper(self, instances=(), failed_locations=(), environ=None):
         from functools import partial
 
         client_with_instances = partial(
@@ -34,7 +40,8 @@ class Test__get_instance(unittest.TestCase):
         with mock.patch(
             "google.cloud.happybase.connection.Client", client_with_instances
         ):
-            result = self._call_fut()
+            with mock.patch.dict("os.environ", environ or {}, clear=True):
+                result = self._call_fut()
 
         # If we've reached this point, then _call_fut didn't fail, so we know
         # there is exactly one instance.
@@ -44,11 +51,18 @@ class Test__get_instance(unittest.TestCase):
         self.assertEqual(client.args, ())
         expected_kwargs = {"admin": True}
         self.assertEqual(client.kwargs, expected_kwargs)
+        return result
 
     def test_default(self):
         instance = _Instance()
         self._helper(instances=[instance])
 
+    def test_cached_in_process(self):
+        instance = _Instance()
+        self._helper(instances=[instance])
+        # The second call doesn't create a client, so would fail otherwise.
+        self.assertTrue(self._call_fut() is instance)
+
     def test_with_no_instances(self):
         with self.assertRaises(ValueError):
             self._helper()
@@ -64,6 +78,180 @@ class Test__get_instance(unittest.TestCase):
         with self.assertRaises(ValueError):
             self._helper(instances=[instance], failed_locations=[failed_location])
 
+    def _environ_helper(self, instance_name):
+        from google.cloud.happybase.connection import INSTANCE_ENV_VAR
+
+        with mock.patch("google.cloud.happybase.connection.Client", _Client):
+            with mock.patch.dict("os.environ", {INSTANCE_ENV_VAR: instance_name}):
+                return self._call_fut()
+
+    def test_instance_id_in_environ(self):
+        result = self._environ_helper("instance-id")
+        self.assertEqual(result.instance_id, "instance-id")
+        self.assertEqual(result.client.kwargs, {"admin": True})
+
+    def test_instance_name_in_environ(self):
+        result = self._environ_helper("projects/project-id/instances/instance-id")
+        self.assertEqual(result.instance_id, "instance-id")
+        self.assertEqual(
+            result.client.kwargs, {"admin": True, "project": "project-id"}
+        )
+
+    def test_bad_instance_name_in_environ(self):
+        with self.assertRaises(ValueError):
+            self._environ_helper("projects/project-id/instance-id")
+        with self.assertRaises(ValueError):
+            self._environ_helper("folders/project-id/instances/instance-id")
+
+    def _cache_environ(self, cache_path, ttl=None):
+        from google.cloud.happybase.connection import INSTANCE_CACHE_ENV_VAR
+        from google.cloud.happybase.connection import INSTANCE_CACHE_TTL_ENV_VAR
+
+        environ = {INSTANCE_CACHE_ENV_VAR: cache_path}
+        if ttl is not None:
+            environ[INSTANCE_CACHE_TTL_ENV_VAR] = str(ttl)
+        return environ
+
+    def _write_cache(self, cache_path, **cached):
+        import json
+        import time
+
+        cached.setdefault("project", _Client.project)
+        cached.setdefault("instance_id", "cached-instance")
+        cached.setdefault("timestamp", time.time())
+        with open(cache_path, "w") as file_obj:
+            json.dump(cached, file_obj)
+
+    def _cache_path(self):
+        import os
+        import shutil
+        import tempfile
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        return os.path.join(temp_dir, "instance.json")
+
+    def test_disk_cache_written(self):
+        import json
+
+        cache_path = self._cache_path()
+        instance = _Instance(instance_id="listed-instance")
+        self._helper(instances=[instance], environ=self._cache_environ(cache_path))
+
+        with open(cache_path) as file_obj:
+            cached = json.load(file_obj)
+        self.assertEqual(cached["project"], _Client.project)
+        self.assertEqual(cached["instance_id"], "listed-instance")
+
+    def test_disk_cache_hit(self):
+        cache_path = self._cache_path()
+        self._write_cache(cache_path)
+
+        with mock.patch("google.cloud.happybase.connection.Client", _Client):
+            with mock.patch.dict("os.environ", self._cache_environ(cache_path)):
+                result = self._call_fut()
+
+        self.assertEqual(result.instance_id, "cached-instance")
+        self.assertEqual(result.client.kwargs, {"admin": True})
+
+    def test_disk_cache_expired(self):
+        cache_path = self._cache_path()
+        self._write_cache(cache_path, timestamp=0.0)
+        instance = _Instance()
+        self._helper(
+            instances=[instance], environ=self._cache_environ(cache_path, ttl=60)
+        )
+
+    def test_disk_cache_invalid_ttl(self):
+        cache_path = self._cache_path()
+        self._write_cache(cache_path)
+
+        environ = self._cache_environ(cache_path, ttl="one hour")
+        with mock.patch("google.cloud.happybase.connection.Client", _Client):
+            with mock.patch.dict("os.environ", environ):
+                result = self._call_fut()
+
+        # The default lifetime is used instead.
+        self.assertEqual(result.instance_id, "cached-instance")
+
+    def test_disk_cache_other_project(self):
+        cache_path = self._cache_path()
+        self._write_cache(cache_path, project="other-project")
+        instance = _Instance()
+        self._helper(instances=[instance], environ=self._cache_environ(cache_path))
+
+    def test_disk_cache_invalid(self):
+        cache_path = self._cache_path()
+        with open(cache_path, "w") as file_obj:
+            file_obj.write("not json")
+        instance = _Instance()
+        self._helper(instances=[instance], environ=self._cache_environ(cache_path))
+
+
+class Test__reset_instance_cache_after_fork(unittest.TestCase):
+    def _call_fut(self):
+        from google.cloud.happybase.connection import (
+            _reset_instance_cache_after_fork,
+        )
+
+        return _reset_instance_cache_after_fork()
+
+    def test_it(self):
+        from google.cloud.happybase import connection as MUT
+
+        old_lock = MUT._INSTANCE_CACHE_LOCK
+        with mock.patch.dict(MUT._INSTANCE_CACHE, {"instance": object()}):
+            with mock.patch.object(MUT, "_INSTANCE_CACHE_LOCK", old_lock):
+                self._call_fut()
+                self.assertFalse(MUT._INSTANCE_CACHE_LOCK is old_lock)
+            self.assertEqual(MUT._INSTANCE_CACHE, {})
+
+
+class Test__write_instance_cache(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.connection import _write_instance_cache
+
+        return _write_instance_cache(*args, **kwargs)
+
+    def test_missing_directory(self):
+        import os
+        import tempfile
+
+        cache_path = os.path.join(tempfile.gettempdir(), "missing", "dir", "file")
+        self._call_fut(cache_path, "project-id", "instance-id")
+        self.assertFalse(os.path.exists(cache_path))
+
+    def test_existing_file_replaced(self):
+        import json
+        import os
+        import shutil
+        import tempfile
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache_path = os.path.join(temp_dir, "instance.json")
+        self._call_fut(cache_path, "project-id", "old-instance-id")
+
+        self._call_fut(cache_path, "project-id", "instance-id")
+        with open(cache_path) as file_obj:
+            cached = json.load(file_obj)
+        self.assertEqual(cached["instance_id"], "instance-id")
+        self.assertEqual(os.listdir(temp_dir), ["instance.json"])
+
+    def test_rename_failure(self):
+        import os
+        import shutil
+        import tempfile
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        # Renaming a file over a directory fails.
+        cache_path = os.path.join(temp_dir, "instance.json")
+        os.mkdir(cache_path)
+
+        self._call_fut(cache_path, "project-id", "instance-id")
+        self.assertEqual(os.listdir(temp_dir), ["instance.json"])
+
 
 class TestConnection(unittest.TestCase):
     def _get_target_class(self):
@@ -81,6 +269,7 @@ class TestConnection(unittest.TestCase):
         self.assertEqual(connection._instance, instance)
         self.assertEqual(connection.table_prefix, None)
         self.assertEqual(connection.table_prefix_separator, "_")
+        self.assertEqual(connection._flow_controller, None)
 
     def test_constructor_no_autoconnect(self):
         instance = _Instance()  # Avoid implicit environ check.
@@ -88,6 +277,11 @@ class TestConnection(unittest.TestCase):
         self.assertEqual(connection.table_prefix, None)
         self.assertEqual(connection.table_prefix_separator, "_")
 
+    def test_constructor_negative_metadata_ttl(self):
+        instance = _Instance()  # Avoid implicit environ check.
+        with self.assertRaises(ValueError):
+            self._make_one(instance=instance, metadata_ttl=-1)
+
     def test_constructor_missing_instance(self):
         instance = _Instance()
 
@@ -108,14 +302,17 @@ class TestConnection(unittest.TestCase):
         table_prefix = "table-prefix"
         table_prefix_separator = "sep"
         instance = _Instance()
+        flow_controller = object()
 
         connection = self._make_one(
             autoconnect=autoconnect,
             table_prefix=table_prefix,
             table_prefix_separator=table_prefix_separator,
             instance=instance,
+            flow_controller=flow_controller,
         )
         self.assertTrue(connection._instance is instance)
+        self.assertTrue(connection._flow_controller is flow_controller)
         self.assertEqual(connection.table_prefix, table_prefix)
         self.assertEqual(connection.table_prefix_separator, table_prefix_separator)
 
@@ -196,6 +393,49 @@ class TestConnection(unittest.TestCase):
         self.assertEqual(table.name, name)
         self.assertEqual(table.connection, connection)
 
+    def test_table_factory_cached(self):
+        instance = _Instance()  # Avoid implicit environ check.
+        connection = self._make_one(autoconnect=False, instance=instance)
+
+        with mock.patch(
+            "google.cloud.happybase.table._LowLevelTable", _MockLowLevelTable
+        ):
+            table = connection.table("table-name")
+            self.assertTrue(connection.table("table-name") is table)
+            self.assertFalse(connection.table("other-name") is table)
+
+            # A table is created for each instance the connection uses.
+            connection._instance = new_instance = _Instance()
+            new_table = connection.table("table-name")
+            self.assertFalse(new_table is table)
+            self.assertTrue(connection.table("table-name") is new_table)
+            connection._instance = instance
+            self.assertTrue(connection.table("table-name") is table)
+
+        self.assertEqual(new_table._low_level_table.args, ("table-name", new_instance))
+        self.assertEqual(len(connection._tables["table-name"]), 2)
+
+    def test_table_factory_cache_limit(self):
+        instance = _Instance()  # Avoid implicit environ check.
+        connection = self._make_one(autoconnect=False, instance=instance)
+
+        with mock.patch(
+            "google.cloud.happybase.table._LowLevelTable", _MockLowLevelTable
+        ):
+            with mock.patch(
+                "google.cloud.happybase.connection._MAX_CACHED_TABLE_INSTANCES", 2
+            ):
+                table = connection.table("table-name")
+                for _ in range(2):
+                    connection._instance = _Instance()
+                    connection.table("table-name")
+                connection._instance = instance
+                new_table = connection.table("table-name")
+
+        # The least recently used table was dropped.
+        self.assertFalse(new_table is table)
+        self.assertEqual(len(connection._tables["table-name"]), 2)
+
     def _table_factory_prefix_helper(self, use_prefix=True):
         from google.cloud.happybase.table import Table
 
@@ -259,6 +499,128 @@ class TestConnection(unittest.TestCase):
         result = connection.tables()
         self.assertEqual(result, [unprefixed_table_name1])
 
+    def _tables_cache_helper(self, metadata_ttl):
+        instance = _Instance(list_tables_result=[mock.Mock(table_id="table-name")])
+        instance.list_tables = mock.Mock(wraps=instance.list_tables)
+        connection = self._make_one(
+            autoconnect=False, instance=instance, metadata_ttl=metadata_ttl
+        )
+
+        result1 = connection.tables()
+        result2 = connection.tables()
+
+        self.assertEqual(result1, ["table-name"])
+        self.assertEqual(result2, ["table-name"])
+        self.assertFalse(result1 is result2)
+        return instance.list_tables.call_count
+
+    def test_tables_cached(self):
+        self.assertEqual(self._tables_cache_helper(None), 1)
+
+    def test_tables_not_cached(self):
+        self.assertEqual(self._tables_cache_helper(0), 2)
+
+    def test_tables_not_cached_by_default(self):
+        from google.cloud.happybase.connection import _DEFAULT_METADATA_TTL
+
+        self.assertEqual(self._tables_cache_helper(_DEFAULT_METADATA_TTL), 2)
+
+    def test_tables_cached_with_prefix(self):
+        instance = _Instance(
+            list_tables_result=[
+                mock.Mock(table_id="prefix_table-name1"),
+                mock.Mock(table_id="table-name2"),
+            ]
+        )
+        connection = self._make_one(
+            autoconnect=False,
+            instance=instance,
+            table_prefix="prefix",
+            metadata_ttl=60,
+        )
+
+        self.assertEqual(connection.tables(), ["table-name1"])
+        self.assertEqual(connection.tables(), ["table-name1"])
+        self.assertEqual(
+            connection._metadata_cache.get("tables", None),
+            ("prefix_table-name1", "table-name2"),
+        )
+
+    def test__table_families(self):
+        instance = _Instance()  # Avoid implicit environ check.
+        connection = self._make_one(
+            autoconnect=False, instance=instance, metadata_ttl=60
+        )
+        families = {"cf": {"max_versions": 1}}
+        load = mock.Mock(return_value=families)
+
+        result1 = connection._table_families("table-name", load)
+        result2 = connection._table_families("table-name", load)
+
+        load.assert_called_once_with()
+        self.assertEqual(result1, families)
+        self.assertEqual(result2, families)
+        self.assertFalse(result1 is result2)
+
+    def test_create_and_delete_table_invalidate_cache(self):
+        instance = _Instance(list_tables_result=[mock.Mock(table_id="table-name")])
+        instance.list_tables = mock.Mock(wraps=instance.list_tables)
+        connection = self._make_one(
+            autoconnect=False, instance=instance, metadata_ttl=60
+        )
+        load = mock.Mock(return_value={})
+
+        with mock.patch(
+            "google.cloud.happybase.table._LowLevelTable", _MockLowLevelTable
+        ):
+            table = connection.table("table-name")
+        connection.tables()
+        connection._table_families("table-name", load)
+
+        with mock.patch(
+            "google.cloud.happybase.connection._LowLevelTable", _MockLowLevelTable
+        ):
+            connection.delete_table("table-name")
+            connection.create_table("table-name", {"cf": {}})
+            connection.tables()
+            connection._table_families("table-name", load)
+            connection._table_families("table-name", load)
+
+        self.assertEqual(instance.list_tables.call_count, 2)
+        self.assertEqual(load.call_count, 2)
+        self.assertNotIn("table-name", connection._tables)
+        with mock.patch(
+            "google.cloud.happybase.table._LowLevelTable", _MockLowLevelTable
+        ):
+            self.assertFalse(connection.table("table-name") is table)
+
+    def test_warmup(self):
+        instance = _Instance()  # Avoid implicit environ check.
+        connection = self._make_one(autoconnect=False, instance=instance)
+        tables = {}
+
+        def mock_table(name):
+            return tables.setdefault(name, mock.Mock())
+
+        with mock.patch.object(connection, "table", mock_table):
+            connection.warmup(tables=["table1", "table2"])
+
+        self.assertEqual(sorted(tables), ["table1", "table2"])
+        for table in tables.values():
+            table._warmup.assert_called_once_with()
+
+    def test_warmup_all_tables(self):
+        instance = _Instance()  # Avoid implicit environ check.
+        connection = self._make_one(autoconnect=False, instance=instance)
+        table = mock.Mock()
+
+        with mock.patch.object(connection, "tables", return_value=["table1"]):
+            with mock.patch.object(connection, "table", return_value=table) as factory:
+                connection.warmup()
+
+        factory.assert_called_once_with("table1")
+        table._warmup.assert_called_once_with()
+
     def test_create_table(self):
         instance = _Instance()  # Avoid implicit environ check.
         connection = self._make_one(autoconnect=False, instance=instance)
@@ -469,6 +831,44 @@ class TestConnection(unittest.TestCase):
         self.assertIn(_COMPACT_TMPL % (name, False), str(warned[0]))
 
 
+class Test_MetadataCache(unittest.TestCase):
+    def _make_one(self, ttl):
+        from google.cloud.happybase.connection import _MetadataCache
+
+        return _MetadataCache(ttl)
+
+    def test_get_caches_until_expired(self):
+        cache = self._make_one(10.0)
+        load = mock.Mock(side_effect=["value1", "value2"])
+
+        with mock.patch("time.time", return_value=100.0):
+            self.assertEqual(cache.get("key", load), "value1")
+        with mock.patch("time.time", return_value=109.0):
+            self.assertEqual(cache.get("key", load), "value1")
+        with mock.patch("time.time", return_value=110.0):
+            self.assertEqual(cache.get("key", load), "value2")
+
+        self.assertEqual(load.call_count, 2)
+
+    def test_get_load_error(self):
+        cache = self._make_one(10.0)
+        load = mock.Mock(side_effect=[RuntimeError("unavailable"), "value"])
+
+        with self.assertRaises(RuntimeError):
+            cache.get("key", load)
+        self.assertEqual(cache.get("key", load), "value")
+
+    def test_invalidate(self):
+        cache = self._make_one(None)
+        load = mock.Mock(side_effect=["value1", "value2", "other"])
+
+        self.assertEqual(cache.get("key", load), "value1")
+        cache.invalidate("key", "missing")
+        self.assertEqual(cache.get("key", load), "value2")
+        self.assertEqual(cache.get("key", load), "value2")
+        self.assertEqual(cache.get("other", load), "other")
+
+
 class Test__parse_family_option(unittest.TestCase):
     def _call_fut(self, option):
         from google.cloud.happybase.connection import _parse_family_option
@@ -545,6 +945,9 @@ class Test__parse_family_option(unittest.TestCase):
 
 
 class _Client(object):
+
+    project = "project-id"
+
     def __init__(self, *args, **kwargs):
         self.instances = kwargs.pop("instances", [])
         for instance in self.instances:
@@ -556,12 +959,18 @@ class _Client(object):
     def list_instances(self):
         return self.instances, self.failed_locations
 
+    def instance(self, instance_id):
+        instance = _Instance(instance_id=instance_id)
+        instance.client = self
+        return instance
+
 
 class _Instance(object):
-    def __init__(self, list_tables_result=()):
+    def __init__(self, list_tables_result=(), instance_id="instance-id"):
         # Included to support Connection.__del__
         self._client = _Client()
         self.list_tables_result = list_tables_result
+        self.instance_id = instance_id
 
     def list_tables(self):
         return self.list_tables_result
@@ -0,0 +1,428 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+
+import mock
+
+
+class TestCounterBuffer(unittest.TestCase):
+    def _get_target_class(self):
+        from google.cloud.happybase.counters import CounterBuffer
+
+        return CounterBuffer
+
+    def _make_one(self, *args, **kwargs):
+        counter_buffer = self._get_target_class()(*args, **kwargs)
+        self.addCleanup(counter_buffer.close)
+        return counter_buffer
+
+    def test_constructor_defaults(self):
+        from google.cloud.happybase.counters import _OPEN_BUFFERS
+
+        table = _MockTable()
+        counter_buffer = self._make_one(table)
+        self.assertIs(counter_buffer._table, table)
+        self.assertEqual(counter_buffer._max_pending, 1000)
+        self.assertEqual(counter_buffer._flush_interval, 1.0)
+        self.assertEqual(counter_buffer._executor._max_workers, 4)
+        self.assertTrue(counter_buffer._flush_thread.daemon)
+        self.assertTrue(counter_buffer._flush_thread.is_alive())
+        self.assertEqual(counter_buffer.num_pending, 0)
+        self.assertIn(counter_buffer, _OPEN_BUFFERS)
+
+    def test_constructor_explicit(self):
+        table = _MockTable()
+        counter_buffer = self._make_one(
+            table, max_pending=10, flush_interval=None, max_workers=2
+        )
+        self.assertEqual(counter_buffer._max_pending, 10)
+        self.assertEqual(counter_buffer._flush_interval, None)
+        self.assertEqual(counter_buffer._executor._max_workers, 2)
+        self.assertEqual(counter_buffer._flush_thread, None)
+
+    def test_constructor_non_positive_max_pending(self):
+        with self.assertRaises(ValueError):
+            self._get_target_class()(_MockTable(), max_pending=0)
+
+    def test_constructor_non_positive_flush_interval(self):
+        with self.assertRaises(ValueError):
+            self._get_target_class()(_MockTable(), flush_interval=0)
+
+    def test_constructor_non_positive_max_workers(self):
+        with self.assertRaises(ValueError):
+            self._get_target_class()(_MockTable(), max_workers=0)
+
+    def test_counter_inc_aggregates(self):
+        table = _MockTable()
+        counter_buffer = self._make_one(table, flush_interval=None)
+
+        counter_buffer.counter_inc(b"row-key1", b"fam:col1")
+        counter_buffer.counter_inc(b"row-key1", b"fam:col1", value=5)
+        counter_buffer.counter_inc(b"row-key1", b"fam:col2", value=2)
+        counter_buffer.counter_dec(b"row-key2", b"fam:col1", value=3)
+        self.assertEqual(counter_buffer.num_pending, 3)
+        self.assertEqual(table.counter_inc_many_calls, [])
+
+        counter_buffer.flush()
+        self.assertEqual(counter_buffer.num_pending, 0)
+        self.assertEqual(
+            sorted(table.counter_inc_many_calls),
+            [
+                (b"row-key1", {b"fam:col1": 6, b"fam:col2": 2}),
+                (b"row-key2", {b"fam:col1": -3}),
+            ],
+        )
+
+    def test_counter_inc_max_pending(self):
+        table = _MockTable()
+        counter_buffer = self._make_one(table, max_pending=2, flush_interval=None)
+
+        counter_buffer.counter_inc(b"row-key", b"fam:col1")
+        counter_buffer.counter_inc(b"row-key", b"fam:col1")
+        self.assertEqual(table.counter_inc_many_calls, [])
+        counter_buffer.counter_inc(b"row-key", b"fam:col2")
+        self.assertEqual(
+            table.counter_inc_many_calls,
+            [(b"row-key", {b"fam:col1": 2, b"fam:col2": 1})],
+        )
+        self.assertEqual(counter_buffer.num_pending, 0)
+
+    def test_counter_inc_merges_column_types(self):
+        table = _MockTable()
+        counter_buffer = self._make_one(table, flush_interval=None)
+
+        counter_buffer.counter_inc(b"row-key", b"fam:col1")
+        counter_buffer.counter_inc(b"row-key", u"fam:col1", value=2)
+        self.assertEqual(counter_buffer.num_pending, 1)
+
+        counter_buffer.flush()
+        self.assertEqual(table.counter_inc_many_calls, [(b"row-key", {b"fam:col1": 3})])
+
+    def test_counter_inc_without_qualifier(self):
+        counter_buffer = self._make_one(_MockTable(), flush_interval=None)
+        with self.assertRaises(ValueError):
+            counter_buffer.counter_inc(b"row-key", b"fam")
+        with self.assertRaises(ValueError):
+            counter_buffer.counter_inc(b"row-key", b"fam:")
+        self.assertEqual(counter_buffer.num_pending, 0)
+
+    def test_counter_inc_closed(self):
+        counter_buffer = self._make_one(_MockTable(), flush_interval=None)
+        counter_buffer.close()
+        with self.assertRaises(ValueError):
+            counter_buffer.counter_inc(b"row-key", b"fam:col1")
+
+    def test_flush_skips_zero_increments(self):
+        table = _MockTable()
+        counter_buffer = self._make_one(table, flush_interval=None)
+
+        counter_buffer.counter_inc(b"row-key1", b"fam:col1", value=2)
+        counter_buffer.counter_dec(b"row-key1", b"fam:col1", value=2)
+        counter_buffer.counter_inc(b"row-key2", b"fam:col1", value=0)
+        counter_buffer.counter_inc(b"row-key2", b"fam:col2", value=1)
+        counter_buffer.flush()
+        self.assertEqual(
+            table.counter_inc_many_calls, [(b"row-key2", {b"fam:col2": 1})]
+        )
+
+    def test_flush_failure(self):
+        table = _MockTable(failed_rows=[b"row-key1"])
+        counter_buffer = self._make_one(table, flush_interval=None)
+
+        counter_buffer.counter_inc(b"row-key1", b"fam:col1")
+        counter_buffer.counter_inc(b"row-key2", b"fam:col1")
+        with self.assertRaises(RuntimeError):
+            counter_buffer.flush()
+        # The other rows are still sent, and the failed increments dropped.
+        self.assertEqual(
+            sorted(table.counter_inc_many_calls),
+            [(b"row-key1", {b"fam:col1": 1}), (b"row-key2", {b"fam:col1": 1})],
+        )
+        self.assertEqual(counter_buffer.num_pending, 0)
+
+    def test_flush_executor_shut_down(self):
+        table = _MockTable(failed_rows=[b"row-key1"])
+        counter_buffer = self._make_one(table, flush_interval=None)
+        counter_buffer._executor.shutdown()
+
+        counter_buffer.counter_inc(b"row-key1", b"fam:col1")
+        counter_buffer.counter_inc(b"row-key2", b"fam:col1")
+        with self.assertRaises(RuntimeError):
+            counter_buffer.flush()
+        # The rows are sent from the calling thread instead.
+        self.assertEqual(
+            sorted(table.counter_inc_many_calls),
+            [(b"row-key1", {b"fam:col1": 1}), (b"row-key2", {b"fam:col1": 1})],
+        )
+        self.assertEqual(counter_buffer.num_pending, 0)
+
+    def test_flush_periodically(self):
+        import threading
+
+        flushed = threading.Event()
+        table = _MockTable(on_increment=flushed.set)
+        counter_buffer = self._make_one(table, flush_interval=0.01)
+
+        counter_buffer.counter_inc(b"row-key", b"fam:col1")
+        self.assertTrue(flushed.wait(5))
+        self.assertEqual(table.counter_inc_many_calls, [(b"row-key", {b"fam:col1": 1})])
+
+    def test_flush_periodically_failure(self):
+        import threading
+
+        flushed = threading.Event()
+        table = _MockTable(failed_rows=[b"row-key"], on_increment=flushed.set)
+        counter_buffer = self._make_one(table, flush_interval=0.01)
+
+        with mock.patch("warnings.warn") as warn:
+            counter_buffer.counter_inc(b"row-key", b"fam:col1")
+            self.assertTrue(flushed.wait(5))
+            counter_buffer.close()
+
+        (args, _), = warn.call_args_list
+        self.assertIn("Failed to flush counter increments", args[0])
+
+    def test_close(self):
+        from google.cloud.happybase.counters import _OPEN_BUFFERS
+
+        table = _MockTable()
+        counter_buffer = self._make_one(table)
+        flush_thread = counter_buffer._flush_thread
+
+        counter_buffer.counter_inc(b"row-key", b"fam:col1")
+        counter_buffer.close()
+        self.assertFalse(flush_thread.is_alive())
+        self.assertEqual(table.counter_inc_many_calls, [(b"row-key", {b"fam:col1": 1})])
+        self.assertNotIn(counter_buffer, _OPEN_BUFFERS)
+
+        # Closing again does nothing.
+        counter_buffer.close()
+        self.assertEqual(len(table.counter_inc_many_calls), 1)
+
+    def test_context_manager(self):
+        table = _MockTable()
+        with self._make_one(table, flush_interval=None) as counter_buffer:
+            counter_buffer.counter_inc(b"row-key", b"fam:col1")
+            self.assertEqual(table.counter_inc_many_calls, [])
+
+        self.assertEqual(table.counter_inc_many_calls, [(b"row-key", {b"fam:col1": 1})])
+        self.assertTrue(counter_buffer._closed)
+
+
+class TestSequenceAllocator(unittest.TestCase):
+    def _get_target_class(self):
+        from google.cloud.happybase.counters import SequenceAllocator
+
+        return SequenceAllocator
+
+    def _make_one(self, *args, **kwargs):
+        allocator = self._get_target_class()(*args, **kwargs)
+        self.addCleanup(allocator.close)
+        return allocator
+
+    def test_constructor_defaults(self):
+        table = _MockCounterTable()
+        allocator = self._make_one(table, b"row-key", b"fam:col1")
+        self.assertIs(allocator._table, table)
+        self.assertEqual(allocator._row, b"row-key")
+        self.assertEqual(allocator._column, b"fam:col1")
+        self.assertEqual(allocator._block_size, 1000)
+        self.assertTrue(allocator._prefetch)
+        self.assertEqual(allocator._prefetch_threshold, 100)
+        self.assertEqual(allocator._executor._max_workers, 1)
+        # Nothing is reserved until an ID is needed.
+        self.assertEqual(table.counter_inc_calls, [])
+
+    def test_constructor_explicit(self):
+        table = _MockCounterTable()
+        allocator = self._make_one(
+            table, b"row-key", b"fam:col1", block_size=10, prefetch=False
+        )
+        self.assertEqual(allocator._block_size, 10)
+        self.assertFalse(allocator._prefetch)
+        self.assertEqual(allocator._prefetch_threshold, 1)
+        self.assertEqual(allocator._executor, None)
+
+    def test_constructor_non_positive_block_size(self):
+        with self.assertRaises(ValueError):
+            self._get_target_class()(_MockCounterTable(), b"row", b"f:c", block_size=0)
+
+    def test_constructor_bad_prefetch_threshold(self):
+        klass = self._get_target_class()
+        with self.assertRaises(ValueError):
+            klass(_MockCounterTable(), b"row", b"f:c", prefetch_threshold=-1)
+        with self.assertRaises(ValueError):
+            klass(
+                _MockCounterTable(),
+                b"row",
+                b"f:c",
+                block_size=10,
+                prefetch_threshold=10,
+            )
+
+    def test_next_id_without_prefetch(self):
+        table = _MockCounterTable(value=100)
+        allocator = self._make_one(
+            table, b"row-key", b"fam:col1", block_size=3, prefetch=False
+        )
+
+        ids = [allocator.next_id() for _ in range(7)]
+        self.assertEqual(ids, [101, 102, 103, 104, 105, 106, 107])
+        self.assertEqual(table.counter_inc_calls, [(b"row-key", b"fam:col1", 3)] * 3)
+
+    def test_next_id_with_prefetch(self):
+        table = _MockCounterTable()
+        allocator = self._make_one(
+            table, b"row-key", b"fam:col1", block_size=4, prefetch_threshold=2
+        )
+
+        self.assertEqual([allocator.next_id() for _ in range(2)], [1, 2])
+        # Two IDs are left, so the next block is being reserved.
+        next_block = allocator._next_block
+        self.assertEqual(next_block.result(), (5, 8))
+        self.assertEqual(len(table.counter_inc_calls), 2)
+
+        self.assertEqual([allocator.next_id() for _ in range(3)], [3, 4, 5])
+        self.assertIsNone(allocator._next_block)
+        self.assertEqual(len(table.counter_inc_calls), 2)
+
+    def test_next_id_prefetch_failed(self):
+        table = _MockCounterTable()
+        allocator = self._make_one(
+            table, b"row-key", b"fam:col1", block_size=2, prefetch_threshold=1
+        )
+
+        self.assertEqual(allocator.next_id(), 1)
+        allocator._next_block.result()
+        table.error = RuntimeError("Failed")
+        next_block = allocator._next_block = allocator._executor.submit(
+            allocator._reserve_block
+        )
+        self.assertIsInstance(next_block.exception(), RuntimeError)
+
+        self.assertEqual(allocator.next_id(), 2)
+        with self.assertRaises(RuntimeError):
+            allocator.next_id()
+        # The failed block is dropped, so the next call reserves again.
+        table.error = None
+        self.assertEqual(allocator.next_id(), 5)
+
+    def test_next_id_threads(self):
+        import threading
+
+        table = _MockCounterTable()
+        allocator = self._make_one(table, b"row-key", b"fam:col1", block_size=7)
+        ids = []
+
+        def worker():
+            ids.extend([allocator.next_id() for _ in range(100)])
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(ids), 800)
+        self.assertEqual(len(set(ids)), 800)
+
+    def test_context_manager(self):
+        table = _MockCounterTable()
+        with self._make_one(table, b"row-key", b"fam:col1") as allocator:
+            self.assertEqual(allocator.next_id(), 1)
+
+        with self.assertRaises(RuntimeError):
+            allocator._executor.submit(allocator._reserve_block)
+
+    def test_close_without_prefetch(self):
+        allocator = self._make_one(
+            _MockCounterTable(), b"row-key", b"fam:col1", prefetch=False
+        )
+        allocator.close()
+
+
+class Test__close_open_buffers(unittest.TestCase):
+    def _call_fut(self):
+        from google.cloud.happybase.counters import _close_open_buffers
+
+        return _close_open_buffers()
+
+    def test_it(self):
+        from google.cloud.happybase.counters import CounterBuffer
+
+        table = _MockTable()
+        counter_buffer = CounterBuffer(table, flush_interval=None)
+        counter_buffer.counter_inc(b"row-key", b"fam:col1")
+
+        self._call_fut()
+        self.assertTrue(counter_buffer._closed)
+        self.assertEqual(table.counter_inc_many_calls, [(b"row-key", {b"fam:col1": 1})])
+
+    def test_at_interpreter_exit(self):
+        import subprocess
+        import sys
+        import textwrap
+
+        script = textwrap.dedent(
+            """
+            import sys
+
+            from google.cloud.happybase.counters import CounterBuffer
+
+            class Table(object):
+                def counter_inc_many(self, row, data):
+                    sys.stdout.write("%r %r" % (row, sorted(data.items())))
+
+            counter_buffer = CounterBuffer(Table(), flush_interval=None)
+            counter_buffer.counter_inc(b"row-key", b"fam:col1", value=3)
+            """
+        )
+        output = subprocess.check_output([sys.executable, "-c", script])
+        expected = "%r %r" % (b"row-key", [(b"fam:col1", 3)])
+        self.assertEqual(output.decode("utf-8"), expected)
+
+
+class _MockTable(object):
+    def __init__(self, failed_rows=(), on_increment=None):
+        self.failed_rows = failed_rows
+        self.on_increment = on_increment
+        self.counter_inc_many_calls = []
+
+    def counter_inc_many(self, row, data):
+        self.counter_inc_many_calls.append((row, data))
+        if self.on_increment is not None:
+            self.on_increment()
+        if row in self.failed_rows:
+            raise RuntimeError("Failed", row)
+        return data
+
+
+class _MockCounterTable(object):
+    def __init__(self, value=0):
+        import threading
+
+        self.value = value
+        self.error = None
+        self.counter_inc_calls = []
+        self._lock = threading.Lock()
+
+    def counter_inc(self, row, column, value=1):
+        with self._lock:
+            self.counter_inc_calls.append((row, column, value))
+            if self.error is not None:
+                raise self.error
+            self.value += value
+            return self.value
@@ -0,0 +1,140 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+
+
+class TestFlowController(unittest.TestCase):
+    def _get_target_class(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        return FlowController
+
+    def _make_one(self, *args, **kwargs):
+        return self._get_target_class()(*args, **kwargs)
+
+    def test_constructor_defaults(self):
+        flow_controller = self._make_one()
+        self.assertEqual(flow_controller.max_mutations, None)
+        self.assertEqual(flow_controller.max_bytes, None)
+        self.assertTrue(flow_controller.block)
+        self.assertEqual(flow_controller.timeout, None)
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_bytes, 0)
+
+    def test_constructor_explicit(self):
+        flow_controller = self._make_one(
+            max_mutations=10, max_bytes=100, block=False, timeout=5
+        )
+        self.assertEqual(flow_controller.max_mutations, 10)
+        self.assertEqual(flow_controller.max_bytes, 100)
+        self.assertFalse(flow_controller.block)
+        self.assertEqual(flow_controller.timeout, 5)
+
+    def test_constructor_non_positive_max_mutations(self):
+        with self.assertRaises(ValueError):
+            self._make_one(max_mutations=0)
+
+    def test_constructor_non_positive_max_bytes(self):
+        with self.assertRaises(ValueError):
+            self._make_one(max_bytes=-1)
+
+    def test_try_acquire(self):
+        flow_controller = self._make_one(max_mutations=10, max_bytes=100)
+        self.assertTrue(flow_controller.try_acquire(4, 40))
+        self.assertTrue(flow_controller.try_acquire(6, 60))
+        self.assertEqual(flow_controller.outstanding_mutations, 10)
+        self.assertEqual(flow_controller.outstanding_bytes, 100)
+
+    def test_try_acquire_over_max_mutations(self):
+        flow_controller = self._make_one(max_mutations=10)
+        self.assertTrue(flow_controller.try_acquire(8, 1000))
+        self.assertFalse(flow_controller.try_acquire(3, 0))
+        self.assertEqual(flow_controller.outstanding_mutations, 8)
+
+    def test_try_acquire_over_max_bytes(self):
+        flow_controller = self._make_one(max_bytes=100)
+        self.assertTrue(flow_controller.try_acquire(1000, 80))
+        self.assertFalse(flow_controller.try_acquire(0, 30))
+        self.assertEqual(flow_controller.outstanding_bytes, 80)
+
+    def test_try_acquire_oversized_when_idle(self):
+        flow_controller = self._make_one(max_mutations=10, max_bytes=100)
+        self.assertTrue(flow_controller.try_acquire(20, 200))
+        self.assertEqual(flow_controller.outstanding_mutations, 20)
+        self.assertEqual(flow_controller.outstanding_bytes, 200)
+
+    def test_acquire(self):
+        flow_controller = self._make_one(max_mutations=10)
+        flow_controller.acquire(10, 5)
+        self.assertEqual(flow_controller.outstanding_mutations, 10)
+        self.assertEqual(flow_controller.outstanding_bytes, 5)
+
+    def test_acquire_non_blocking(self):
+        from google.cloud.happybase.flow_control import FlowControlLimitExceeded
+
+        flow_controller = self._make_one(max_mutations=10, block=False)
+        flow_controller.acquire(10, 0)
+        with self.assertRaises(FlowControlLimitExceeded):
+            flow_controller.acquire(1, 0)
+        self.assertEqual(flow_controller.outstanding_mutations, 10)
+
+    def test_acquire_timeout(self):
+        from google.cloud.happybase.flow_control import FlowControlLimitExceeded
+
+        flow_controller = self._make_one(max_mutations=10, timeout=0.01)
+        flow_controller.acquire(10, 0)
+        with self.assertRaises(FlowControlLimitExceeded):
+            flow_controller.acquire(1, 0)
+        self.assertEqual(flow_controller.outstanding_mutations, 10)
+
+    def _acquire_waiting_helper(self, timeout=None):
+        import threading
+
+        flow_controller = self._make_one(max_mutations=10, timeout=timeout)
+        flow_controller.acquire(10, 0)
+        acquired = threading.Event()
+
+        def acquire():
+            flow_controller.acquire(5, 0)
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        flow_controller.release(10, 0)
+        thread.join()
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(flow_controller.outstanding_mutations, 5)
+
+    def test_acquire_waits_for_release(self):
+        self._acquire_waiting_helper()
+
+    def test_acquire_waits_for_release_with_timeout(self):
+        self._acquire_waiting_helper(timeout=10)
+
+    def test_release(self):
+        flow_controller = self._make_one()
+        flow_controller.acquire(10, 100)
+        flow_controller.release(4, 40)
+        self.assertEqual(flow_controller.outstanding_mutations, 6)
+        self.assertEqual(flow_controller.outstanding_bytes, 60)
+
+    def test_release_more_than_outstanding(self):
+        flow_controller = self._make_one()
+        flow_controller.acquire(1, 10)
+        flow_controller.release(5, 50)
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_bytes, 0)
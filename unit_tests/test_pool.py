@@ -28,9 +28,7 @@ class TestConnectionPool(unittest.TestCase):
         return self._get_target_class()(*args, **kwargs)
 
     def test_constructor_defaults(self):
-        import six
         import threading
-        from google.cloud.happybase.connection import Connection
 
         size = 11
         instance = _Instance()  # Avoid implicit environ check.
@@ -39,12 +37,25 @@ class TestConnectionPool(unittest.TestCase):
         self.assertTrue(isinstance(pool._lock, type(threading.Lock())))
         self.assertTrue(isinstance(pool._thread_connections, threading.local))
         self.assertEqual(pool._thread_connections.__dict__, {})
+        self.assertEqual(pool.min_size, 0)
+        self.assertEqual(pool.max_size, size)
+        self.assertIsNone(pool.idle_timeout)
+
+        # Connections are only created on demand.
+        self.assertEqual(pool.num_connections, 0)
+        self.assertEqual(len(pool._idle), 0)
+
+    def test_constructor_min_size(self):
+        from google.cloud.happybase.connection import Connection
 
-        queue = pool._queue
-        self.assertTrue(isinstance(queue, six.moves.queue.LifoQueue))
-        self.assertTrue(queue.full())
-        self.assertEqual(queue.maxsize, size)
-        for connection in queue.queue:
+        size = 11
+        min_size = 3
+        instance = _Instance()  # Avoid implicit environ check.
+        pool = self._make_one(size, min_size=min_size, instance=instance)
+
+        self.assertEqual(pool.num_connections, min_size)
+        self.assertEqual(len(pool._idle), min_size)
+        for connection, _ in pool._idle:
             self.assertTrue(isinstance(connection, Connection))
             self.assertTrue(connection._instance is instance)
 
@@ -56,12 +67,13 @@ class TestConnectionPool(unittest.TestCase):
         size = 1
         pool = self._make_one(
             size,
+            min_size=1,
             table_prefix=table_prefix,
             table_prefix_separator=table_prefix_separator,
             instance=instance,
         )
 
-        for connection in pool._queue.queue:
+        for connection, _ in pool._idle:
             self.assertEqual(connection.table_prefix, table_prefix)
             self.assertEqual(connection.table_prefix_separator, table_prefix_separator)
 
@@ -86,9 +98,9 @@ class TestConnectionPool(unittest.TestCase):
         # Then make sure autoconnect=True is ignored in a pool.
         size = 1
         with mock.patch("google.cloud.happybase.pool.Connection", ConnectionWithOpen):
-            pool = self._make_one(size, autoconnect=True, instance=instance)
+            pool = self._make_one(size, min_size=1, autoconnect=True, instance=instance)
 
-        for connection in pool._queue.queue:
+        for connection, _ in pool._idle:
             self.assertTrue(isinstance(connection, ConnectionWithOpen))
             self.assertFalse(connection._open_called)
 
@@ -103,14 +115,34 @@ class TestConnectionPool(unittest.TestCase):
         mock_get_instance.return_value = instance
 
         with mock.patch("google.cloud.happybase.pool._get_instance", mock_get_instance):
-            pool = self._make_one(size)
+            pool = self._make_one(size, min_size=1)
 
-        for connection in pool._queue.queue:
+        for connection, _ in pool._idle:
             self.assertTrue(isinstance(connection, Connection))
             self.assertTrue(connection._instance is instance)
 
         mock_get_instance.assert_called_once_with()
 
+    def test_constructor_infers_instance_lazily(self):
+        from google.cloud.happybase.connection import _get_instance
+
+        size = 2
+        instance = _Instance()
+
+        mock_get_instance = mock.create_autospec(_get_instance)
+        mock_get_instance.return_value = instance
+
+        with mock.patch("google.cloud.happybase.pool._get_instance", mock_get_instance):
+            pool = self._make_one(size)
+            mock_get_instance.assert_not_called()
+
+            connection1 = pool._acquire_connection()
+            connection2 = pool._acquire_connection()
+
+        self.assertTrue(connection1._instance is instance)
+        self.assertTrue(connection2._instance is instance)
+        mock_get_instance.assert_called_once_with()
+
     def test_constructor_non_integer_size(self):
         size = None
         with self.assertRaises(TypeError):
@@ -124,43 +156,840 @@ class TestConnectionPool(unittest.TestCase):
         with self.assertRaises(ValueError):
             self._make_one(size)
 
-    def _make_one_with_mock_queue(self, queue_return):
-        # We are going to use a fake queue, so we don't want any connections
-        # or instances to be created in the constructor.
-        size = -1
-        instance = object()
-        with mock.patch("google.cloud.happybase.pool._MIN_POOL_SIZE", size):
-            pool = self._make_one(size, instance=instance)
+    def test_constructor_bad_min_size(self):
+        instance = _Instance()
+        with self.assertRaises(ValueError):
+            self._make_one(2, min_size=-1, instance=instance)
+        with self.assertRaises(ValueError):
+            self._make_one(2, min_size=3, instance=instance)
+
+    def test_constructor_non_positive_idle_timeout(self):
+        instance = _Instance()
+        with self.assertRaises(ValueError):
+            self._make_one(2, idle_timeout=0, instance=instance)
 
-        pool._queue = _Queue(queue_return)
+    def test_constructor_negative_max_waiters(self):
+        instance = _Instance()
+        with self.assertRaises(ValueError):
+            self._make_one(2, max_waiters=-1, instance=instance)
+
+    def _make_one_with_mock_connections(self, size=1, **kwargs):
+        # We are going to use fake connections, so we don't want any
+        # instances to be created.
+        pool = self._make_one(size, instance=object(), **kwargs)
+        pool._create_connection = _Connection
         return pool
 
-    def test__acquire_connection(self):
-        queue_return = object()
-        pool = self._make_one_with_mock_queue(queue_return)
+    def test__acquire_connection_creates_connection(self):
+        pool = self._make_one_with_mock_connections(size=2)
+
+        connection1 = pool._acquire_connection()
+        connection2 = pool._acquire_connection()
+
+        self.assertTrue(isinstance(connection1, _Connection))
+        self.assertTrue(isinstance(connection2, _Connection))
+        self.assertFalse(connection1 is connection2)
+        self.assertEqual(pool.num_connections, 2)
+
+    def test__acquire_connection_reuses_last_released(self):
+        pool = self._make_one_with_mock_connections(size=2)
+        connection1 = pool._acquire_connection()
+        connection2 = pool._acquire_connection()
+        pool._release_connection(connection1)
+        pool._release_connection(connection2)
 
-        timeout = 432
-        connection = pool._acquire_connection(timeout=timeout)
-        self.assertTrue(connection is queue_return)
-        self.assertEqual(pool._queue._get_calls, [(True, timeout)])
-        self.assertEqual(pool._queue._put_calls, [])
+        self.assertTrue(pool._acquire_connection() is connection2)
+        self.assertTrue(pool._acquire_connection() is connection1)
+        self.assertEqual(pool.num_connections, 2)
 
     def test__acquire_connection_failure(self):
         from google.cloud.happybase.pool import NoConnectionsAvailable
 
-        pool = self._make_one_with_mock_queue(None)
-        timeout = 1027
+        pool = self._make_one_with_mock_connections()
+        pool._acquire_connection()
+
+        timeout = 0.01
         with self.assertRaises(NoConnectionsAvailable):
             pool._acquire_connection(timeout=timeout)
-        self.assertEqual(pool._queue._get_calls, [(True, timeout)])
-        self.assertEqual(pool._queue._put_calls, [])
+        self.assertEqual(pool.num_connections, 1)
+
+    def test__acquire_connection_waits_for_release(self):
+        import threading
+
+        pool = self._make_one_with_mock_connections()
+        connection = pool._acquire_connection()
+
+        timer = threading.Timer(0.01, pool._release_connection, (connection,))
+        timer.start()
+        self.assertTrue(pool._acquire_connection(timeout=5) is connection)
+        timer.join()
+
+        timer = threading.Timer(0.01, pool._release_connection, (connection,))
+        timer.start()
+        self.assertTrue(pool._acquire_connection() is connection)
+        timer.join()
+
+    def test__acquire_connection_create_failure(self):
+        pool = self._make_one_with_mock_connections()
+        pool._create_connection = mock.Mock(side_effect=ValueError("boom"))
+
+        with self.assertRaises(ValueError):
+            pool._acquire_connection()
+        self.assertEqual(pool.num_connections, 0)
+
+    def test__release_connection_retires_idle(self):
+        pool = self._make_one_with_mock_connections(size=3, idle_timeout=10)
+        stale = _Connection()
+        pool._idle.append((stale, 0.0))
+        pool._num_connections = 2
+
+        connection = _Connection()
+        pool._release_connection(connection)
+
+        self.assertEqual(list(pool._idle)[0][0], connection)
+        self.assertEqual(len(pool._idle), 1)
+        self.assertEqual(pool.num_connections, 1)
+        self.assertTrue(stale.closed)
+        self.assertFalse(connection.closed)
+
+    def test__acquire_connection_retires_idle(self):
+        pool = self._make_one_with_mock_connections(size=3, idle_timeout=10)
+        stale = _Connection()
+        pool._idle.append((stale, 0.0))
+        pool._num_connections = 1
+
+        connection = pool._acquire_connection()
+
+        self.assertFalse(connection is stale)
+        self.assertTrue(stale.closed)
+        self.assertEqual(pool.num_connections, 1)
+
+    def test__retire_idle_connections_keeps_min_size(self):
+        pool = self._make_one_with_mock_connections(size=3, idle_timeout=10)
+        pool.min_size = 1
+        stale1 = _Connection()
+        stale2 = _Connection()
+        pool._idle.extend([(stale1, 0.0), (stale2, 0.0)])
+        pool._num_connections = 2
+
+        with pool._lock:
+            retired = pool._retire_idle_connections()
+
+        self.assertEqual(retired, [stale1])
+        self.assertEqual(list(pool._idle), [(stale2, 0.0)])
+        self.assertEqual(pool.num_connections, 1)
+
+    def test__retire_idle_connections_no_idle_timeout(self):
+        pool = self._make_one_with_mock_connections()
+        pool._idle.append((_Connection(), 0.0))
+        pool._num_connections = 1
+
+        with pool._lock:
+            self.assertEqual(pool._retire_idle_connections(), [])
+        self.assertEqual(pool.num_connections, 1)
+
+    def test_constructor_non_positive_channels(self):
+        instance = _Instance()
+        with self.assertRaises(ValueError):
+            self._make_one(2, channels=0, instance=instance)
+
+    def test_constructor_unknown_channel_policy(self):
+        instance = _Instance()
+        with self.assertRaises(ValueError):
+            self._make_one(2, channels=2, channel_policy="random", instance=instance)
+
+    def _make_one_with_channels(self, size, channels, **kwargs):
+        instance = _Instance()
+        pool = self._make_one(size, channels=channels, instance=instance, **kwargs)
+        pool._create_connection = _Connection
+        return pool, instance
+
+    def test__acquire_connection_round_robin_channels(self):
+        pool, instance = self._make_one_with_channels(3, 2)
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            connections = [pool._acquire_connection() for _ in range(3)]
+
+        channel_instances = pool._channel_instances
+        self.assertEqual(len(channel_instances), 2)
+        self.assertTrue(channel_instances[0] is instance)
+        self.assertTrue(channel_instances[1].copied_from is instance)
+        self.assertEqual(
+            [connection._instance for connection in connections],
+            [channel_instances[0], channel_instances[1], channel_instances[0]],
+        )
+        self.assertEqual(pool._channel_loads, [2, 1])
+
+        pool._release_connection(connections[0])
+        self.assertEqual(pool._channel_loads, [1, 1])
+        self.assertEqual(len(pool._connection_channels), 2)
+
+    def test__acquire_connection_least_load_channels(self):
+        from google.cloud.happybase.pool import LEAST_LOAD
+
+        pool, _ = self._make_one_with_channels(3, 2, channel_policy=LEAST_LOAD)
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            connection1 = pool._acquire_connection()
+            connection2 = pool._acquire_connection()
+            self.assertEqual(pool._channel_loads, [1, 1])
+
+            pool._release_connection(connection2)
+            connection3 = pool._acquire_connection()
+            connection4 = pool._acquire_connection()
+
+        channel_instances = pool._channel_instances
+        # The released connection is re-used, and its channel has the
+        # least load again.
+        self.assertTrue(connection3 is connection2)
+        self.assertTrue(connection1._instance is channel_instances[0])
+        self.assertTrue(connection3._instance is channel_instances[1])
+        self.assertTrue(connection4._instance is channel_instances[0])
+        self.assertEqual(pool._channel_loads, [2, 1])
+
+    def test_constructor_warmup(self):
+        instance = _Instance()
+        warmup_calls = []
+
+        class ConnectionWithWarmup(_Connection):
+            def warmup(self, tables=None):
+                warmup_calls.append((self.kwargs, tables))
+
+        with mock.patch("google.cloud.happybase.pool.Connection", ConnectionWithWarmup):
+            self._make_one(
+                2,
+                warmup=True,
+                warmup_tables=["table1"],
+                table_prefix="prefix",
+                instance=instance,
+            )
+
+        expected_kwargs = {
+            "autoconnect": False,
+            "table_prefix": "prefix",
+            "instance": instance,
+        }
+        self.assertEqual(warmup_calls, [(expected_kwargs, ["table1"])])
+
+    def test_warmup_channels(self):
+        pool, instance = self._make_one_with_channels(2, 2)
+        warmed_instances = []
+
+        class ConnectionWithWarmup(_Connection):
+            def warmup(self, tables=None):
+                warmed_instances.append(self.kwargs["instance"])
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            with mock.patch(
+                "google.cloud.happybase.pool.Connection", ConnectionWithWarmup
+            ):
+                pool.warmup()
+
+        self.assertEqual(warmed_instances, pool._channel_instances)
+        self.assertTrue(warmed_instances[0] is instance)
+
+    def test_stats_unused(self):
+        pool = self._make_one_with_mock_connections(size=4)
+
+        stats = pool.stats()
+
+        self.assertEqual(stats["max_size"], 4)
+        self.assertEqual(stats["connections"], 0)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["idle"], 0)
+        self.assertEqual(stats["waiting"], 0)
+        self.assertEqual(stats["utilization"], 0.0)
+        self.assertEqual(stats["acquisitions"], 0)
+        self.assertEqual(stats["timeouts"], 0)
+        self.assertEqual(stats["connections_created"], 0)
+        self.assertEqual(stats["connections_retired"], 0)
+        self.assertEqual(stats["acquire_wait_time"]["count"], 0)
+        self.assertEqual(stats["hold_time"]["count"], 0)
+
+    def test_stats_and_metrics_sink(self):
+        sink = _MetricsSink()
+        pool = self._make_one(4, instance=_Instance(), metrics_sink=sink)
+
+        with mock.patch("google.cloud.happybase.pool.Connection", _Connection):
+            connection1 = pool._acquire_connection()
+            pool._acquire_connection()
+        pool._release_connection(connection1)
+
+        stats = pool.stats()
+        self.assertEqual(stats["connections"], 2)
+        self.assertEqual(stats["in_use"], 1)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["utilization"], 0.25)
+        self.assertEqual(stats["acquisitions"], 2)
+        self.assertEqual(stats["connections_created"], 2)
+        self.assertEqual(stats["acquire_wait_time"]["count"], 2)
+        self.assertEqual(stats["hold_time"]["count"], 1)
+
+        self.assertEqual(
+            [(kind, name) for kind, name, _ in sink.calls],
+            [
+                ("increment", "connections_created"),
+                ("increment", "acquisitions"),
+                ("observe", "acquire_wait_time"),
+                ("gauge", "in_use"),
+                ("increment", "connections_created"),
+                ("increment", "acquisitions"),
+                ("observe", "acquire_wait_time"),
+                ("gauge", "in_use"),
+                ("observe", "hold_time"),
+                ("gauge", "in_use"),
+            ],
+        )
+        self.assertEqual(
+            [value for _, name, value in sink.calls if name == "in_use"], [1, 2, 1]
+        )
+
+    def test_stats_timeout(self):
+        from google.cloud.happybase.pool import NoConnectionsAvailable
+
+        sink = _MetricsSink()
+        pool = self._make_one_with_mock_connections(metrics_sink=sink)
+        pool._acquire_connection()
+
+        with self.assertRaises(NoConnectionsAvailable):
+            pool._acquire_connection(timeout=0)
+
+        stats = pool.stats()
+        self.assertEqual(stats["acquisitions"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["utilization"], 1.0)
+        # The wait of the timed out acquisition is recorded too.
+        self.assertEqual(stats["acquire_wait_time"]["count"], 2)
+        self.assertEqual(
+            [(kind, name) for kind, name, _ in sink.calls[-2:]],
+            [("increment", "acquire_timeouts"), ("observe", "acquire_wait_time")],
+        )
+
+    def test_stats_retired(self):
+        sink = _MetricsSink()
+        pool = self._make_one_with_mock_connections(
+            size=3, idle_timeout=10, metrics_sink=sink
+        )
+        pool._idle.append((_Connection(), 0.0))
+        pool._num_connections = 1
+
+        pool._acquire_connection()
+
+        self.assertEqual(pool.stats()["connections_retired"], 1)
+        self.assertEqual(sink.calls[0], ("increment", "connections_retired", 1))
+
+    def test_stats_waiting(self):
+        import threading
+
+        pool = self._make_one_with_mock_connections()
+        connection = pool._acquire_connection()
+        waiting = []
+
+        def release():
+            waiting.append(pool.stats()["waiting"])
+            pool._release_connection(connection)
+
+        thread = threading.Thread(target=pool._acquire_connection)
+        thread.start()
+        while not pool._waiters:
+            thread.join(0.001)
+        release()
+        thread.join()
+
+        self.assertEqual(waiting, [1])
+        self.assertEqual(pool.stats()["waiting"], 0)
+
+    def _start_waiters(self, pool, priorities, served):
+        import threading
+
+        def acquire(label, priority):
+            connection = pool._acquire_connection(priority=priority)
+            served.append(label)
+            pool._release_connection(connection)
+
+        threads = []
+        for label, priority in enumerate(priorities):
+            thread = threading.Thread(target=acquire, args=(label, priority))
+            thread.start()
+            while len(pool._waiters) <= label:
+                thread.join(0.001)
+            threads.append(thread)
+        return threads
+
+    def test__acquire_connection_priority_order(self):
+        pool = self._make_one_with_mock_connections()
+        connection = pool._acquire_connection()
+        served = []
+
+        threads = self._start_waiters(pool, [0, 5, 0, 5, 1], served)
+        pool._release_connection(connection)
+        for thread in threads:
+            thread.join()
+
+        # Highest priority first, first come first served within a priority.
+        self.assertEqual(served, [1, 3, 4, 0, 2])
+        self.assertEqual(pool._waiters, [])
+
+    def test__wait_for_connection_does_not_jump_queue(self):
+        pool = self._make_one_with_mock_connections()
+        connection = pool._acquire_connection()
+        served = []
+
+        threads = self._start_waiters(pool, [0], served)
+        with pool._lock:
+            # Released while the waiting thread can't take the lock yet.
+            pool._idle.append((connection, 0.0))
+            self.assertFalse(pool._wait_for_connection(0.0, 0))
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(served, [0])
+
+    def test__acquire_connection_timeout_behind_waiter(self):
+        from google.cloud.happybase.pool import NoConnectionsAvailable
+
+        pool = self._make_one_with_mock_connections()
+        connection = pool._acquire_connection()
+        served = []
+
+        threads = self._start_waiters(pool, [1], served)
+        with self.assertRaises(NoConnectionsAvailable):
+            pool._acquire_connection(timeout=0.01)
+        self.assertEqual(len(pool._waiters), 1)
+        pool._release_connection(connection)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(served, [0])
+
+    def test__acquire_connection_overloaded(self):
+        from google.cloud.happybase.pool import PoolOverloaded
+
+        sink = _MetricsSink()
+        pool = self._make_one_with_mock_connections(max_waiters=1, metrics_sink=sink)
+        connection = pool._acquire_connection()
+        served = []
+
+        threads = self._start_waiters(pool, [0], served)
+        with self.assertRaises(PoolOverloaded):
+            pool._acquire_connection(priority=10)
+        pool._release_connection(connection)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(served, [0])
+        self.assertEqual(pool.stats()["rejections"], 1)
+        self.assertIn(("increment", "acquire_rejections", 1), sink.calls)
+
+    def test__acquire_connection_no_waiters_allowed(self):
+        from google.cloud.happybase.pool import PoolOverloaded
+
+        pool = self._make_one_with_mock_connections(max_waiters=0)
+        connection = pool._acquire_connection()
+        with self.assertRaises(PoolOverloaded):
+            pool._acquire_connection()
+
+        pool._release_connection(connection)
+        self.assertTrue(pool._acquire_connection() is connection)
+
+    def test__reset_after_fork(self):
+        import os
+
+        instance = _Instance()
+        with mock.patch("google.cloud.happybase.pool.Connection", _Connection):
+            pool = self._make_one(3, min_size=1, instance=instance)
+        pool._create_connection = _Connection
+        old_lock = pool._lock
+        old_thread_connections = pool._thread_connections
+        old_connection, _ = pool._idle[0]
+        pool._acquire_connection()
+        pool._acquire_connection()
+        pool._pid = -1
+
+        pool._reset_after_fork()
+
+        self.assertEqual(pool._pid, os.getpid())
+        self.assertTrue(pool._forked)
+        self.assertFalse(pool._lock is old_lock)
+        self.assertFalse(pool._thread_connections is old_thread_connections)
+        # Nothing is created until a connection is acquired in the child.
+        self.assertTrue(pool._connection_kwargs["instance"] is instance)
+        self.assertEqual(pool.num_connections, 0)
+        self.assertEqual(len(pool._idle), 0)
+        self.assertFalse(old_connection.closed)
+        self.assertEqual(pool._acquired, {})
+        self.assertEqual(pool.stats()["acquisitions"], 0)
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            connection = pool._acquire_connection()
+
+        self.assertFalse(pool._forked)
+        self.assertTrue(pool._connection_kwargs["instance"].copied_from is instance)
+        # Only the warm minimum is re-created, without closing the
+        # parent's connections.
+        self.assertFalse(connection is old_connection)
+        self.assertEqual(pool.num_connections, 1)
+        self.assertEqual(len(pool._idle), 0)
+        self.assertFalse(old_connection.closed)
+
+    def test__reset_after_fork_without_instance(self):
+        pool = self._make_one(1)
+        pool._reset_after_fork()
+        pool._set_up_after_fork()
+        self.assertIsNone(pool._connection_kwargs["instance"])
+        self.assertEqual(pool.num_connections, 0)
+
+    def test__set_up_after_fork_once(self):
+        instance = _Instance()
+        pool = self._make_one(1, instance=instance)
+        pool._set_up_after_fork()
+        self.assertTrue(pool._connection_kwargs["instance"] is instance)
+
+    def test_warmup_after_fork(self):
+        instance = _Instance()
+        pool = self._make_one(1, instance=instance)
+        pool._reset_after_fork()
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            with mock.patch("google.cloud.happybase.pool.Connection") as klass:
+                pool.warmup(tables=["table-name"])
+
+        copied = pool._connection_kwargs["instance"]
+        self.assertTrue(copied.copied_from is instance)
+        self.assertFalse(pool._forked)
+        self.assertTrue(klass.call_args[1]["instance"] is copied)
+
+    def test__acquire_connection_checks_pid(self):
+        import os
+
+        pool = self._make_one_with_mock_connections()
+        stale = _Connection()
+        pool._idle.append((stale, 0.0))
+        pool._num_connections = 1
+        pool._pid = -1
+
+        with mock.patch("google.cloud.happybase.pool._CHECK_PID", True):
+            with mock.patch(
+                "google.cloud.happybase.pool._copy_instance", _copy_instance
+            ):
+                connection = pool._acquire_connection()
+
+        self.assertEqual(pool._pid, os.getpid())
+        self.assertFalse(connection is stale)
+        self.assertEqual(pool.num_connections, 1)
+
+    def test__acquire_connection_skips_pid_check(self):
+        pool = self._make_one_with_mock_connections()
+        pool._pid = -1
+
+        with mock.patch("google.cloud.happybase.pool._CHECK_PID", False):
+            pool._acquire_connection()
+
+        self.assertEqual(pool._pid, -1)
+
+    def test_connection_across_fork(self):
+        pool = self._make_one_with_mock_connections()
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            with pool.connection():
+                pool._reset_after_fork()
+
+        # The parent's connection is not returned to the child's pool.
+        self.assertEqual(len(pool._idle), 0)
+        self.assertEqual(pool.num_connections, 0)
+
+    def test_constructor_bad_health_options(self):
+        instance = _Instance()
+        with self.assertRaises(ValueError):
+            self._make_one(2, max_age=0, instance=instance)
+        with self.assertRaises(ValueError):
+            self._make_one(2, maintenance_interval=0, instance=instance)
+        with self.assertRaises(ValueError):
+            self._make_one(2, validate_on_checkout=True, instance=instance)
+
+    def test_constructor_starts_maintenance(self):
+        import weakref
+
+        instance = _Instance()
+        with mock.patch("threading.Thread") as thread_class:
+            pool = self._make_one(2, maintenance_interval=30, instance=instance)
+
+        _, kwargs = thread_class.call_args
+        pool_ref, interval = kwargs["args"]
+        self.assertTrue(isinstance(pool_ref, weakref.ref))
+        self.assertTrue(pool_ref() is pool)
+        self.assertEqual(interval, 30)
+        thread = thread_class.return_value
+        self.assertTrue(thread.daemon)
+        thread.start.assert_called_once_with()
+
+    def test__add_missing_connections_failure(self):
+        pool = self._make_one_with_mock_connections(size=2)
+        pool.min_size = 2
+        pool._create_connection = mock.Mock(side_effect=ValueError("boom"))
+
+        with self.assertRaises(ValueError):
+            pool._add_missing_connections()
+        self.assertEqual(pool.num_connections, 0)
+
+    def test__release_connection_expired(self):
+        pool = self._make_one_with_mock_connections(max_age=60)
+        connection = pool._acquire_connection()
+        pool._created_at[connection] = 0.0
+
+        pool._release_connection(connection)
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(len(pool._idle), 0)
+        self.assertEqual(pool.num_connections, 0)
+        self.assertEqual(pool._created_at, {})
+        self.assertEqual(pool.stats()["connections_retired"], 1)
+
+    def test__release_connection_expired_replaces_client(self):
+        instance = _Instance()
+        with mock.patch("google.cloud.happybase.pool.Connection", _Connection):
+            pool = self._make_one(2, max_age=60, instance=instance)
+            with mock.patch(
+                "google.cloud.happybase.pool._copy_instance", _copy_instance
+            ):
+                connection = pool._acquire_connection()
+                pool._created_at[connection] = 0.0
+                pool._release_connection(connection)
+                new_connection = pool._acquire_connection()
+
+        self.assertTrue(connection._instance is instance)
+        self.assertTrue(new_connection._instance.copied_from is instance)
+        # The client given to the pool is never closed.
+        self.assertFalse(instance._client.closed)
+        self.assertEqual(pool._replaced_instances, [])
+
+    def test__release_connection_expired_keeps_default_instance_open(self):
+        default_instance = _Instance()
+        with mock.patch("google.cloud.happybase.pool.Connection", _Connection):
+            with mock.patch(
+                "google.cloud.happybase.pool._get_instance",
+                return_value=default_instance,
+            ):
+                pool = self._make_one(1, max_age=60)
+                with mock.patch(
+                    "google.cloud.happybase.pool._copy_instance", _copy_instance
+                ):
+                    connection = pool._acquire_connection()
+                    pool._created_at[connection] = 0.0
+                    pool._release_connection(connection)
+
+        replacement = pool._connection_kwargs["instance"]
+        self.assertTrue(replacement.copied_from is default_instance)
+        # The default instance is shared by the process, so the pool
+        # leaves its client open.
+        self.assertFalse(default_instance._client.closed)
+        self.assertEqual(pool._replaced_instances, [])
+        self.assertEqual(pool._owned_instances, [replacement])
+
+    def test__release_connection_closes_unused_client(self):
+        instance = _Instance()
+        with mock.patch("google.cloud.happybase.pool.Connection", _Connection):
+            pool = self._make_one(2, max_age=60, instance=instance)
+            with mock.patch(
+                "google.cloud.happybase.pool._copy_instance", _copy_instance
+            ):
+                pool._replace_instance(instance)
+                copied = pool._connection_kwargs["instance"]
+                expired = pool._acquire_connection()
+                in_use = pool._acquire_connection()
+                pool._created_at[expired] = 0.0
+                pool._release_connection(expired)
+
+                # The other acquired connection still uses the client.
+                replacement = pool._connection_kwargs["instance"]
+                self.assertTrue(replacement.copied_from is copied)
+                self.assertFalse(copied._client.closed)
+
+                fresh = pool._acquire_connection()
+                pool._release_connection(fresh)
+                self.assertTrue(fresh._instance is replacement)
+                pool._release_connection(in_use)
+
+        # The released connection switches to the new client, so the
+        # replaced client is closed.
+        self.assertTrue(in_use._instance is replacement)
+        self.assertTrue(copied._client.closed)
+        self.assertFalse(replacement._client.closed)
+        self.assertEqual(pool._replaced_instances, [])
+
+    def test__retire_idle_connections_expired(self):
+        import time
+
+        pool = self._make_one_with_mock_connections(size=3, max_age=60)
+        pool.min_size = 2
+        expired = _Connection()
+        fresh = _Connection()
+        pool._idle.extend([(fresh, 0.0), (expired, time.time())])
+        pool._created_at.update({expired: 0.0, fresh: time.time()})
+        pool._num_connections = 2
+
+        with pool._lock:
+            retired = pool._retire_idle_connections()
+
+        # Expired connections are retired even below min_size.
+        self.assertEqual(retired, [expired])
+        self.assertEqual([connection for connection, _ in pool._idle], [fresh])
+        self.assertEqual(pool.num_connections, 1)
+        self.assertEqual(pool._expired_instances, [expired._instance])
+
+        with mock.patch.object(pool, "_replace_instance") as replace_instance:
+            pool._close_retired(retired)
+
+        self.assertTrue(expired.closed)
+        replace_instance.assert_called_once_with(expired._instance)
+        self.assertEqual(pool._expired_instances, [])
+
+    def test__acquire_connection_validate_on_checkout(self):
+        health = {}
+        pool = self._make_one_with_mock_connections(
+            size=3, health_check=health.get, validate_on_checkout=True
+        )
+        healthy = _Connection()
+        broken = _Connection()
+        health[healthy] = True
+        pool._idle.extend([(healthy, 0.0), (broken, 0.0)])
+        pool._num_connections = 2
+
+        with mock.patch.object(pool, "_replace_instance") as replace_instance:
+            connection = pool._acquire_connection()
+
+        self.assertTrue(connection is healthy)
+        self.assertTrue(broken.closed)
+        replace_instance.assert_called_once_with(broken._instance)
+        self.assertEqual(pool.num_connections, 1)
+        self.assertEqual(pool.stats()["health_check_failures"], 1)
+
+    def test__acquire_connection_skips_check_of_new_connection(self):
+        health_check = mock.Mock(return_value=False)
+        pool = self._make_one_with_mock_connections(
+            health_check=health_check, validate_on_checkout=True
+        )
+
+        pool._acquire_connection()
+        health_check.assert_not_called()
+
+    def test__check_health_error(self):
+        pool = self._make_one_with_mock_connections(
+            health_check=mock.Mock(side_effect=RuntimeError("broken channel"))
+        )
+        self.assertFalse(pool._check_health(_Connection()))
+
+    def test__replace_instance(self):
+        pool, instance = self._make_one_with_channels(3, 2)
+        idle_connection = _Connection()
+        idle_connection._instance = instance
+        other_connection = _Connection()
+        other_connection._instance = object()
+        pool._idle.extend([(idle_connection, 0.0), (other_connection, 0.0)])
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            channel_instances = list(pool._get_channel_instances())
+            pool._replace_instance(instance)
+
+        replacement = pool._connection_kwargs["instance"]
+        self.assertTrue(replacement.copied_from is instance)
+        self.assertEqual(pool._channel_instances, [replacement, channel_instances[1]])
+        self.assertTrue(idle_connection._instance is replacement)
+        self.assertFalse(other_connection._instance is replacement)
+
+        with mock.patch("google.cloud.happybase.pool._copy_instance", _copy_instance):
+            pool._replace_instance(channel_instances[1])
+
+        # Only the channel is replaced, not the instance of the pool.
+        self.assertTrue(pool._connection_kwargs["instance"] is replacement)
+        self.assertTrue(pool._channel_instances[1].copied_from is channel_instances[1])
+
+    def test__replace_instance_replaced_already(self):
+        pool = self._make_one_with_mock_connections()
+        instance = pool._connection_kwargs["instance"]
+
+        pool._replace_instance(object())
+
+        self.assertTrue(pool._connection_kwargs["instance"] is instance)
+
+    def test__maintain(self):
+        health = {}
+        pool = self._make_one_with_mock_connections(
+            size=4, idle_timeout=10, health_check=health.get
+        )
+        pool.min_size = 2
+        stale = _Connection()
+        healthy1 = _Connection()
+        broken = _Connection()
+        healthy2 = _Connection()
+        health.update({healthy1: True, healthy2: True})
+        pool._idle.extend(
+            [(stale, 0.0), (healthy1, 1e12), (broken, 1e12), (healthy2, 1e12)]
+        )
+        pool._num_connections = 4
+
+        with mock.patch.object(pool, "_replace_instance") as replace_instance:
+            pool._maintain()
+
+        self.assertTrue(stale.closed)
+        self.assertTrue(broken.closed)
+        replace_instance.assert_called_once_with(broken._instance)
+        self.assertEqual(list(pool._idle), [(healthy1, 1e12), (healthy2, 1e12)])
+        self.assertEqual(pool.num_connections, 2)
+
+    def test__maintain_checks_one_connection_at_a_time(self):
+        pool = self._make_one_with_mock_connections(size=2)
+        connection1 = _Connection()
+        connection2 = _Connection()
+        pool._idle.extend([(connection1, 1.0), (connection2, 2.0)])
+        pool._num_connections = 2
+        idle_while_checked = []
+
+        def health_check(connection):
+            idle_while_checked.append([cnxn for cnxn, _ in pool._idle])
+            if connection is connection1:
+                # Acquired while the other connection is checked.
+                self.assertTrue(pool._acquire_connection() is connection2)
+            return True
+
+        pool.health_check = health_check
+        pool._maintain()
+
+        # The other connection stays available while one is checked, and
+        # the connection acquired in the meantime is not checked.
+        self.assertEqual(idle_while_checked, [[connection2]])
+        self.assertEqual(list(pool._idle), [(connection1, 1.0)])
+
+    def test__maintain_keeps_release_order(self):
+        pool = self._make_one_with_mock_connections(size=2)
+        checked = _Connection()
+        released = _Connection()
+        pool._idle.append((checked, 1.0))
+        pool._num_connections = 2
+
+        def health_check(connection):
+            pool._idle.append((released, 2.0))
+            return True
+
+        pool.health_check = health_check
+        pool._maintain()
+
+        self.assertEqual(list(pool._idle), [(checked, 1.0), (released, 2.0)])
+
+    def test__maintain_adds_missing_connections(self):
+        pool = self._make_one_with_mock_connections(size=3)
+        pool.min_size = 2
+
+        pool._maintain()
+
+        self.assertEqual(pool.num_connections, 2)
+        self.assertEqual(len(pool._idle), 2)
 
     def test_connection_is_context_manager(self):
         import contextlib
         import six
 
-        queue_return = _Connection()
-        pool = self._make_one_with_mock_queue(queue_return)
+        pool = self._make_one_with_mock_connections()
         cnxn_context = pool.connection()
         if six.PY3:
             self.assertTrue(
@@ -172,63 +1001,277 @@ class TestConnectionPool(unittest.TestCase):
             )
 
     def test_connection_no_current_cnxn(self):
-        queue_return = _Connection()
-        pool = self._make_one_with_mock_queue(queue_return)
+        pool = self._make_one_with_mock_connections()
         timeout = 55
 
         self.assertFalse(hasattr(pool._thread_connections, "current"))
         with pool.connection(timeout=timeout) as connection:
-            self.assertEqual(pool._thread_connections.current, queue_return)
-            self.assertTrue(connection is queue_return)
+            self.assertEqual(pool._thread_connections.current, connection)
+            self.assertTrue(isinstance(connection, _Connection))
+            self.assertEqual(len(pool._idle), 0)
         self.assertFalse(hasattr(pool._thread_connections, "current"))
 
-        self.assertEqual(pool._queue._get_calls, [(True, timeout)])
-        self.assertEqual(pool._queue._put_calls, [(queue_return, None, None)])
+        self.assertEqual(len(pool._idle), 1)
+        self.assertTrue(pool._idle[0][0] is connection)
+
+    def test_connection_with_priority(self):
+        pool = self._make_one_with_mock_connections()
+
+        with mock.patch.object(
+            pool, "_acquire_connection", return_value=_Connection()
+        ) as acquire_connection:
+            with pool.connection(timeout=5, priority=3):
+                pass
+
+        acquire_connection.assert_called_once_with(5, 3)
+
+    def test_connection_released_on_error(self):
+        pool = self._make_one_with_mock_connections()
+
+        with self.assertRaises(ValueError):
+            with pool.connection() as connection:
+                raise ValueError("boom")
+
+        self.assertFalse(hasattr(pool._thread_connections, "current"))
+        self.assertTrue(pool._idle[0][0] is connection)
 
     def test_connection_with_current_cnxn(self):
         current_cnxn = _Connection()
-        queue_return = _Connection()
-        pool = self._make_one_with_mock_queue(queue_return)
+        pool = self._make_one_with_mock_connections()
         pool._thread_connections.current = current_cnxn
         timeout = 8001
 
         with pool.connection(timeout=timeout) as connection:
             self.assertTrue(connection is current_cnxn)
 
-        self.assertEqual(pool._queue._get_calls, [])
-        self.assertEqual(pool._queue._put_calls, [])
+        self.assertEqual(len(pool._idle), 0)
+        self.assertEqual(pool.num_connections, 0)
         self.assertEqual(pool._thread_connections.current, current_cnxn)
 
 
+class Test__reset_pools_after_fork(unittest.TestCase):
+    def _call_fut(self):
+        from google.cloud.happybase.pool import _reset_pools_after_fork
+
+        return _reset_pools_after_fork()
+
+    def test_it(self):
+        pools = [mock.Mock(), mock.Mock()]
+
+        with mock.patch("google.cloud.happybase.pool._POOLS", pools):
+            self._call_fut()
+
+        for pool in pools:
+            pool._reset_after_fork.assert_called_once_with()
+
+    def test_failure_does_not_stop_other_pools(self):
+        import warnings
+
+        pools = [mock.Mock(), mock.Mock()]
+        pools[0]._reset_after_fork.side_effect = RuntimeError("broken")
+
+        with mock.patch("google.cloud.happybase.pool._POOLS", pools):
+            with warnings.catch_warnings(record=True) as warned:
+                warnings.simplefilter("always")
+                self._call_fut()
+
+        pools[1]._reset_after_fork.assert_called_once_with()
+        self.assertEqual(len(warned), 1)
+        self.assertIn("broken", str(warned[0].message))
+
+
+class Test__maintain_periodically(unittest.TestCase):
+    def _call_fut(self, pool_ref, interval):
+        from google.cloud.happybase.pool import _maintain_periodically
+
+        return _maintain_periodically(pool_ref, interval)
+
+    def test_until_collected(self):
+        pool = mock.Mock()
+        pool_ref = mock.Mock(side_effect=[pool, pool, None])
+
+        with mock.patch("time.sleep") as sleep:
+            self._call_fut(pool_ref, 5)
+
+        self.assertEqual(pool._maintain.call_count, 2)
+        self.assertEqual(sleep.call_args_list, [mock.call(5)] * 3)
+
+    def test_failure_warns(self):
+        import warnings
+
+        pool = mock.Mock()
+        pool._maintain.side_effect = ValueError("boom")
+        pool_ref = mock.Mock(side_effect=[pool, None])
+
+        with mock.patch("time.sleep"):
+            with warnings.catch_warnings(record=True) as warned:
+                warnings.simplefilter("always")
+                self._call_fut(pool_ref, 5)
+
+        self.assertEqual(len(warned), 1)
+        self.assertIn("boom", str(warned[0].message))
+
+
+class TestMetricsSink(unittest.TestCase):
+    def _make_one(self):
+        from google.cloud.happybase.pool import MetricsSink
+
+        return MetricsSink()
+
+    def test_methods_do_nothing(self):
+        sink = self._make_one()
+        self.assertIsNone(sink.increment("acquisitions"))
+        self.assertIsNone(sink.observe("hold_time", 0.5))
+        self.assertIsNone(sink.gauge("in_use", 3))
+
+
+class Test_Histogram(unittest.TestCase):
+    def _make_one(self, *args, **kwargs):
+        from google.cloud.happybase.pool import _Histogram
+
+        return _Histogram(*args, **kwargs)
+
+    def test_empty(self):
+        histogram = self._make_one(bounds=(0.1, 1.0))
+        self.assertEqual(
+            histogram.snapshot(),
+            {
+                "count": 0,
+                "sum": 0.0,
+                "mean": 0.0,
+                "max": 0.0,
+                "buckets": [(0.1, 0), (1.0, 0), (float("inf"), 0)],
+            },
+        )
+
+    def test_record(self):
+        histogram = self._make_one(bounds=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 4)
+        self.assertAlmostEqual(snapshot["sum"], 2.65)
+        self.assertAlmostEqual(snapshot["mean"], 0.6625)
+        self.assertEqual(snapshot["max"], 2.0)
+        self.assertEqual(snapshot["buckets"], [(0.1, 2), (1.0, 1), (float("inf"), 1)])
+
+
+class Test__copy_instance(unittest.TestCase):
+    def _call_fut(self, instance):
+        from google.cloud.happybase.pool import _copy_instance
+
+        return _copy_instance(instance)
+
+    def test_it(self):
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.bigtable.client import Client
+
+        credentials = AnonymousCredentials()
+        client = Client(project="project-id", credentials=credentials, admin=True)
+        instance = client.instance("instance-id")
+
+        result = self._call_fut(instance)
+
+        self.assertEqual(result.instance_id, "instance-id")
+        self.assertFalse(result._client is client)
+        self.assertEqual(result._client.project, "project-id")
+        self.assertTrue(result._client._credentials is credentials)
+        self.assertTrue(result._client._admin)
+        self.assertFalse(result._client._read_only)
+
+
+class Test__close_client(unittest.TestCase):
+    def _call_fut(self, client):
+        from google.cloud.happybase.pool import _close_client
+
+        return _close_client(client)
+
+    def test_it(self):
+        client = _Client()
+        self._call_fut(client)
+        self.assertTrue(client.closed)
+
+    def test_legacy_transport(self):
+        client = _Client()
+        transport = mock.Mock(spec=["channel"], channel=_Channel())
+        client._instance_admin_client = mock.Mock(transport=transport)
+
+        self._call_fut(client)
+
+        self.assertTrue(client.closed)
+        self.assertTrue(transport.channel.closed)
+
+    def test_with_real_client(self):
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.bigtable.client import Client
+
+        client = Client(
+            project="project-id", credentials=AnonymousCredentials(), admin=True
+        )
+        channel = client.table_data_client.transport.grpc_channel
+
+        with mock.patch.object(channel, "close") as close:
+            self._call_fut(client)
+
+        close.assert_called_once_with()
+
+
+class _Channel(object):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
 class _Client(object):
-    pass
+    _table_admin_client = None
+    _instance_admin_client = None
+
+    def __init__(self):
+        transport = mock.Mock(grpc_channel=_Channel())
+        self._table_data_client = mock.Mock(transport=transport)
+
+    @property
+    def closed(self):
+        return self._table_data_client.transport.grpc_channel.closed
 
 
 class _Connection(object):
+    closed = False
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._instance = kwargs.get("instance")
+
     def open(self):
         pass
 
+    def close(self):
+        self.closed = True
 
-class _Instance(object):
+
+class _MetricsSink(object):
     def __init__(self):
-        # Included to support Connection.__del__
-        self._client = _Client()
+        self.calls = []
+
+    def increment(self, name, value=1):
+        self.calls.append(("increment", name, value))
+
+    def observe(self, name, value):
+        self.calls.append(("observe", name, value))
 
+    def gauge(self, name, value):
+        self.calls.append(("gauge", name, value))
 
-class _Queue(object):
-    def __init__(self, result=None):
-        self.result = result
-        self._get_calls = []
-        self._put_calls = []
 
-    def get(self, block=None, timeout=None):
-        self._get_calls.append((block, timeout))
-        if self.result is None:
-            import six
+class _Instance(object):
+    def __init__(self):
+        # Included to support Connection.__del__
+        self._client = _Client()
 
-            raise six.moves.queue.Empty
-        else:
-            return self.result
 
-    def put(self, item, block=None, timeout=None):
-        self._put_calls.append((item, block, timeout))
+def _copy_instance(instance):
+    copied = _Instance()
+    copied.copied_from = instance
+    return copied
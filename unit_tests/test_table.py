@@ -70,6 +70,18 @@ class TestTable(unittest.TestCase):
         self.assertEqual(table._low_level_table, table_instance)
         self.assertEqual(table_instance.args, (name, instance))
         self.assertEqual(table_instance.kwargs, {})
+        self.assertEqual(table._flow_controller, None)
+
+    def test_constructor_with_flow_controller(self):
+        name = "table-name"
+        flow_controller = object()
+        connection = _Connection(object(), flow_controller=flow_controller)
+
+        with mock.patch(
+            "google.cloud.happybase.table._LowLevelTable", _MockLowLevelTable
+        ):
+            table = self._make_one(name, connection)
+        self.assertTrue(table._flow_controller is flow_controller)
 
     def test_constructor_null_connection(self):
         name = "table-name"
@@ -108,6 +120,21 @@ class TestTable(unittest.TestCase):
         self.assertEqual(table._low_level_table.list_column_families_calls, 1)
         self.assertEqual(to_dict_calls, [gc_rule])
 
+    def test_families_cached_by_connection(self):
+        name = "table-name"
+        connection = _Connection(object())
+        cached = {"fam": {"max_versions": 1}}
+        connection._table_families = mock.Mock(return_value=cached)
+
+        with mock.patch(
+            "google.cloud.happybase.table._LowLevelTable", _MockLowLevelTable
+        ):
+            table = self._make_one(name, connection)
+
+        self.assertTrue(table.families() is cached)
+        connection._table_families.assert_called_once_with(name, table._list_families)
+        self.assertEqual(table._low_level_table.list_column_families_calls, 0)
+
     def test___repr__(self):
         name = "table-name"
         table = self._make_one(name, None)
@@ -685,12 +712,113 @@ class TestTable(unittest.TestCase):
             expected_result=expected_result,
         )
 
-    def test_put(self):
-        from google.cloud.happybase.table import _WAL_SENTINEL
-
+    def _mutate_row_table(self, flow_controller=None):
         name = "table-name"
         connection = None
         table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+        table._flow_controller = flow_controller
+        return table
+
+    def test_put(self):
+        table = self._mutate_row_table()
+
+        row = "row-key"
+        data = {b"fam:col": b"foo"}
+        with mock.patch("google.cloud.happybase.table.Batch") as batch_class:
+            result = table.put(row, data)
+
+        # There is no return value.
+        self.assertEqual(result, None)
+        # The row is sent directly, without a batch.
+        batch_class.assert_not_called()
+        row_obj = table._low_level_table.row_values[row]
+        self.assertEqual(row_obj.commit_calls, 1)
+        self.assertEqual(
+            row_obj.set_cell_calls, [(("fam", b"col", b"foo"), {"timestamp": None})]
+        )
+        self.assertEqual(table._low_level_table.mutate_rows_calls, [])
+
+    def test_put_failure(self):
+        from google.api_core.exceptions import ServiceUnavailable
+        from google.rpc import code_pb2
+
+        table = self._mutate_row_table()
+        row = "row-key"
+        row_obj = table._low_level_table.row(row)
+        row_obj.commit_result = _MockStatus(
+            code=code_pb2.UNAVAILABLE, message="try again"
+        )
+
+        with self.assertRaises(ServiceUnavailable) as exc_info:
+            table.put(row, {b"fam:col": b"foo"})
+
+        self.assertIn("try again", str(exc_info.exception))
+        self.assertEqual(row_obj.commit_calls, 1)
+
+    def test_put_with_timestamp(self):
+        from google.cloud._helpers import _datetime_from_microseconds
+
+        table = self._mutate_row_table()
+
+        row = "row-key"
+        table.put(row, {b"fam:col": b"foo"}, timestamp=1)
+
+        row_obj = table._low_level_table.row_values[row]
+        timestamp = _datetime_from_microseconds(1000)
+        self.assertEqual(
+            row_obj.set_cell_calls,
+            [(("fam", b"col", b"foo"), {"timestamp": timestamp})],
+        )
+
+    def test_put_bad_wal(self):
+        import warnings
+        from google.cloud.happybase.table import _WAL_WARNING
+
+        table = self._mutate_row_table()
+        with warnings.catch_warnings(record=True) as warned:
+            table.put("row-key", {b"fam:col": b"foo"}, wal=None)
+
+        self.assertEqual(len(warned), 1)
+        self.assertIn(_WAL_WARNING, str(warned[0].message))
+
+    def test_put_no_data(self):
+        table = self._mutate_row_table()
+
+        table.put("row-key", {})
+        self.assertEqual(table._low_level_table.row_values, {})
+
+    def test_put_with_flow_controller(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        flow_controller = FlowController(max_mutations=10)
+        table = self._mutate_row_table(flow_controller=flow_controller)
+        outstanding = []
+
+        row = "row-key"
+        row_obj = table._low_level_table.row(row)
+
+        def commit():
+            outstanding.append(
+                (
+                    flow_controller.outstanding_mutations,
+                    flow_controller.outstanding_bytes,
+                )
+            )
+            raise RuntimeError("Failed")
+
+        row_obj.commit = commit
+        with self.assertRaises(RuntimeError):
+            table.put(row, {b"fam:col": b"foo"})
+
+        self.assertEqual(outstanding, [(1, 9)])
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_bytes, 0)
+
+    def test_put_too_many_mutations(self):
+        from google.cloud.happybase.table import _WAL_SENTINEL
+
+        table = self._mutate_row_table()
         batches_created = []
 
         def make_batch(*args, **kwargs):
@@ -699,67 +827,506 @@ class TestTable(unittest.TestCase):
             return result
 
         row = "row-key"
-        data = {"fam:col": "foo"}
-        timestamp = None
-        with mock.patch("google.cloud.happybase.table.Batch", make_batch):
-            result = table.put(row, data, timestamp=timestamp)
-
-        # There is no return value.
-        self.assertEqual(result, None)
+        data = {b"fam:col1": b"foo", b"fam:col2": b"bar"}
+        with mock.patch("google.cloud.happybase.table._MAX_REQUEST_MUTATIONS", 1):
+            with mock.patch("google.cloud.happybase.table.Batch", make_batch):
+                table.put(row, data, timestamp=1)
 
-        # Check how the batch was created and used.
+        # The batch splits the mutations across requests.
         (batch,) = batches_created
-        self.assertTrue(isinstance(batch, _MockBatch))
         self.assertEqual(batch.args, (table,))
         expected_kwargs = {
-            "timestamp": timestamp,
+            "timestamp": 1,
             "batch_size": None,
             "transaction": True,
             "wal": _WAL_SENTINEL,
+            "coalesce": False,
+            "flow_controller": None,
         }
         self.assertEqual(batch.kwargs, expected_kwargs)
-        # Make sure it was a successful context manager
-        self.assertEqual(batch.exit_vals, [(None, None, None)])
-        self.assertEqual(batch.put_args, [(row, data)])
-        self.assertEqual(batch.delete_args, [])
+        self.assertEqual(batch.send_calls, 1)
+        ((batch_row, mutations),) = batch.add_mutations_args
+        self.assertEqual(batch_row, row)
+        self.assertEqual(len(mutations), 2)
+        self.assertEqual(table._low_level_table.row_values, {})
 
-    def test_delete(self):
-        from google.cloud.happybase.table import _WAL_SENTINEL
+    def test_put_too_many_mutations_failure(self):
+        from google.api_core.exceptions import NotFound
+        from google.rpc import code_pb2
 
-        name = "table-name"
-        connection = None
-        table = self._make_one(name, connection)
+        table = self._mutate_row_table()
         batches_created = []
 
         def make_batch(*args, **kwargs):
             result = _MockBatch(*args, **kwargs)
+            result.failed_rows = [
+                ("row-key", _MockStatus(code_pb2.NOT_FOUND, "Missing")),
+                ("row-key", _MockStatus(code_pb2.INTERNAL, "Failed")),
+            ]
             batches_created.append(result)
             return result
 
+        data = {b"fam:col1": b"foo", b"fam:col2": b"bar"}
+        with mock.patch("google.cloud.happybase.table._MAX_REQUEST_MUTATIONS", 1):
+            with mock.patch("google.cloud.happybase.table.Batch", make_batch):
+                with self.assertRaises(NotFound) as exc_info:
+                    table.put("row-key", data)
+
+        # The first failure is raised, as for a single request.
+        self.assertIn("Missing", str(exc_info.exception))
+        (batch,) = batches_created
+        self.assertEqual(batch.send_calls, 1)
+
+    def test_delete(self):
+        table = self._mutate_row_table()
+
         row = "row-key"
-        columns = ["fam:col1", "fam:col2"]
-        timestamp = None
-        with mock.patch("google.cloud.happybase.table.Batch", make_batch):
-            result = table.delete(row, columns=columns, timestamp=timestamp)
+        columns = [b"fam:col1", b"fam:col2"]
+        result = table.delete(row, columns=columns)
 
         # There is no return value.
         self.assertEqual(result, None)
+        row_obj = table._low_level_table.row_values[row]
+        self.assertEqual(row_obj.commit_calls, 1)
+        self.assertEqual(
+            row_obj.delete_cell_calls,
+            [
+                (("fam", b"col1"), {"time_range": None}),
+                (("fam", b"col2"), {"time_range": None}),
+            ],
+        )
 
-        # Check how the batch was created and used.
-        (batch,) = batches_created
-        self.assertTrue(isinstance(batch, _MockBatch))
-        self.assertEqual(batch.args, (table,))
-        expected_kwargs = {
-            "timestamp": timestamp,
-            "batch_size": None,
-            "transaction": False,
-            "wal": _WAL_SENTINEL,
-        }
-        self.assertEqual(batch.kwargs, expected_kwargs)
-        # Make sure it was a successful context manager
-        self.assertEqual(batch.exit_vals, [(None, None, None)])
-        self.assertEqual(batch.put_args, [])
-        self.assertEqual(batch.delete_args, [(row, columns)])
+    def test_delete_entire_row(self):
+        table = self._mutate_row_table()
+
+        row = "row-key"
+        table.delete(row)
+
+        row_obj = table._low_level_table.row_values[row]
+        self.assertEqual(row_obj.delete_calls, [{}])
+        self.assertEqual(row_obj.commit_calls, 1)
+
+    def test_delete_with_timestamp(self):
+        from google.cloud._helpers import _datetime_from_microseconds
+        from google.cloud.bigtable.row_filters import TimestampRange
+
+        table = self._mutate_row_table()
+
+        row = "row-key"
+        table.delete(row, columns=[b"fam:col1"], timestamp=1)
+
+        row_obj = table._low_level_table.row_values[row]
+        time_range = TimestampRange(end=_datetime_from_microseconds(2000))
+        self.assertEqual(
+            row_obj.delete_cell_calls, [(("fam", b"col1"), {"time_range": time_range})]
+        )
+
+    def test_delete_bad_wal(self):
+        import warnings
+        from google.cloud.happybase.table import _WAL_WARNING
+
+        table = self._mutate_row_table()
+        with warnings.catch_warnings(record=True) as warned:
+            table.delete("row-key", wal=None)
+
+        self.assertEqual(len(warned), 1)
+        self.assertIn(_WAL_WARNING, str(warned[0].message))
+
+    def test_delete_prefix(self):
+        table = self._mutate_row_table()
+
+        table.delete_prefix(u"tenant-1#", timeout=30)
+        self.assertEqual(
+            table._low_level_table.drop_by_prefix_calls, [(b"tenant-1#", 30)]
+        )
+
+    def test_delete_prefix_empty(self):
+        table = self._mutate_row_table()
+
+        with self.assertRaises(ValueError):
+            table.delete_prefix(b"")
+        self.assertEqual(table._low_level_table.drop_by_prefix_calls, [])
+
+    def test_truncate(self):
+        table = self._mutate_row_table()
+
+        table.truncate()
+        self.assertEqual(table._low_level_table.truncate_calls, [None])
+
+    def test__warmup(self):
+        from google.cloud.bigtable.row_filters import CellsRowLimitFilter
+        from google.cloud.bigtable.row_filters import RowFilterChain
+        from google.cloud.bigtable.row_filters import StripValueTransformerFilter
+
+        table = self._mutate_row_table()
+        low_level_table = table._low_level_table
+        low_level_table.read_rows_result = _MockPartialRowsData(
+            rows={b"row-key": object()}
+        )
+
+        table._warmup()
+
+        self.assertEqual(low_level_table.read_rows_result.rows, {})
+        _, kwargs = low_level_table.read_rows_calls[0]
+        expected_filter = RowFilterChain(
+            filters=[CellsRowLimitFilter(1), StripValueTransformerFilter(True)]
+        )
+        self.assertEqual(kwargs, {"limit": 1, "filter_": expected_filter})
+
+    def _delete_where_helper(self, row_keys, sample_keys=(), statuses=None, **kwargs):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        low_level_table = _MockSampledLowLevelTable(row_keys, sample_keys)
+        low_level_table.statuses = statuses
+        table._low_level_table = low_level_table
+
+        result = table.delete_where(**kwargs)
+        return result, low_level_table
+
+    def test_delete_where(self):
+        from google.cloud.bigtable.row_filters import CellsRowLimitFilter
+        from google.cloud.bigtable.row_filters import RowFilterChain
+        from google.cloud.bigtable.row_filters import StripValueTransformerFilter
+
+        row_keys = [b"row-key1", b"row-key2", b"row-key3"]
+        result, low_level_table = self._delete_where_helper(
+            row_keys, batch_size=2, max_workers=1
+        )
+
+        self.assertEqual(result.num_rows, 3)
+        self.assertEqual(result.num_deleted, 3)
+        self.assertEqual(result.failed_rows, [])
+        self.assertTrue(result.elapsed >= 0.0)
+        self.assertEqual(low_level_table.sample_row_keys_calls, 0)
+        self.assertEqual(
+            low_level_table.mutate_rows_calls,
+            [[b"row-key1", b"row-key2"], [b"row-key3"]],
+        )
+        for row_key in row_keys:
+            row = low_level_table.row_values[row_key]
+            self.assertEqual(row.delete_calls, [{}])
+
+        _, kwargs = low_level_table.read_rows_calls[0]
+        self.assertEqual(kwargs["row_set"].row_ranges[0].start_key, None)
+        self.assertEqual(kwargs["row_set"].row_ranges[0].end_key, None)
+        expected_filter = RowFilterChain(
+            filters=[CellsRowLimitFilter(1), StripValueTransformerFilter(True)]
+        )
+        self.assertEqual(kwargs["filter_"], expected_filter)
+
+    def test_delete_where_with_filter(self):
+        from google.cloud.bigtable.row_filters import CellsRowLimitFilter
+        from google.cloud.bigtable.row_filters import ColumnQualifierRegexFilter
+        from google.cloud.bigtable.row_filters import RowFilterChain
+        from google.cloud.bigtable.row_filters import StripValueTransformerFilter
+
+        filter_ = ColumnQualifierRegexFilter(b"col")
+        _, low_level_table = self._delete_where_helper(
+            [b"row-key1"], filter_=filter_, max_workers=1
+        )
+
+        _, kwargs = low_level_table.read_rows_calls[0]
+        expected_filter = RowFilterChain(
+            filters=[
+                filter_,
+                CellsRowLimitFilter(1),
+                StripValueTransformerFilter(True),
+            ]
+        )
+        self.assertEqual(kwargs["filter_"], expected_filter)
+
+    def test_delete_where_sharded(self):
+        row_keys = [b"a", b"b", b"c", b"d", b"e", b"f"]
+        sample_keys = [b"b", b"d", b"e", b""]
+        progress_calls = []
+        result, low_level_table = self._delete_where_helper(
+            row_keys,
+            sample_keys,
+            row_start="a",
+            row_stop="f",
+            max_workers=3,
+            progress=lambda result: progress_calls.append(result.num_rows),
+        )
+
+        self.assertEqual(result.num_rows, 5)
+        self.assertEqual(low_level_table.sample_row_keys_calls, 1)
+        ranges = sorted(
+            (
+                kwargs["row_set"].row_ranges[0].start_key,
+                kwargs["row_set"].row_ranges[0].end_key,
+            )
+            for _, kwargs in low_level_table.read_rows_calls
+        )
+        self.assertEqual(ranges, [(b"a", b"b"), (b"b", b"d"), (b"d", b"f")])
+        self.assertEqual(
+            sorted(low_level_table.mutate_rows_calls),
+            [[b"a"], [b"b", b"c"], [b"d", b"e"]],
+        )
+        self.assertEqual(sorted(progress_calls), [1, 3, 5])
+
+    def test_delete_where_failed_rows(self):
+        failed_status = _MockStatus(code=14)
+        result, _ = self._delete_where_helper(
+            [b"row-key1"], statuses=[failed_status], max_workers=1
+        )
+        self.assertEqual(result.num_rows, 1)
+        self.assertEqual(result.num_deleted, 0)
+        self.assertEqual(result.failed_rows, [(b"row-key1", failed_status)])
+
+    def test_delete_where_no_rows(self):
+        result, low_level_table = self._delete_where_helper([], max_workers=1)
+        self.assertEqual(result.num_rows, 0)
+        self.assertEqual(low_level_table.mutate_rows_calls, [])
+
+    def test_delete_where_string_filter(self):
+        with self.assertRaises(TypeError):
+            self._delete_where_helper([], filter_="KeyOnlyFilter ()")
+
+    def test_delete_where_bad_batch_size(self):
+        with self.assertRaises(ValueError):
+            self._delete_where_helper([], batch_size=0)
+
+    def test_delete_where_bad_max_workers(self):
+        with self.assertRaises(ValueError):
+            self._delete_where_helper([], max_workers=0)
+
+    def _put_many_helper(self, rows, statuses=None, **kwargs):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = low_level_table = _MockLowLevelTable()
+        low_level_table.statuses = statuses
+
+        result = table.put_many(iter(rows), **kwargs)
+        return result, low_level_table
+
+    def _check_and_mutate_table(self, commit_result):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+        row_obj = _MockLowLevelRow("row-key", commit_result=commit_result)
+        table._low_level_table.row_values["row-key"] = row_obj
+        return table, row_obj
+
+    def test_check_and_put(self):
+        from google.cloud.bigtable.row_filters import PassAllFilter
+
+        table, row_obj = self._check_and_mutate_table(commit_result=True)
+        filter_ = PassAllFilter(True)
+        result = table.check_and_put(
+            "row-key", filter_, {b"cf:col1": b"new"}, else_data={b"cf:col2": b"old"}
+        )
+
+        self.assertTrue(result)
+        self.assertIs(row_obj._filter, filter_)
+        self.assertEqual(row_obj.commit_calls, 1)
+        self.assertEqual(
+            row_obj.set_cell_calls,
+            [
+                (("cf", b"col1", b"new"), {"timestamp": None, "state": True}),
+                (("cf", b"col2", b"old"), {"timestamp": None, "state": False}),
+            ],
+        )
+
+    def test_check_and_put_column_value(self):
+        from google.cloud._helpers import _datetime_from_microseconds
+        from google.cloud.bigtable.row_filters import CellsColumnLimitFilter
+        from google.cloud.bigtable.row_filters import ColumnRangeFilter
+        from google.cloud.bigtable.row_filters import RowFilterChain
+        from google.cloud.bigtable.row_filters import ValueRangeFilter
+
+        table, row_obj = self._check_and_mutate_table(commit_result=False)
+        result = table.check_and_put(
+            "row-key", (b"cf:col1", b"old"), {b"cf:col1": b"new"}, timestamp=1
+        )
+
+        self.assertFalse(result)
+        expected_filter = RowFilterChain(
+            filters=[
+                RowFilterChain(
+                    filters=[
+                        ColumnRangeFilter(
+                            "cf",
+                            start_column=b"col1",
+                            end_column=b"col1",
+                            inclusive_start=True,
+                            inclusive_end=True,
+                        ),
+                        CellsColumnLimitFilter(1),
+                    ]
+                ),
+                ValueRangeFilter(start_value=b"old", end_value=b"old"),
+            ]
+        )
+        self.assertEqual(row_obj._filter, expected_filter)
+        timestamp = _datetime_from_microseconds(1000)
+        self.assertEqual(
+            row_obj.set_cell_calls,
+            [(("cf", b"col1", b"new"), {"timestamp": timestamp, "state": True})],
+        )
+
+    def test_check_and_put_no_data(self):
+        table, row_obj = self._check_and_mutate_table(commit_result=True)
+        with self.assertRaises(ValueError):
+            table.check_and_put("row-key", (b"cf:col1", None), {})
+        self.assertEqual(row_obj.commit_calls, 0)
+
+    def test_check_and_delete(self):
+        from google.cloud.bigtable.row_filters import CellsColumnLimitFilter
+        from google.cloud.bigtable.row_filters import ColumnRangeFilter
+        from google.cloud.bigtable.row_filters import RowFilterChain
+
+        table, row_obj = self._check_and_mutate_table(commit_result=True)
+        # The qualifier is matched exactly, not as a regular expression.
+        result = table.check_and_delete("row-key", (b"cf:user.1", None))
+
+        self.assertTrue(result)
+        expected_filter = RowFilterChain(
+            filters=[
+                ColumnRangeFilter(
+                    "cf",
+                    start_column=b"user.1",
+                    end_column=b"user.1",
+                    inclusive_start=True,
+                    inclusive_end=True,
+                ),
+                CellsColumnLimitFilter(1),
+            ]
+        )
+        self.assertEqual(row_obj._filter, expected_filter)
+        self.assertEqual(row_obj.delete_calls, [{"state": True}])
+
+    def test_check_and_delete_column_family(self):
+        table, row_obj = self._check_and_mutate_table(commit_result=True)
+        with self.assertRaises(ValueError):
+            table.check_and_delete("row-key", (b"cf", None))
+        self.assertEqual(row_obj.commit_calls, 0)
+
+    def test_check_and_delete_columns(self):
+        from google.cloud.bigtable.row_filters import PassAllFilter
+
+        table, row_obj = self._check_and_mutate_table(commit_result=True)
+        result = table.check_and_delete(
+            "row-key", PassAllFilter(True), columns=[b"cf:col1", b"cf2"]
+        )
+
+        self.assertTrue(result)
+        self.assertEqual(
+            row_obj.delete_cell_calls,
+            [(("cf", b"col1"), {"time_range": None, "state": True})],
+        )
+        self.assertEqual(
+            row_obj.delete_cells_calls,
+            [(("cf2",), {"columns": row_obj.ALL_COLUMNS, "state": True})],
+        )
+
+    def test_check_and_delete_bad_condition(self):
+        table, row_obj = self._check_and_mutate_table(commit_result=True)
+        with self.assertRaises(TypeError):
+            table.check_and_delete("row-key", b"cf:col1")
+        with self.assertRaises(TypeError):
+            table.check_and_delete("row-key", (b"cf:col1", b"value", b"extra"))
+        self.assertEqual(row_obj.commit_calls, 0)
+
+    def test_put_many(self):
+        rows = [
+            (b"row-key1", {b"fam:col1": b"value1", b"fam:col2": b"value2"}),
+            (b"row-key2", {b"fam:col1": b"value3"}),
+            (b"row-key3", {b"fam:col1": b"value4"}),
+        ]
+        result, low_level_table = self._put_many_helper(
+            rows, batch_size=2, max_in_flight=1
+        )
+
+        self.assertEqual(result.num_rows, 3)
+        self.assertEqual(result.num_mutations, 4)
+        self.assertEqual(result.failed_rows, [])
+        self.assertTrue(result.elapsed >= 0.0)
+        # The first batch is full after one row, the last batch is sent
+        # with what is left at the end.
+        self.assertEqual(
+            low_level_table.mutate_rows_calls,
+            [[b"row-key1"], [b"row-key2", b"row-key3"]],
+        )
+        row1 = low_level_table.row_values[b"row-key1"]
+        self.assertEqual(
+            sorted(args for args, _ in row1.set_cell_calls),
+            [("fam", b"col1", b"value1"), ("fam", b"col2", b"value2")],
+        )
+
+    def test_put_many_batch_bytes(self):
+        rows = [
+            (b"row-key1", {b"fam:col1": b"value1"}),
+            (b"row-key2", {b"fam:col1": b"value2"}),
+        ]
+        result, low_level_table = self._put_many_helper(rows, batch_bytes=1)
+
+        self.assertEqual(result.num_rows, 2)
+        self.assertEqual(
+            sorted(low_level_table.mutate_rows_calls), [[b"row-key1"], [b"row-key2"]]
+        )
+
+    def test_put_many_failed_rows(self):
+        rows = [(b"row-key1", {b"fam:col1": b"value1"})]
+        failed_status = _MockStatus(code=14)
+        result, _ = self._put_many_helper(rows, statuses=[failed_status])
+        self.assertEqual(result.failed_rows, [(b"row-key1", failed_status)])
+
+    def test_put_many_empty(self):
+        result, low_level_table = self._put_many_helper([])
+        self.assertEqual(result.num_rows, 0)
+        self.assertEqual(result.num_mutations, 0)
+        self.assertEqual(low_level_table.mutate_rows_calls, [])
+
+    def test_put_many_with_flow_controller_failed_rows(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = low_level_table = _MockLowLevelTable()
+        table._flow_controller = FlowController(max_mutations=5)
+        failed_status = _MockStatus(code=14)
+        low_level_table.mutate_rows = lambda rows: [failed_status] * len(rows)
+        rows = [
+            (b"row-key%02d" % (index,), {b"fam:col": b"value"}) for index in range(20)
+        ]
+
+        result = table.put_many(iter(rows))
+
+        # The rows of the sends forced by the flow controller are reported.
+        self.assertEqual(result.num_rows, 20)
+        self.assertEqual(result.num_mutations, 20)
+        self.assertEqual(
+            sorted(result.failed_rows), [(row, failed_status) for row, _ in rows]
+        )
+        self.assertEqual(table._flow_controller.outstanding_mutations, 0)
+
+    def test_put_many_failing_rows_release_flow_control(self):
+        from google.cloud.happybase.flow_control import FlowController
+
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = low_level_table = _MockLowLevelTable()
+        table._flow_controller = flow_controller = FlowController(max_mutations=10)
+
+        def rows():
+            yield b"row-key1", {b"fam:col1": b"value1"}
+            yield b"row-key2", {b"fam:col1": b"value2"}
+            raise RuntimeError("bad input")
+
+        with self.assertRaises(RuntimeError):
+            table.put_many(rows())
+        self.assertEqual(low_level_table.mutate_rows_calls, [])
+        self.assertEqual(flow_controller.outstanding_mutations, 0)
+        self.assertEqual(flow_controller.outstanding_bytes, 0)
+
+    def test_put_many_bad_max_in_flight(self):
+        with self.assertRaises(ValueError):
+            self._put_many_helper([], max_in_flight=0)
 
     def test_batch(self):
         name = "table-name"
@@ -770,6 +1337,7 @@ class TestTable(unittest.TestCase):
         batch_size = 42
         transaction = False  # Must be False when batch_size is non-null
         wal = object()
+        coalesce = True
 
         with mock.patch("google.cloud.happybase.table.Batch", _MockBatch):
             result = table.batch(
@@ -777,6 +1345,7 @@ class TestTable(unittest.TestCase):
                 batch_size=batch_size,
                 transaction=transaction,
                 wal=wal,
+                coalesce=coalesce,
             )
 
         self.assertTrue(isinstance(result, _MockBatch))
@@ -786,33 +1355,108 @@ class TestTable(unittest.TestCase):
             "batch_size": batch_size,
             "transaction": transaction,
             "wal": wal,
+            "coalesce": coalesce,
+            "flow_controller": None,
         }
         self.assertEqual(result.kwargs, expected_kwargs)
 
+    def _counter_get_helper(self, read_row_result):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+        table._low_level_table.read_row_result = read_row_result
+
+        fake_filter = object()
+        mock_filters = []
+
+        def mock_filter_chain_helper(**kwargs):
+            mock_filters.append(kwargs)
+            return fake_filter
+
+        row = "row-key"
+        column = b"fam:col1"
+        with mock.patch(
+            "google.cloud.happybase.table._filter_chain_helper",
+            mock_filter_chain_helper,
+        ):
+            result = table.counter_get(row, column)
+
+        self.assertEqual(mock_filters, [{"column": column, "versions": 1}])
+        read_row_kwargs = {"filter_": fake_filter}
+        self.assertEqual(
+            table._low_level_table.read_row_calls, [((row,), read_row_kwargs)]
+        )
+        # Reading a counter never modifies the row.
+        self.assertEqual(table._low_level_table.row_values, {})
+        return result
+
     def test_counter_get(self):
-        klass = self._get_target_class()
-        counter_value = 1337
+        partial_row = _make_partial_row("row-key", {(u"fam", b"col1"): 1337})
+        self.assertEqual(self._counter_get_helper(partial_row), 1337)
 
-        class TableWithInc(klass):
+    def test_counter_get_missing_row(self):
+        self.assertEqual(self._counter_get_helper(None), 0)
 
-            incremented = []
-            value = counter_value
+    def test_counter_get_missing_cell(self):
+        partial_row = _make_partial_row("row-key", {(u"fam", b"col2"): 1})
+        self.assertEqual(self._counter_get_helper(partial_row), 0)
 
-            def counter_inc(self, row, column, value=1):
-                self.incremented.append((row, column, value))
-                self.value += value
-                return self.value
+    def test_counters_get(self):
+        from google.cloud.bigtable.row_filters import CellsColumnLimitFilter
+        from google.cloud.bigtable.row_filters import RowFilterChain
 
         name = "table-name"
         connection = None
-        table = TableWithInc(name, connection)
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+        row_key1 = b"row-key1"
+        row_key2 = b"row-key2"
+        rr_result = _MockPartialRowsData(
+            rows={
+                row_key1: _make_partial_row(
+                    row_key1, {(u"fam", b"col1"): 1, (u"fam", b"col2"): -2}
+                ),
+                row_key2: _make_partial_row(row_key2, {(u"fam", b"col2"): 3}),
+            }
+        )
+        table._low_level_table.read_rows_result = rr_result
 
-        row = "row-key"
-        column = "fam:col1"
-        self.assertEqual(TableWithInc.incremented, [])
-        result = table.counter_get(row, column)
-        self.assertEqual(result, counter_value)
-        self.assertEqual(TableWithInc.incremented, [(row, column, 0)])
+        columns = [b"fam:col1", u"fam:col2"]
+        result = table.counters_get([row_key1, u"row-key2", b"row-key3"], columns)
+
+        expected_result = {
+            row_key1: {b"fam:col1": 1, u"fam:col2": -2},
+            u"row-key2": {b"fam:col1": 0, u"fam:col2": 3},
+            b"row-key3": {b"fam:col1": 0, u"fam:col2": 0},
+        }
+        self.assertEqual(result, expected_result)
+
+        ((read_rows_args, read_rows_kwargs),) = table._low_level_table.read_rows_calls
+        self.assertEqual(read_rows_args, ())
+        filter_ = read_rows_kwargs["filter_"]
+        self.assertIsInstance(filter_, RowFilterChain)
+        self.assertEqual(filter_.filters[-1], CellsColumnLimitFilter(1))
+        row_set = read_rows_kwargs["row_set"]
+        self.assertEqual(row_set.row_keys, [row_key1, row_key2, b"row-key3"])
+
+    def test_counters_get_empty(self):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+
+        self.assertEqual(table.counters_get([], [b"fam:col1"]), {})
+        self.assertEqual(table.counters_get([b"row-key"], []), {b"row-key": {}})
+        self.assertEqual(table._low_level_table.read_rows_calls, [])
+
+    def test_counters_get_column_family(self):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+
+        with self.assertRaises(ValueError):
+            table.counters_get([b"row-key"], [b"fam:col1", b"fam"])
 
     def test_counter_dec(self):
         klass = self._get_target_class()
@@ -840,6 +1484,91 @@ class TestTable(unittest.TestCase):
         self.assertEqual(result, counter_value - dec_value)
         self.assertEqual(TableWithInc.incremented, [(row, column, -dec_value)])
 
+    def test_counter_buffer(self):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        buffers_created = []
+
+        def make_counter_buffer(*args, **kwargs):
+            buffers_created.append((args, kwargs))
+            return kwargs
+
+        with mock.patch(
+            "google.cloud.happybase.table.CounterBuffer", make_counter_buffer
+        ):
+            result = table.counter_buffer(
+                max_pending=10, flush_interval=None, max_workers=2
+            )
+
+        expected_kwargs = {"max_pending": 10, "flush_interval": None, "max_workers": 2}
+        self.assertEqual(buffers_created, [((table,), expected_kwargs)])
+        self.assertEqual(result, expected_kwargs)
+
+    def _sharded_counter_table(self):
+        klass = self._get_target_class()
+
+        class TableWithCounters(klass):
+            def __init__(self, *args, **kwargs):
+                super(TableWithCounters, self).__init__(*args, **kwargs)
+                self.incremented = []
+                self.counters_get_calls = []
+
+            def counter_inc(self, row, column, value=1):
+                self.incremented.append((row, column, value))
+                return value
+
+            def counters_get(self, rows, columns):
+                self.counters_get_calls.append((rows, columns))
+                return {
+                    row_key: {column: index for column in columns}
+                    for index, row_key in enumerate(rows)
+                }
+
+        return TableWithCounters("table-name", None)
+
+    def test_sharded_counter_inc(self):
+        table = self._sharded_counter_table()
+        chosen = []
+
+        def mock_choice(row_keys):
+            chosen.append(row_keys)
+            return row_keys[2]
+
+        with mock.patch("random.choice", mock_choice):
+            result = table.sharded_counter_inc(u"row-key", b"fam:col1", value=5)
+
+        self.assertEqual(result, None)
+        (row_keys,) = chosen
+        self.assertEqual(len(row_keys), 16)
+        self.assertEqual(table.incremented, [(b"row-key#2", b"fam:col1", 5)])
+
+    def test_sharded_counter_dec(self):
+        table = self._sharded_counter_table()
+
+        with mock.patch("random.choice", lambda row_keys: row_keys[-1]):
+            table.sharded_counter_dec(b"row-key", b"fam:col1", value=5, shards=4)
+
+        self.assertEqual(table.incremented, [(b"row-key#3", b"fam:col1", -5)])
+
+    def test_sharded_counter_get(self):
+        table = self._sharded_counter_table()
+
+        result = table.sharded_counter_get(b"row-key", b"fam:col1", shards=4)
+        self.assertEqual(result, 0 + 1 + 2 + 3)
+        row_keys = [b"row-key#0", b"row-key#1", b"row-key#2", b"row-key#3"]
+        self.assertEqual(table.counters_get_calls, [(row_keys, [b"fam:col1"])])
+
+    def test_sharded_counter_non_positive_shards(self):
+        table = self._sharded_counter_table()
+
+        with self.assertRaises(ValueError):
+            table.sharded_counter_inc(b"row-key", b"fam:col1", shards=0)
+        with self.assertRaises(ValueError):
+            table.sharded_counter_get(b"row-key", b"fam:col1", shards=0)
+        self.assertEqual(table.incremented, [])
+        self.assertEqual(table.counters_get_calls, [])
+
     def _counter_inc_helper(self, row, column, value, commit_result):
         import six
 
@@ -863,47 +1592,29 @@ class TestTable(unittest.TestCase):
         row_obj = table._low_level_table.row_values[row]
         if isinstance(column, six.binary_type):
             column = column.decode("utf-8")
-        self.assertEqual(row_obj.counts, {tuple(column.split(":")): incremented_value})
+        col_fam, col_qual = column.split(":")
+        expected_counts = {(col_fam, col_qual.encode()): incremented_value}
+        self.assertEqual(row_obj.counts, expected_counts)
 
     def test_counter_set(self):
         import struct
-        from google.cloud.happybase.table import _WAL_SENTINEL
-
-        name = "table-name"
-        connection = None
-        table = self._make_one(name, connection)
-        batches_created = []
 
-        def make_batch(*args, **kwargs):
-            result = _MockBatch(*args, **kwargs)
-            batches_created.append(result)
-            return result
+        table = self._mutate_row_table()
 
         row = "row-key"
-        column = "fam:col1"
+        column = b"fam:col1"
         value = 42
-        with mock.patch("google.cloud.happybase.table.Batch", make_batch):
-            result = table.counter_set(row, column, value=value)
+        result = table.counter_set(row, column, value=value)
 
         # There is no return value.
         self.assertEqual(result, None)
-
-        # Check how the batch was created and used.
-        (batch,) = batches_created
-        self.assertTrue(isinstance(batch, _MockBatch))
-        self.assertEqual(batch.args, (table,))
-        expected_kwargs = {
-            "timestamp": None,
-            "batch_size": None,
-            "transaction": True,
-            "wal": _WAL_SENTINEL,
-        }
-        self.assertEqual(batch.kwargs, expected_kwargs)
-        # Make sure it was a successful context manager
-        self.assertEqual(batch.exit_vals, [(None, None, None)])
-        data = {column: struct.Struct(">q").pack(value)}
-        self.assertEqual(batch.put_args, [(row, data)])
-        self.assertEqual(batch.delete_args, [])
+        row_obj = table._low_level_table.row_values[row]
+        packed_value = struct.Struct(">q").pack(value)
+        self.assertEqual(
+            row_obj.set_cell_calls,
+            [(("fam", b"col1", packed_value), {"timestamp": None})],
+        )
+        self.assertEqual(row_obj.commit_calls, 1)
 
     def test_counter_inc(self):
         import struct
@@ -982,6 +1693,129 @@ class TestTable(unittest.TestCase):
         with self.assertRaises(ValueError):
             self._counter_inc_helper(row, column, value, commit_result)
 
+    def test_counter_inc_many(self):
+        import struct
+
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+        row = "row-key"
+        commit_result = {
+            u"fam1": {b"col1": [(struct.pack(">q", 5), None)]},
+            u"fam2": {b"col2": [(struct.pack(">q", -3), None)]},
+        }
+        table._low_level_table.row_values[row] = row_obj = _MockLowLevelRow(
+            row, commit_result=commit_result
+        )
+
+        result = table.counter_inc_many(row, {b"fam1:col1": 5, u"fam2:col2": -3})
+        self.assertEqual(result, {b"fam1:col1": 5, u"fam2:col2": -3})
+        self.assertTrue(row_obj._append)
+        self.assertEqual(row_obj.commit_calls, 1)
+        expected_counts = {(u"fam1", b"col1"): 5, (u"fam2", b"col2"): -3}
+        self.assertEqual(row_obj.counts, expected_counts)
+
+    def test_counter_inc_many_empty(self):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+
+        self.assertEqual(table.counter_inc_many("row-key", {}), {})
+        self.assertEqual(table._low_level_table.row_values, {})
+
+    def test_counter_inc_many_column_family(self):
+        name = "table-name"
+        connection = None
+        table = self._make_one(name, connection)
+        table._low_level_table = _MockLowLevelTable()
+
+        with self.assertRaises(ValueError):
+            table.counter_inc_many("row-key", {b"fam1:col1": 1, b"fam2": 1})
+
+
+class TestPutManyResult(unittest.TestCase):
+    def _get_target_class(self):
+        from google.cloud.happybase.table import PutManyResult
+
+        return PutManyResult
+
+    def _make_one(self, *args, **kwargs):
+        return self._get_target_class()(*args, **kwargs)
+
+    def test_constructor_defaults(self):
+        result = self._make_one()
+        self.assertEqual(result.num_rows, 0)
+        self.assertEqual(result.num_mutations, 0)
+        self.assertEqual(result.elapsed, 0.0)
+        self.assertEqual(result.failed_rows, [])
+
+    def test_rows_per_second(self):
+        result = self._make_one(num_rows=100, elapsed=4.0)
+        self.assertEqual(result.rows_per_second, 25.0)
+
+    def test_rows_per_second_no_time_elapsed(self):
+        result = self._make_one(num_rows=100)
+        self.assertEqual(result.rows_per_second, 0.0)
+
+    def test___repr__(self):
+        result = self._make_one(num_rows=100, elapsed=4.0, failed_rows=[object()])
+        self.assertEqual(
+            repr(result), "<table.PutManyResult num_rows=100 failed=1 elapsed=4.000>"
+        )
+
+
+class TestDeleteWhereResult(unittest.TestCase):
+    def _get_target_class(self):
+        from google.cloud.happybase.table import DeleteWhereResult
+
+        return DeleteWhereResult
+
+    def _make_one(self, *args, **kwargs):
+        return self._get_target_class()(*args, **kwargs)
+
+    def test_constructor_defaults(self):
+        result = self._make_one()
+        self.assertEqual(result.num_rows, 0)
+        self.assertEqual(result.elapsed, 0.0)
+        self.assertEqual(result.failed_rows, [])
+
+    def test_num_deleted(self):
+        result = self._make_one(num_rows=10, failed_rows=[object(), object()])
+        self.assertEqual(result.num_deleted, 8)
+
+    def test___repr__(self):
+        result = self._make_one(num_rows=100, elapsed=4.0, failed_rows=[object()])
+        self.assertEqual(
+            repr(result),
+            "<table.DeleteWhereResult num_rows=100 failed=1 elapsed=4.000>",
+        )
+
+
+class Test__split_row_range(unittest.TestCase):
+    def _call_fut(self, *args, **kwargs):
+        from google.cloud.happybase.table import _split_row_range
+
+        return _split_row_range(*args, **kwargs)
+
+    def test_no_sample_keys(self):
+        result = self._call_fut([], b"a", b"z", 4)
+        self.assertEqual(result, [(b"a", b"z")])
+
+    def test_unbounded(self):
+        result = self._call_fut([b"c", b"m", b""], None, None, 4)
+        self.assertEqual(result, [(None, b"c"), (b"c", b"m"), (b"m", None)])
+
+    def test_keys_outside_range_ignored(self):
+        result = self._call_fut([b"a", b"c", b"m", b"z"], b"a", b"m", 4)
+        self.assertEqual(result, [(b"a", b"c"), (b"c", b"m")])
+
+    def test_more_keys_than_shards(self):
+        sample_keys = [b"b", b"c", b"d", b"e", b"f", b"g"]
+        result = self._call_fut(sample_keys, None, None, 3)
+        self.assertEqual(result, [(None, b"c"), (b"c", b"e"), (b"e", None)])
+
 
 class Test__gc_rule_to_dict(unittest.TestCase):
     def _call_fut(self, *args, **kwargs):
@@ -1282,6 +2116,10 @@ class Test__filter_chain_helper(unittest.TestCase):
             num_filters=2, column=u"cfU:qualN", col_fam=u"cfU", qual=u"qualN"
         )
 
+    def test_column_family_only(self):
+        with self.assertRaises(ValueError):
+            self._call_fut(b"cf1", versions=1)
+
     def test_with_versions(self):
         from google.cloud.bigtable.row_filters import CellsColumnLimitFilter
 
@@ -1399,8 +2237,9 @@ class Test___get_row_set_from_rows(unittest.TestCase):
 
 
 class _Connection(object):
-    def __init__(self, instance):
+    def __init__(self, instance, flow_controller=None):
         self._instance = instance
+        self._flow_controller = flow_controller
 
 
 class _MockLowLevelColumnFamily(object):
@@ -1409,6 +2248,21 @@ class _MockLowLevelColumnFamily(object):
         self.gc_rule = gc_rule
 
 
+def _make_partial_row(row_key, counters):
+    import datetime
+    import struct
+
+    from google.cloud.bigtable.row_data import Cell
+    from google.cloud.bigtable.row_data import PartialRowData
+
+    timestamp = datetime.datetime.utcnow()
+    partial_row = PartialRowData(row_key)
+    for (column_family_id, column_qualifier), value in counters.items():
+        column_cells = partial_row._cells.setdefault(column_family_id, {})
+        column_cells[column_qualifier] = [Cell(struct.pack(">q", value), timestamp)]
+    return partial_row
+
+
 class _MockLowLevelTable(object):
     def __init__(self, *args, **kwargs):
         self.args = args
@@ -1420,16 +2274,33 @@ class _MockLowLevelTable(object):
         self.read_row_result = None
         self.read_rows_calls = []
         self.read_rows_result = None
+        self.mutate_rows_calls = []
+        self.statuses = None
+        self.drop_by_prefix_calls = []
+        self.truncate_calls = []
 
     def list_column_families(self):
         self.list_column_families_calls += 1
         return self.column_families
 
-    def row(self, row_key, append=None):
-        result = self.row_values[row_key]
+    def row(self, row_key, filter_=None, append=None):
+        result = self.row_values.setdefault(row_key, _MockLowLevelRow(row_key))
+        result._filter = filter_
         result._append = append
         return result
 
+    def mutate_rows(self, rows):
+        self.mutate_rows_calls.append([row.row_key for row in rows])
+        if self.statuses is None:
+            return [_MockStatus() for _ in rows]
+        return self.statuses
+
+    def drop_by_prefix(self, row_key_prefix, timeout=None):
+        self.drop_by_prefix_calls.append((row_key_prefix, timeout))
+
+    def truncate(self, timeout=None):
+        self.truncate_calls.append(timeout)
+
     def read_row(self, *args, **kwargs):
         self.read_row_calls.append((args, kwargs))
         return self.read_row_result
@@ -1442,8 +2313,36 @@ class _MockLowLevelTable(object):
             yield curr_row_data
 
 
+class _MockSampledRow(object):
+    def __init__(self, row_key):
+        self.row_key = row_key
+
+
+class _MockSampledLowLevelTable(_MockLowLevelTable):
+    def __init__(self, row_keys, sample_keys):
+        super(_MockSampledLowLevelTable, self).__init__()
+        self.row_keys = row_keys
+        self.sample_keys = sample_keys
+        self.sample_row_keys_calls = 0
+
+    def sample_row_keys(self):
+        self.sample_row_keys_calls += 1
+        return [_MockSampledRow(row_key) for row_key in self.sample_keys]
+
+    def read_rows(self, *args, **kwargs):
+        self.read_rows_calls.append((args, kwargs))
+        row_range = kwargs["row_set"].row_ranges[0]
+        for row_key in self.row_keys:
+            if row_range.start_key is not None and row_key < row_range.start_key:
+                continue
+            if row_range.end_key is not None and row_key >= row_range.end_key:
+                continue
+            yield _MockSampledRow(row_key)
+
+
 class _MockLowLevelRow(object):
 
+    ALL_COLUMNS = object()
     COUNTER_DEFAULT = 0
 
     def __init__(self, row_key, commit_result=None):
@@ -1451,15 +2350,41 @@ class _MockLowLevelRow(object):
         self._append = False
         self.counts = {}
         self.commit_result = commit_result
+        self.commit_calls = 0
+        self.set_cell_calls = []
+        self.delete_cell_calls = []
+        self.delete_cells_calls = []
+        self.delete_calls = []
+
+    def set_cell(self, *args, **kwargs):
+        self.set_cell_calls.append((args, kwargs))
+
+    def delete_cell(self, *args, **kwargs):
+        self.delete_cell_calls.append((args, kwargs))
+
+    def delete_cells(self, *args, **kwargs):
+        self.delete_cells_calls.append((args, kwargs))
+
+    def delete(self, **kwargs):
+        self.delete_calls.append(kwargs)
 
     def increment_cell_value(self, column_family_id, column, int_value):
         count = self.counts.setdefault((column_family_id, column), self.COUNTER_DEFAULT)
         self.counts[(column_family_id, column)] = count + int_value
 
     def commit(self):
+        self.commit_calls += 1
+        if self.commit_result is None:
+            return _MockStatus()
         return self.commit_result
 
 
+class _MockStatus(object):
+    def __init__(self, code=0, message=""):
+        self.code = code
+        self.message = message
+
+
 class _MockBatch(object):
     def __init__(self, *args, **kwargs):
         self.args = args
@@ -1467,6 +2392,9 @@ class _MockBatch(object):
         self.exit_vals = []
         self.put_args = []
         self.delete_args = []
+        self.add_mutations_args = []
+        self.failed_rows = []
+        self.send_calls = 0
 
     def __enter__(self):
         return self
@@ -1480,6 +2408,13 @@ class _MockBatch(object):
     def delete(self, *args):
         self.delete_args.append(args)
 
+    def send(self):
+        self.send_calls += 1
+        return self.failed_rows
+
+    def _add_mutations(self, *args):
+        self.add_mutations_args.append(args)
+
 
 class _MockPartialRowsData(object):
     def __init__(self, rows=None, iterations=0):